@@ -11,7 +11,7 @@ import logging
 from dataclasses import dataclass
 import os
 
-from fedmcp import Artifact, LocalSigner, KMSSigner
+from fedmcp import Artifact, LocalSigner, KMSSigner, FedMCPMetrics
 
 @dataclass
 class ConnectorConfig:
@@ -81,6 +81,7 @@ class BaseConnector(ABC):
     - Configuration management
     - Artifact signing
     - Audit logging
+    - Metrics (the same ``fedmcp_*`` series the reference server exports)
     - Health checks
     - Error handling
     """
@@ -96,6 +97,9 @@ class BaseConnector(ABC):
         else:
             self.signer = LocalSigner()
         
+        self.signer_type = "kms" if config.use_kms and config.kms_key_id else "local"
+        self.metrics = FedMCPMetrics()
+        
         # Initialize audit logger
         self.audit = AuditLogger(
             connector_name=config.connector_name,
@@ -173,7 +177,7 @@ class BaseConnector(ABC):
         }
         
         # Sign artifact
-        signature = self.signer.sign(artifact)
+        signature = self.sign_artifact(artifact)
         
         # Log artifact creation
         self.audit.log_access(
@@ -198,7 +202,18 @@ class BaseConnector(ABC):
     
     def sign_artifact(self, artifact: Artifact) -> str:
         """Sign an artifact using configured signer"""
-        return self.signer.sign(artifact)
+        with self.metrics.sign_seconds.time(signer=self.signer_type):
+            try:
+                signature = self.signer.sign(artifact)
+            except Exception:
+                self.metrics.errors_total.inc(stage="sign")
+                raise
+        self.metrics.artifacts_signed_total.inc(signer=self.signer_type)
+        return signature
+    
+    def render_metrics(self) -> str:
+        """Metrics of this process in the Prometheus text format"""
+        return self.metrics.registry.render()
     
     def health_check(self) -> Dict[str, Any]:
         """
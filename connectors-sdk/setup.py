@@ -36,7 +36,7 @@ setup(
     packages=find_packages(),
     python_requires=">=3.8",
     install_requires=[
-        "fedmcp>=0.1.0",
+        "fedmcp>=0.2.0",
         "aiohttp>=3.8.0",
         "aiofiles>=0.8.0",
         "pydantic>=2.0.0",
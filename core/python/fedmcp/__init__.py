@@ -6,8 +6,10 @@ Python implementation of the FedMCP specification v0.2
 from .artifact import Artifact, ArtifactType
 from .signer import Signer, LocalSigner, KMSSigner
 from .verifier import Verifier, KMSVerifier
-from .audit import AuditEvent, AuditAction
+from .audit import AuditEvent, AuditAction, AuditRecord
+from .audit_chain import AuditCheckpoint, verify_chain
 from .client import FedMCPClient
+from .metrics import FedMCPMetrics, MetricsRegistry
 
 __version__ = "0.2.0"
 __all__ = [
@@ -20,5 +22,10 @@ __all__ = [
     "KMSVerifier",
     "AuditEvent",
     "AuditAction",
+    "AuditRecord",
+    "AuditCheckpoint",
+    "verify_chain",
     "FedMCPClient",
+    "FedMCPMetrics",
+    "MetricsRegistry",
 ]
\ No newline at end of file
@@ -18,6 +18,9 @@ class ArtifactType:
     RAG_QUERY = "rag_query"
     LLM_COMPLETION = "llm_completion"
     TOOL_INVOCATION = "tool_invocation"
+    
+    # Signed head of a hash-chained audit stream
+    AUDIT_CHECKPOINT = "audit_checkpoint"
 
 
 class Artifact(BaseModel):
@@ -56,7 +59,7 @@ class Artifact(BaseModel):
         # For now, using standard JSON with sorted keys
         # TODO: Implement full RFC 8785 canonicalization
         return json.dumps(
-            self.model_dump(by_alias=True),
+            self.model_dump(by_alias=True, mode="json"),
             sort_keys=True,
             separators=(",", ":")
         ).encode()
@@ -1,10 +1,25 @@
-from datetime import datetime, timezone
+import json
+import time
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterable, List, Tuple, Union
 from uuid import UUID, uuid4
 from pydantic import BaseModel, Field
 
 
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an event timestamp, including the legacy "+00:00Z" suffix"""
+    if value.endswith("Z"):
+        value = value[:-1]
+        if not value.endswith("+00:00"):
+            value += "+00:00"
+    return datetime.fromisoformat(value)
+
+
 class AuditAction(str, Enum):
     """Standard audit actions"""
     CREATE = "create"
@@ -24,7 +39,7 @@ class AuditEvent(BaseModel):
     Captures who did what to which artifact when
     """
     id: UUID = Field(default_factory=uuid4)
-    timestamp: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat() + "Z")
+    timestamp: str = Field(default_factory=lambda: _utc_now_iso())
     action: AuditAction
     actor: str  # Service account, user ID, or system component
     artifactId: Optional[UUID] = Field(None, alias="artifactId")
@@ -36,6 +51,11 @@ class AuditEvent(BaseModel):
     userAgent: Optional[str] = Field(None, alias="userAgent")
     sessionId: Optional[str] = Field(None, alias="sessionId")
     
+    # Hash chain position, set by the audit store (see audit_chain)
+    sequence: Optional[int] = None
+    prevHash: Optional[str] = Field(None, alias="prevHash")
+    eventHash: Optional[str] = Field(None, alias="eventHash")
+    
     class Config:
         populate_by_name = True
         
@@ -58,7 +78,7 @@ class AuditEvent(BaseModel):
         """Format for PostgreSQL storage"""
         return {
             "id": self.id,
-            "timestamp": datetime.fromisoformat(self.timestamp.replace("Z", "+00:00")),
+            "timestamp": _parse_timestamp(self.timestamp),
             "action": self.action.value,
             "actor": self.actor,
             "artifact_id": self.artifactId,
@@ -67,4 +87,209 @@ class AuditEvent(BaseModel):
             "ip_address": self.ipAddress,
             "user_agent": self.userAgent,
             "session_id": self.sessionId
-        }
\ No newline at end of file
+        }
+
+
+# --------------------------------------------------------------------------- #
+#  Compact representation for high-volume paths
+# --------------------------------------------------------------------------- #
+
+_json_string = json.encoder.encode_basestring_ascii
+_last_ts_ns = 0
+
+
+def _next_ts_ns() -> int:
+    """Wall-clock nanoseconds, strictly increasing within the process"""
+    global _last_ts_ns
+    now = time.time_ns()
+    if now <= _last_ts_ns:
+        now = _last_ts_ns + 1
+    _last_ts_ns = now
+    return now
+
+
+def _format_ts(ts_ns: int, second_cache: Dict[int, str]) -> str:
+    seconds, nanos = divmod(ts_ns, 1_000_000_000)
+    prefix = second_cache.get(seconds)
+    if prefix is None:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        second_cache.clear()
+        second_cache[seconds] = prefix
+    return f"{prefix}.{nanos // 1000:06d}Z"
+
+
+def _json_or_null(value: Optional[str]) -> str:
+    return "null" if value is None else _json_string(value)
+
+
+class AuditRecord:
+    """
+    Slotted audit event for high-volume paths
+    
+    Holds the same data as ``AuditEvent`` without pydantic validation: an
+    integer nanosecond timestamp, and a random ID generated on first use.
+    String forms are only built when asked for, and the batch serializers below encode many
+    records in one pass.
+    """
+    __slots__ = (
+        "ts_ns", "action", "actor", "workspace_id", "artifact_id", "metadata",
+        "ip_address", "user_agent", "session_id", "_id", "_id_str", "_ts_str",
+    )
+    
+    def __init__(
+        self,
+        action: AuditAction,
+        actor: str,
+        workspace_id: Union[UUID, str],
+        artifact_id: Optional[Union[UUID, str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        session_id: Optional[str] = None,
+        ts_ns: Optional[int] = None,
+        id: Optional[UUID] = None
+    ):
+        self.ts_ns = ts_ns if ts_ns is not None else _next_ts_ns()
+        self.action = action
+        self.actor = actor
+        self.workspace_id = str(workspace_id)
+        self.artifact_id = str(artifact_id) if artifact_id is not None else None
+        self.metadata = metadata
+        self.ip_address = ip_address
+        self.user_agent = user_agent
+        self.session_id = session_id
+        self._id = id
+        self._id_str: Optional[str] = None
+        self._ts_str: Optional[str] = None
+    
+    @property
+    def id(self) -> UUID:
+        if self._id is None:
+            # uuid4 draws from os.urandom: audit IDs must not be predictable
+            self._id = uuid4()
+        return self._id
+    
+    @property
+    def id_str(self) -> str:
+        if self._id_str is None:
+            self._id_str = str(self.id)
+        return self._id_str
+    
+    @property
+    def timestamp(self) -> str:
+        """ISO 8601 UTC timestamp, formatted on first use"""
+        if self._ts_str is None:
+            self._ts_str = _format_ts(self.ts_ns, {})
+        return self._ts_str
+    
+    def to_datetime(self) -> datetime:
+        seconds, nanos = divmod(self.ts_ns, 1_000_000_000)
+        return datetime.fromtimestamp(seconds, timezone.utc).replace(microsecond=nanos // 1000)
+    
+    @classmethod
+    def from_event(cls, event: AuditEvent) -> "AuditRecord":
+        record = cls(
+            action=event.action,
+            actor=event.actor,
+            workspace_id=event.workspaceId,
+            artifact_id=event.artifactId,
+            metadata=event.metadata or None,
+            ip_address=event.ipAddress,
+            user_agent=event.userAgent,
+            session_id=event.sessionId,
+            ts_ns=int(_parse_timestamp(event.timestamp).timestamp() * 1_000_000) * 1000,
+            id=event.id
+        )
+        record._ts_str = event.timestamp
+        return record
+    
+    def to_event(self) -> AuditEvent:
+        return AuditEvent(
+            id=self.id,
+            timestamp=self.timestamp,
+            action=self.action,
+            actor=self.actor,
+            artifactId=UUID(self.artifact_id) if self.artifact_id is not None else None,
+            workspaceId=UUID(self.workspace_id),
+            metadata=self.metadata or {},
+            ipAddress=self.ip_address,
+            userAgent=self.user_agent,
+            sessionId=self.session_id,
+            sequence=None,
+            prevHash=None,
+            eventHash=None
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as ``AuditEvent.model_dump(by_alias=True, mode="json")``"""
+        return {
+            "id": self.id_str,
+            "timestamp": self.timestamp,
+            "action": self.action.value,
+            "actor": self.actor,
+            "artifactId": self.artifact_id,
+            "workspaceId": self.workspace_id,
+            "metadata": self.metadata or {},
+            "ipAddress": self.ip_address,
+            "userAgent": self.user_agent,
+            "sessionId": self.session_id,
+            "sequence": None,
+            "prevHash": None,
+            "eventHash": None,
+        }
+
+
+# Column order of the rows produced by records_to_rows
+POSTGRES_COLUMNS = (
+    "id", "timestamp", "action", "actor", "artifact_id", "workspace_id",
+    "metadata", "ip_address", "user_agent", "session_id",
+)
+
+
+def records_to_ndjson(records: Iterable[AuditRecord]) -> bytes:
+    """
+    Encode records as CloudWatch-format NDJSON (see ``to_cloudwatch_log``)
+    
+    Fields the record generates itself (event ID, timestamp, action) are
+    written straight into the line; caller-supplied strings, IDs included,
+    go through the JSON string encoder and only non-empty metadata through
+    ``json.dumps``.
+    """
+    second_cache: Dict[int, str] = {}
+    lines = []
+    for r in records:
+        ts = r._ts_str or _format_ts(r.ts_ns, second_cache)
+        metadata = json.dumps(r.metadata, separators=(",", ":")) if r.metadata else "{}"
+        lines.append(
+            f'{{"eventId":"{r.id_str}","timestamp":"{ts}","action":"{r.action.value}",'
+            f'"actor":{_json_string(r.actor)},"artifactId":{_json_or_null(r.artifact_id)},'
+            f'"workspaceId":{_json_string(r.workspace_id)},"metadata":{metadata},'
+            f'"ipAddress":{_json_or_null(r.ip_address)},"userAgent":{_json_or_null(r.user_agent)},'
+            f'"sessionId":{_json_or_null(r.session_id)}}}\n'
+        )
+    return "".join(lines).encode()
+
+
+def records_to_rows(records: Iterable[AuditRecord]) -> List[Tuple[Any, ...]]:
+    """
+    Row tuples in ``POSTGRES_COLUMNS`` order, for executemany or COPY
+    
+    UUIDs are left in their text form, which both accept for uuid columns.
+    """
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for r in records:
+        rows.append((
+            r.id_str,
+            epoch + timedelta(microseconds=r.ts_ns // 1000),
+            r.action.value,
+            r.actor,
+            r.artifact_id,
+            r.workspace_id,
+            r.metadata or {},
+            r.ip_address,
+            r.user_agent,
+            r.session_id,
+        ))
+    return rows
+
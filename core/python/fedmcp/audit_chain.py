@@ -0,0 +1,124 @@
+"""
+Hash-chained audit trails with signed checkpoints
+
+Each event in a stream carries the hash of the event before it, so removing
+or reordering events breaks the chain. Every N events the producer signs a
+checkpoint (an ``audit_checkpoint`` artifact) over the chain head; a verifier
+that trusts a checkpoint only has to replay the events after it.
+"""
+
+import hashlib
+import json
+from typing import Dict, Any, Iterable, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from .artifact import Artifact, ArtifactType
+from .signer import Signer
+from .verifier import Verifier
+
+GENESIS_HASH = "0" * 64
+SYSTEM_WORKSPACE_ID = UUID("00000000-0000-0000-0000-000000000000")
+
+
+def event_hash(event: Dict[str, Any], prev_hash: str) -> str:
+    """SHA256 over the previous hash and the canonical event (minus its own hash)"""
+    body = {k: v for k, v in event.items() if k != "eventHash"}
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(prev_hash.encode() + canonical.encode()).hexdigest()
+
+
+def link_event(event: Dict[str, Any], prev_hash: str, sequence: int) -> Dict[str, Any]:
+    """Return a copy of a serialized event linked into the chain after ``prev_hash``"""
+    linked = dict(event)
+    linked["sequence"] = sequence
+    linked["prevHash"] = prev_hash
+    linked["eventHash"] = event_hash(linked, prev_hash)
+    return linked
+
+
+class AuditCheckpoint(BaseModel):
+    """Signed statement that the chain head at ``sequence`` was ``hash``"""
+    stream: str
+    sequence: int
+    hash: str
+    jws: Optional[str] = None
+
+    @classmethod
+    def create(
+        cls,
+        signer: Signer,
+        stream: str,
+        sequence: int,
+        head_hash: str,
+        workspace_id: UUID = SYSTEM_WORKSPACE_ID
+    ) -> "AuditCheckpoint":
+        """Sign a checkpoint as an ``audit_checkpoint`` artifact"""
+        artifact = Artifact(
+            type=ArtifactType.AUDIT_CHECKPOINT,
+            workspaceId=workspace_id,
+            jsonBody={"stream": stream, "sequence": sequence, "hash": head_hash}
+        )
+        return cls(stream=stream, sequence=sequence, hash=head_hash, jws=signer.sign(artifact))
+
+    @classmethod
+    def from_jws(cls, jws_token: str, verifier: Verifier) -> "AuditCheckpoint":
+        """
+        Verify a checkpoint signature and return its contents
+
+        Raises:
+            ValueError: If the signature is invalid or the artifact is not a checkpoint
+        """
+        artifact = verifier.verify(jws_token)
+        if artifact.type != ArtifactType.AUDIT_CHECKPOINT:
+            raise ValueError(f"Not an audit checkpoint: {artifact.type}")
+        body = artifact.jsonBody
+        return cls(stream=body["stream"], sequence=body["sequence"], hash=body["hash"], jws=jws_token)
+
+
+class ChainVerification(BaseModel):
+    """Outcome of verifying a range of the chain"""
+    sequence: int
+    hash: str
+    events_verified: int
+
+
+def verify_chain(
+    events: Iterable[Dict[str, Any]],
+    since: Optional[AuditCheckpoint] = None,
+    until: Optional[AuditCheckpoint] = None
+) -> ChainVerification:
+    """
+    Verify events that follow a trusted checkpoint (or the genesis)
+
+    ``events`` must be the contiguous run of serialized events after
+    ``since`` in sequence order. If ``until`` is given, the chain must pass
+    through it.
+
+    Raises:
+        ValueError: On a gap, reordering, or altered event
+    """
+    sequence = since.sequence if since else 0
+    head = since.hash if since else GENESIS_HASH
+    count = 0
+    reached_until = until is None or (until.sequence == sequence and until.hash == head)
+
+    for event in events:
+        expected = sequence + 1
+        if event.get("sequence") != expected:
+            raise ValueError(f"Chain gap: expected sequence {expected}, got {event.get('sequence')}")
+        if event.get("prevHash") != head:
+            raise ValueError(f"Chain broken at sequence {expected}: prevHash mismatch")
+        if event_hash(event, head) != event.get("eventHash"):
+            raise ValueError(f"Event at sequence {expected} was altered")
+        sequence, head = expected, event["eventHash"]
+        count += 1
+        if until is not None and sequence == until.sequence:
+            if head != until.hash:
+                raise ValueError(f"Chain does not match checkpoint at sequence {sequence}")
+            reached_until = True
+
+    if until is not None and not reached_until:
+        raise ValueError(f"Chain ends at sequence {sequence} before checkpoint {until.sequence}")
+    return ChainVerification(sequence=sequence, hash=head, events_verified=count)
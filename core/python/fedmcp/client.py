@@ -1,5 +1,6 @@
 import httpx
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from uuid import UUID
 
 from .artifact import Artifact
@@ -14,12 +15,17 @@ class FedMCPClient:
         base_url: str,
         workspace_id: UUID,
         signer: Optional[Signer] = None,
-        timeout: int = 30
+        timeout: int = 30,
+        cache_size: int = 256
     ):
         self.base_url = base_url.rstrip("/")
         self.workspace_id = workspace_id
         self.signer = signer
         self.client = httpx.Client(timeout=timeout)
+        
+        # artifact_id -> (ETag, body) for conditional GETs, least recently used first
+        self.cache_size = cache_size
+        self._validators: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
     
     async def create_artifact(
         self,
@@ -52,15 +58,57 @@ class FedMCPClient:
         
         return response.json()
     
-    async def get_artifact(self, artifact_id: UUID) -> Dict[str, Any]:
-        """Retrieve an artifact by ID"""
+    async def get_artifact(
+        self,
+        artifact_id: UUID,
+        fields: Optional[List[str]] = None,
+        include_jws: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Retrieve an artifact by ID
+        
+        Revalidates against the cached ETag so unchanged artifacts are
+        answered with 304 and not downloaded again.
+        
+        Args:
+            artifact_id: Artifact to fetch
+            fields: Only these paths of the artifact (``jsonBody.name`` or
+                ``/jsonBody/name``); the rest of the record is left out
+            include_jws: Whether to return the JWS
+        """
+        params: Dict[str, Any] = {}
+        if fields:
+            params["fields"] = list(fields)
+        if not include_jws:
+            params["include_jws"] = "false"
+        # Each projection is cached under its own validator
+        key = str(artifact_id)
+        if params:
+            key += "?" + str(httpx.QueryParams(params))
+        headers = {"X-Workspace-ID": str(self.workspace_id)}
+        cached = self._validators.get(key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        
         response = self.client.get(
             f"{self.base_url}/artifacts/{artifact_id}",
-            headers={"X-Workspace-ID": str(self.workspace_id)}
+            params=params,
+            headers=headers
         )
+        if response.status_code == 304 and cached:
+            self._validators.move_to_end(key)
+            return cached[1]
         response.raise_for_status()
         
-        return response.json()
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag and self.cache_size > 0:
+            self._validators[key] = (etag, data)
+            self._validators.move_to_end(key)
+            while len(self._validators) > self.cache_size:
+                self._validators.popitem(last=False)
+        
+        return data
     
     async def verify_artifact(
         self,
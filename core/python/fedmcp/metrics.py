@@ -0,0 +1,273 @@
+"""
+In-process metrics with Prometheus text exposition
+
+A deliberately small subset of the Prometheus client: labelled counters,
+gauges and fixed-bucket histograms kept in a ``MetricsRegistry`` and rendered in the
+text format (version 0.0.4). There are no dependencies, recording a sample
+costs one dict lookup and a bisect under a lock, and each process keeps its
+own values (scrape every worker, or let Prometheus sum them).
+
+``FedMCPMetrics`` declares the stages every FedMCP component reports: signing,
+verification, storage reads and writes, audit appends and request handling.
+The reference server and ``BaseConnector`` both record through it, so
+dashboards work the same against either.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond signing up to multi-second S3 calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {list(self.labelnames)}, got {sorted(labels)}")
+        try:
+            return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            raise ValueError(f"{self.name} expects labels {list(self.labelnames)}, got {sorted(labels)}")
+
+    def _pairs(self, key: Tuple[str, ...]) -> List[Tuple[str, str]]:
+        return list(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self._pairs(k))} {_format_value(v)}" for k, v in values]
+
+
+class Gauge(_Metric):
+    """Value per label set that can go up and down (a queue depth, a lag)"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self._pairs(k))} {_format_value(v)}" for k, v in values]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observations over fixed buckets per label set
+
+    Args:
+        buckets: Upper bounds, ascending; ``+Inf`` is implied
+    """
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        if list(buckets) != sorted(buckets) or not buckets:
+            raise ValueError("Histogram buckets must be a non-empty ascending sequence")
+        self.buckets = tuple(float(b) for b in buckets)
+        # Per label set: a count per bucket (plus +Inf), then the sum
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels: str) -> "_Timer":
+        """Observe the wall time of a ``with`` block (also when it raises)"""
+        self._key(labels)
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(sum(series[:-1])) if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in snapshot:
+            pairs = self._pairs(key)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(pairs + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {_format_value(cumulative)}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class MetricsRegistry:
+    """Named metrics rendered together; declaring a metric twice returns the first"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._declare(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._declare(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._declare(Histogram, name, help, labelnames, buckets=buckets)
+
+    def _declare(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+                return metric
+        if type(existing) is not cls or existing.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} is already registered with a different type or labels")
+        return existing
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class FedMCPMetrics:
+    """
+    The stage metrics shared by the server and connectors
+
+    Args:
+        registry: Where to declare them (defaults to the process-wide ``REGISTRY``)
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry if registry is not None else REGISTRY
+        declare = self.registry
+        self.sign_seconds = declare.histogram(
+            "fedmcp_sign_seconds", "Time spent signing artifacts", ["signer"]
+        )
+        self.verify_seconds = declare.histogram(
+            "fedmcp_verify_seconds", "Time spent verifying JWS tokens", ["signer"]
+        )
+        self.storage_seconds = declare.histogram(
+            "fedmcp_storage_seconds", "Time spent in artifact storage calls", ["backend", "operation"]
+        )
+        self.audit_append_seconds = declare.histogram(
+            "fedmcp_audit_append_seconds", "Time spent appending audit events", ["sink"]
+        )
+        self.request_seconds = declare.histogram(
+            "fedmcp_request_seconds", "Request handling time", ["endpoint", "method"]
+        )
+        self.requests_total = declare.counter(
+            "fedmcp_requests_total", "Requests handled", ["endpoint", "method", "status"]
+        )
+        self.artifacts_signed_total = declare.counter(
+            "fedmcp_artifacts_signed_total", "Artifacts signed", ["signer"]
+        )
+        self.errors_total = declare.counter(
+            "fedmcp_errors_total", "Failed stage calls", ["stage"]
+        )
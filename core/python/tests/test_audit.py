@@ -0,0 +1,79 @@
+import json
+from datetime import timezone
+from uuid import UUID, uuid4
+from fedmcp import AuditEvent, AuditAction, AuditRecord
+from fedmcp.audit import POSTGRES_COLUMNS, records_to_ndjson, records_to_rows
+
+
+def test_postgres_row_timestamp():
+    """Test that to_postgres_row parses the event timestamp"""
+    event = AuditEvent(action=AuditAction.CREATE, actor="user:alice", workspaceId=uuid4())
+    row = event.to_postgres_row()
+    assert row["timestamp"].tzinfo is not None
+    assert event.timestamp.endswith("Z")
+
+    legacy = event.model_copy(update={"timestamp": "2025-01-15T00:00:00.000001+00:00Z"})
+    assert legacy.to_postgres_row()["timestamp"].microsecond == 1
+
+
+def test_record_timestamps_are_monotonic():
+    """Test that records created back to back never share a timestamp"""
+    workspace_id = uuid4()
+    records = [AuditRecord(AuditAction.READ, "user:alice", workspace_id) for _ in range(1000)]
+    stamps = [r.ts_ns for r in records]
+    assert stamps == sorted(stamps)
+    assert len(set(stamps)) == len(stamps)
+
+
+def test_record_matches_audit_event():
+    """Test that a record round-trips through AuditEvent"""
+    record = AuditRecord(
+        AuditAction.READ,
+        'user:"quoted"',
+        uuid4(),
+        artifact_id=uuid4(),
+        metadata={"notModified": True},
+        ip_address="10.0.0.1"
+    )
+    event = record.to_event()
+    assert event.model_dump(by_alias=True, mode="json") == record.to_dict()
+    assert (event.workspaceId, event.artifactId) == (UUID(record.workspace_id), UUID(record.artifact_id))
+    assert record.id.version == 4
+    assert AuditRecord.from_event(event).to_dict() == record.to_dict()
+
+
+def test_batch_ndjson_matches_cloudwatch_format():
+    """Test that the batch encoder emits the same objects as to_cloudwatch_log"""
+    workspace_id = uuid4()
+    records = [
+        AuditRecord(AuditAction.READ, "user:alice", workspace_id, artifact_id=uuid4()),
+        AuditRecord(AuditAction.CREATE, "user:bob\n", workspace_id, metadata={"k": [1, 2]}),
+    ]
+    lines = records_to_ndjson(records).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        r.to_event().to_cloudwatch_log() for r in records
+    ]
+
+
+def test_batch_ndjson_escapes_ids():
+    """Test that IDs are JSON-encoded, not pasted into the line"""
+    record = AuditRecord(
+        AuditAction.READ, "user:alice", 'ws-1","actor":"root', artifact_id='a\\"1'
+    )
+    (line,) = records_to_ndjson([record]).decode().splitlines()
+    parsed = json.loads(line)
+    assert parsed["workspaceId"] == 'ws-1","actor":"root'
+    assert parsed["artifactId"] == 'a\\"1'
+    assert parsed["actor"] == "user:alice"
+
+
+def test_batch_rows():
+    """Test row tuples line up with POSTGRES_COLUMNS"""
+    record = AuditRecord(AuditAction.VERIFY, "user:alice", uuid4(), artifact_id=uuid4())
+    (row,) = records_to_rows([record])
+    values = dict(zip(POSTGRES_COLUMNS, row))
+    assert values["id"] == str(record.id)
+    assert values["timestamp"] == record.to_datetime()
+    assert values["timestamp"].tzinfo == timezone.utc
+    assert values["action"] == "verify"
+    assert values["artifact_id"] == record.artifact_id
@@ -0,0 +1,71 @@
+import pytest
+from uuid import uuid4
+from fedmcp import AuditEvent, AuditAction, AuditCheckpoint, LocalSigner, Verifier, verify_chain
+from fedmcp.audit_chain import GENESIS_HASH, link_event
+
+
+def _chain(count: int, start_sequence: int = 0, head: str = GENESIS_HASH):
+    events = []
+    workspace_id = uuid4()
+    for n in range(count):
+        event = AuditEvent(action=AuditAction.READ, actor=f"user:{n}", workspaceId=workspace_id)
+        linked = link_event(event.model_dump(by_alias=True, mode="json"), head, start_sequence + n + 1)
+        head = linked["eventHash"]
+        events.append(linked)
+    return events
+
+
+def test_verify_chain_from_genesis():
+    """Test verifying an untouched chain"""
+    events = _chain(5)
+    result = verify_chain(events)
+    assert result.sequence == 5
+    assert result.hash == events[-1]["eventHash"]
+    assert result.events_verified == 5
+
+
+def test_verify_chain_detects_tampering():
+    """Test that altered, dropped, and reordered events are caught"""
+    events = _chain(5)
+
+    altered = [dict(e) for e in events]
+    altered[2]["actor"] = "user:mallory"
+    with pytest.raises(ValueError, match="altered"):
+        verify_chain(altered)
+
+    with pytest.raises(ValueError, match="gap"):
+        verify_chain(events[:2] + events[3:])
+
+    with pytest.raises(ValueError, match="gap"):
+        verify_chain([events[1], events[0]] + events[2:])
+
+
+def test_verify_since_signed_checkpoint():
+    """Test incremental verification starting from a signed checkpoint"""
+    signer = LocalSigner()
+    verifier = Verifier()
+    verifier.add_public_key(signer.get_key_id(), signer.private_key.public_key())
+
+    events = _chain(10)
+    checkpoint = AuditCheckpoint.create(signer, "primary", 8, events[7]["eventHash"])
+    trusted = AuditCheckpoint.from_jws(checkpoint.jws, verifier)
+    assert trusted.sequence == 8
+
+    result = verify_chain(events[8:], since=trusted)
+    assert result.sequence == 10
+    assert result.events_verified == 2
+
+    # The first event after a checkpoint must link to its hash
+    forged = AuditCheckpoint(stream="primary", sequence=8, hash="f" * 64)
+    with pytest.raises(ValueError, match="prevHash"):
+        verify_chain(events[8:], since=forged)
+
+
+def test_verify_until_checkpoint():
+    """Test that a chain must pass through a closing checkpoint"""
+    events = _chain(6)
+    until = AuditCheckpoint(stream="primary", sequence=4, hash=events[3]["eventHash"])
+    assert verify_chain(events, until=until).sequence == 6
+
+    with pytest.raises(ValueError, match="before checkpoint"):
+        verify_chain(events[:3], until=until)
@@ -0,0 +1,64 @@
+import asyncio
+from uuid import uuid4
+
+import httpx
+
+from fedmcp import FedMCPClient
+
+
+def _client_with(handler, **kwargs) -> FedMCPClient:
+    client = FedMCPClient(base_url="http://fedmcp.test", workspace_id=uuid4(), **kwargs)
+    client.client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_get_artifact_revalidates_with_etag():
+    """Test that a cached artifact is revalidated and reused on 304"""
+    artifact_id = uuid4()
+    body = {"artifact": {"id": str(artifact_id)}, "jws": "a.b.c"}
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"abc123"':
+            return httpx.Response(304, headers={"ETag": '"abc123"'})
+        return httpx.Response(200, json=body, headers={"ETag": '"abc123"'})
+
+    with _client_with(handler) as client:
+        first = asyncio.run(client.get_artifact(artifact_id))
+        second = asyncio.run(client.get_artifact(artifact_id))
+
+    assert first == body
+    assert second == body
+    assert seen == [None, '"abc123"']
+
+
+def test_get_artifact_cache_is_bounded():
+    """Test that the validator cache evicts least recently used entries"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        artifact_id = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200, json={"id": artifact_id}, headers={"ETag": f'"{artifact_id}"'})
+
+    ids = [uuid4() for _ in range(3)]
+    with _client_with(handler, cache_size=2) as client:
+        for artifact_id in ids:
+            asyncio.run(client.get_artifact(artifact_id))
+
+        assert list(client._validators) == [str(ids[1]), str(ids[2])]
+
+
+def test_get_artifact_projection():
+    """Test that fields and include_jws are sent and cached per projection"""
+    artifact_id = uuid4()
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.url.params.get_list("fields"), request.url.params.get("include_jws")))
+        return httpx.Response(200, json={"artifact": {"jsonBody": {"name": "x"}}}, headers={"ETag": '"p1"'})
+
+    with _client_with(handler) as client:
+        asyncio.run(client.get_artifact(artifact_id, fields=["jsonBody.name", "/jsonBody/version"], include_jws=False))
+        asyncio.run(client.get_artifact(artifact_id))
+
+        assert seen == [(["jsonBody.name", "/jsonBody/version"], "false"), ([], None)]
+        assert len(client._validators) == 2
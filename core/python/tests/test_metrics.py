@@ -0,0 +1,64 @@
+import pytest
+from fedmcp import FedMCPMetrics, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that rendered buckets count observations at or below each bound"""
+    registry = MetricsRegistry()
+    latency = registry.histogram("op_seconds", "Op latency", ["op"], buckets=[0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.observe(value, op="read")
+
+    text = registry.render()
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{op="read",le="0.1"} 2' in text
+    assert 'op_seconds_bucket{op="read",le="1"} 3' in text
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in text
+    assert 'op_seconds_sum{op="read"} 2.65' in text
+    assert 'op_seconds_count{op="read"} 4' in text
+
+
+def test_histogram_times_failing_blocks():
+    """Test that time() records a sample even when the block raises"""
+    latency = MetricsRegistry().histogram("op_seconds", "Op latency", ["op"])
+    with pytest.raises(RuntimeError):
+        with latency.time(op="sign"):
+            raise RuntimeError("boom")
+    assert latency.count(op="sign") == 1
+    assert latency.count(op="verify") == 0
+
+
+def test_counter_labels_and_escaping():
+    """Test counters reject unknown labels and escape label values"""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["endpoint"])
+    requests.inc(endpoint='/a"b')
+    requests.inc(2, endpoint='/a"b')
+    assert requests.value(endpoint='/a"b') == 3
+    assert 'requests_total{endpoint="/a\\"b"} 3' in registry.render()
+
+    with pytest.raises(ValueError):
+        requests.inc(path="/a")
+    with pytest.raises(ValueError):
+        requests.inc(-1, endpoint="/a")
+
+
+def test_shared_stage_metrics():
+    """Test that FedMCPMetrics instances on one registry share series"""
+    registry = MetricsRegistry()
+    first, second = FedMCPMetrics(registry), FedMCPMetrics(registry)
+    first.sign_seconds.observe(0.002, signer="local")
+    assert second.sign_seconds.count(signer="local") == 1
+
+    with pytest.raises(ValueError):
+        registry.counter("fedmcp_sign_seconds", "Not a histogram", ["signer"])
+
+
+def test_gauge_goes_up_and_down():
+    """Test that gauges keep the last value set"""
+    registry = MetricsRegistry()
+    depth = registry.gauge("queue_depth", "Queued jobs")
+    depth.set(5)
+    depth.set(2)
+    assert depth.value() == 2
+    assert "# TYPE queue_depth gauge\nqueue_depth 2\n" in registry.render()
@@ -0,0 +1,152 @@
+"""
+Benchmark: serving stored artifacts
+
+Compares the old ``GET /artifacts/{id}`` path (load JSON, return a dict,
+let FastAPI re-encode it) with returning the stored bytes, which is what the
+server does now, and with handing the file to ``FileResponse``. The ASGI app
+is driven directly so the numbers reflect server-side cost only.
+
+``FileResponse`` is kept as a reference point: below the 1 MiB artifact cap
+its stat/open/threadpool overhead costs more than one ``read_bytes()``.
+
+    python benchmarks/bench_artifact_serving.py [--iterations N] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi import FastAPI, Response
+from fastapi.responses import FileResponse
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.storage import LocalStorage  # noqa: E402
+
+SIZES = [1024, 16 * 1024, 256 * 1024, 1024 * 1024 - 4096]
+
+
+def build_app(storage: LocalStorage) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/parse/{artifact_id}")
+    async def parse(artifact_id: str):
+        return await storage.get_artifact(artifact_id)
+
+    @app.get("/bytes/{artifact_id}")
+    async def raw(artifact_id: str):
+        stored = await storage.open_artifact(artifact_id)
+        return Response(content=stored.body, media_type="application/json")
+
+    @app.get("/file/{artifact_id}")
+    async def file(artifact_id: str):
+        return FileResponse(storage.path / f"{artifact_id}.json", media_type="application/json")
+
+    return app
+
+
+def make_record(size: int) -> dict:
+    """Build a stored record whose jsonBody is roughly ``size`` bytes"""
+    # Many small fields rather than one large string, like real artifacts
+    fields = max(1, size // 64)
+    body = {f"field_{i:06d}": "x" * 40 for i in range(fields)}
+    return {
+        "artifact": {
+            "id": str(uuid4()),
+            "type": "agent_recipe",
+            "version": 1,
+            "workspaceId": str(uuid4()),
+            "createdAt": "2025-01-15T00:00:00+00:00Z",
+            "jsonBody": body,
+        },
+        "jws": "e30." + "a" * 600 + ".sig",
+    }
+
+
+async def call(app: FastAPI, path: str) -> int:
+    """Issue a single GET against the ASGI app and return the body length"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "headers": [], "server": ("bench", 80), "client": ("bench", 1),
+    }
+    received = False
+    length = 0
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.sleep(3600)
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal length
+        if message["type"] == "http.response.body":
+            length += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return length
+
+
+async def run(iterations: int) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = LocalStorage(tmp)
+        app = build_app(storage)
+        for size in SIZES:
+            record = make_record(size)
+            artifact_id = record["artifact"]["id"]
+            await storage.store_artifact(artifact_id, record)
+            stored_size = (Path(tmp) / f"{artifact_id}.json").stat().st_size
+            for mode in ("parse", "bytes", "file"):
+                path = f"/{mode}/{artifact_id}"
+                for _ in range(min(20, iterations)):
+                    await call(app, path)
+                latencies = []
+                cpu_start = time.process_time()
+                wall_start = time.perf_counter()
+                for _ in range(iterations):
+                    t0 = time.perf_counter()
+                    await call(app, path)
+                    latencies.append(time.perf_counter() - t0)
+                wall = time.perf_counter() - wall_start
+                cpu = time.process_time() - cpu_start
+                latencies.sort()
+                results.append({
+                    "mode": mode,
+                    "size_bytes": stored_size,
+                    "iterations": iterations,
+                    "p50_us": statistics.median(latencies) * 1e6,
+                    "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+                    "cpu_us_per_req": cpu / iterations * 1e6,
+                    "req_per_s": iterations / wall,
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--json", dest="json_path", help="Write raw results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.iterations))
+
+    print(f"{'size':>10} {'mode':>6} {'p50 us':>10} {'p99 us':>10} {'cpu us/req':>11} {'req/s':>9}")
+    for r in results:
+        print(
+            f"{r['size_bytes']:>10} {r['mode']:>6} {r['p50_us']:>10.1f} {r['p99_us']:>10.1f}"
+            f" {r['cpu_us_per_req']:>11.1f} {r['req_per_s']:>9.0f}"
+        )
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
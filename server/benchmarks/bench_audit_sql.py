@@ -0,0 +1,78 @@
+"""
+Benchmark: relational audit inserts by batch size
+
+Writes the same rows through ``SQLiteAuditWriter`` one transaction per
+batch, at batch sizes 1 (a commit per event, what a synchronous insert in
+the request path costs), 100 and 10,000 (``RelationalAuditSink``'s default
+ceiling), and reports rows per second.
+
+    python benchmarks/bench_audit_sql.py [--rows N] [--json out.json]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.audit_sql import SQLiteAuditWriter  # noqa: E402
+
+BATCH_SIZES = [1, 100, 10_000]
+ACTIONS = ["create", "read", "verify", "sign"]
+
+
+def make_rows(count: int):
+    t0 = datetime.now(timezone.utc)
+    workspace = str(uuid4())
+    return [
+        (
+            str(uuid4()),
+            t0 + timedelta(microseconds=n),
+            ACTIONS[n % len(ACTIONS)],
+            f"user:{n % 50}",
+            str(uuid4()),
+            workspace,
+            {"path": "/artifacts"} if n % 3 == 0 else {},
+            "10.0.0.1",
+            None,
+            None,
+        )
+        for n in range(count)
+    ]
+
+
+def run(batch_size: int, rows) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = SQLiteAuditWriter(str(Path(tmp) / "audit.db"))
+        start = time.perf_counter()
+        for i in range(0, len(rows), batch_size):
+            writer.write_rows(rows[i:i + batch_size])
+        elapsed = time.perf_counter() - start
+        writer.close()
+    return len(rows) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    results = []
+    print(f"{'batch':>8} {'rows/s':>12}")
+    for batch_size in BATCH_SIZES:
+        rate = run(batch_size, rows)
+        results.append({"batch_size": batch_size, "rows": len(rows), "rows_per_second": round(rate)})
+        print(f"{batch_size:>8} {rate:>12,.0f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Load test: mixed create/get/verify/list traffic against the reference server
+
+Drives ``src/fedmcp_server.py`` either in-process (through
+``httpx.ASGITransport``, with the app's lifespan running) or over HTTP at
+``--url``. Create requests use the artifacts in ``examples/healthcare`` as
+templates; get and verify requests pick from artifacts created during a
+seeding phase and during the run.
+
+With ``--rps`` requests are started on a fixed schedule (open loop) and
+latency is measured from the scheduled start, so a stalled server shows up
+as latency rather than as fewer requests. Without it, ``--concurrency``
+workers send back to back (closed loop).
+
+For in-process runs the server reads its usual environment
+(``STORAGE_TYPE``, ``SIGNING_TYPE``, ...); ``LOCAL_STORAGE_PATH`` defaults
+to a temporary directory. Both are recorded in the JSON output so runs
+against different backends and signers can be compared.
+
+    python benchmarks/bench_load.py [--url http://localhost:8000] [--duration 10]
+        [--rps 200] [--concurrency 16] [--mix create=2,get=5,verify=2,list=1]
+        [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+SERVER_DIR = Path(__file__).parent.parent
+# The core library from this checkout, ahead of the server's own ``fedmcp`` package
+CORE_DIR = SERVER_DIR.parent / "core" / "python"
+TEMPLATE_DIR = SERVER_DIR.parent / "examples" / "healthcare"
+ENDPOINTS = ("create", "get", "verify", "list")
+DEFAULT_MIX = "create=2,get=5,verify=2,list=1"
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """``create=2,get=5`` -> relative weights per endpoint"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; expected one of {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one endpoint with a positive weight")
+    return mix
+
+
+def load_templates(path: Path) -> List[Dict[str, Any]]:
+    templates = [json.loads(f.read_text()) for f in sorted(path.glob("*.json"))]
+    if not templates:
+        raise ValueError(f"No artifact templates in {path}")
+    return templates
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LoadTest:
+    """Workload state shared by the workers"""
+
+    def __init__(self, client: httpx.AsyncClient, templates: List[Dict[str, Any]], mix: Dict[str, float]):
+        self.client = client
+        self.templates = templates
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.created: List[Dict[str, str]] = []
+        self.latencies: Dict[str, List[float]] = {name: [] for name in ENDPOINTS}
+        self.statuses: Dict[str, Dict[str, int]] = {name: {} for name in ENDPOINTS}
+
+    async def create(self) -> httpx.Response:
+        artifact = dict(random.choice(self.templates))
+        response = await self.client.post("/artifacts", json={"artifact": artifact})
+        if response.status_code == 200:
+            body = response.json()
+            self.created.append({
+                "id": body["artifact_id"], "jws": body["jws"], "workspace": body["workspace_id"]
+            })
+        return response
+
+    async def get(self) -> httpx.Response:
+        return await self.client.get(f"/artifacts/{random.choice(self.created)['id']}")
+
+    async def verify(self) -> httpx.Response:
+        return await self.client.post("/artifacts/verify", json={"jws": random.choice(self.created)["jws"]})
+
+    async def list(self) -> httpx.Response:
+        workspace = random.choice(self.created)["workspace"]
+        return await self.client.get("/artifacts", params={"workspace_id": workspace})
+
+    async def request(self, started: Optional[float] = None) -> None:
+        """One request of a randomly chosen kind, timed from ``started``"""
+        name = random.choices(self.names, self.weights)[0]
+        started = started if started is not None else time.perf_counter()
+        try:
+            status = str((await getattr(self, name)()).status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.latencies[name].append(time.perf_counter() - started)
+        self.statuses[name][status] = self.statuses[name].get(status, 0) + 1
+
+    async def closed_loop(self, concurrency: int, deadline: float) -> None:
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self.request()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def open_loop(self, rps: float, concurrency: int, deadline: float) -> None:
+        slots = asyncio.Semaphore(concurrency)
+        pending = set()
+
+        async def scheduled(at: float):
+            async with slots:
+                await self.request(started=at)
+
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            at = start + sent / rps
+            if at >= deadline:
+                break
+            delay = at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.ensure_future(scheduled(at))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            sent += 1
+        await asyncio.gather(*pending)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        for name in ENDPOINTS:
+            ordered = sorted(self.latencies[name])
+            if not ordered:
+                continue
+            endpoints[name] = {
+                "requests": len(ordered),
+                "req_per_s": len(ordered) / elapsed,
+                "p50_ms": percentile(ordered, 50) * 1e3,
+                "p95_ms": percentile(ordered, 95) * 1e3,
+                "p99_ms": percentile(ordered, 99) * 1e3,
+                "max_ms": ordered[-1] * 1e3,
+                "statuses": self.statuses[name],
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        return {"elapsed_s": elapsed, "requests": total, "req_per_s": total / elapsed, "endpoints": endpoints}
+
+
+@asynccontextmanager
+async def in_process_client(token: str) -> AsyncIterator[httpx.AsyncClient]:
+    """Client for a fresh in-process server, lifespan included"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("LOCAL_STORAGE_PATH", tmp)
+        sys.path.insert(0, str(CORE_DIR))
+        sys.path.append(str(SERVER_DIR))
+        from src.fedmcp_server import app  # noqa: E402 - reads the environment at import
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", headers={"Authorization": f"Bearer {token}"}
+            ) as client:
+                yield client
+
+
+@asynccontextmanager
+async def http_client(url: str, token: str, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=url, headers={"Authorization": f"Bearer {token}"}, limits=limits, timeout=30.0
+    ) as client:
+        yield client
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    templates = load_templates(Path(args.templates))
+    random.seed(args.random_seed)
+    if args.url:
+        connect = http_client(args.url, args.token, args.concurrency)
+    else:
+        connect = in_process_client(args.token)
+
+    async with connect as client:
+        test = LoadTest(client, templates, mix)
+        for _ in range(args.seed):
+            response = await test.create()
+            response.raise_for_status()
+        # Seeding requests are not part of the measurement
+        test.latencies = {name: [] for name in ENDPOINTS}
+        test.statuses = {name: {} for name in ENDPOINTS}
+
+        start = time.perf_counter()
+        deadline = start + args.duration
+        if args.rps:
+            await test.open_loop(args.rps, args.concurrency, deadline)
+        else:
+            await test.closed_loop(args.concurrency, deadline)
+        result = test.report(time.perf_counter() - start)
+
+    result["config"] = {
+        "target": args.url or "in-process",
+        "storage_type": os.getenv("STORAGE_TYPE", "local") if not args.url else None,
+        "signing_type": os.getenv("SIGNING_TYPE", "local") if not args.url else None,
+        "label": args.label,
+        "duration_s": args.duration,
+        "rps": args.rps,
+        "concurrency": args.concurrency,
+        "mix": mix,
+        "seed_artifacts": args.seed,
+        "templates": [t["type"] for t in templates],
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Server to load (default: the app in-process)")
+    parser.add_argument("--token", default="bench-token", help="Bearer token to send")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of measured load")
+    parser.add_argument("--rps", type=float, default=0.0, help="Target request rate (0: as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at most")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Relative weights per endpoint")
+    parser.add_argument("--seed", type=int, default=20, help="Artifacts created before measuring")
+    parser.add_argument("--templates", default=str(TEMPLATE_DIR), help="Directory of artifact JSON templates")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--label", help="Free-form label stored with the results")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+    if args.seed < 1:
+        parser.error("--seed must be at least 1 so get/verify/list have artifacts to use")
+
+    result = asyncio.run(run(args))
+
+    print(f"{result['requests']} requests in {result['elapsed_s']:.1f}s ({result['req_per_s']:.0f} req/s)")
+    print(f"{'endpoint':>8} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for name, e in result["endpoints"].items():
+        print(
+            f"{name:>8} {e['requests']:>9} {e['req_per_s']:>8.1f} {e['p50_ms']:>8.2f}"
+            f" {e['p95_ms']:>8.2f} {e['p99_ms']:>8.2f}  {e['statuses']}"
+        )
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
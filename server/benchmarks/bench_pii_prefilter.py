@@ -0,0 +1,111 @@
+"""
+Benchmark: PII pre-filter accuracy and cost
+
+Scores ``needs_ner`` against a reference on the bundled corpus
+(``tests/data/pii_corpus.jsonl``). The reference is the corpus labels by
+default, or a live Presidio ``AnalyzerEngine`` with ``--presidio`` (needs
+presidio-analyzer and en_core_web_sm). Recall is the share of texts with
+PII that the filter sends to NER; precision and the skip rate show how much
+NER work is saved.
+
+The corpus labels were written by hand alongside the filter, so scores
+against them only show the filter still handles the cases it was built
+for. They say nothing about agreement with Presidio on real traffic: for
+that, run with ``--presidio``, ideally on a corpus sampled from your own
+request bodies. No Presidio miss rate has been measured for the bundled
+corpus.
+
+Known blind spot: a lowercase name in free text ("met with maria lopez")
+has no capital, title or name field to key on, so it passes as clean. The
+benchmark checks the examples in ``BLIND_SPOTS`` and reports any that the
+filter still lets through.
+
+    python benchmarks/bench_pii_prefilter.py [--presidio] [--corpus FILE] [--json out.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.pii_prefilter import needs_ner  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).parent.parent / "tests" / "data" / "pii_corpus.jsonl"
+
+# PII the filter is known to skip; not in the corpus, which would hide them in recall
+BLIND_SPOTS = [
+    '{"note": "met with maria lopez about the refill"}',
+    '{"message": "please forward this to john smith in billing"}',
+]
+
+
+def load_corpus(path: Path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def presidio_labels(texts):
+    from presidio_analyzer import AnalyzerEngine
+    from presidio_analyzer.nlp_engine import SpacyNlpEngine
+
+    nlp_engine = SpacyNlpEngine()
+    nlp_engine.load({"en": "en_core_web_sm"})
+    analyzer = AnalyzerEngine(nlp_engine=nlp_engine, supported_languages=["en"])
+    start = time.perf_counter()
+    labels = [bool(analyzer.analyze(text, language="en")) for text in texts]
+    return labels, (time.perf_counter() - start) / len(texts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--presidio", action="store_true", help="Use a live analyzer as the reference")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    texts = [entry["text"] for entry in corpus]
+    ner_seconds = None
+    if args.presidio:
+        reference, ner_seconds = presidio_labels(texts)
+    else:
+        reference = [entry["pii"] for entry in corpus]
+
+    start = time.perf_counter()
+    rounds = 200
+    for _ in range(rounds):
+        predicted = [needs_ner(text) for text in texts]
+    filter_seconds = (time.perf_counter() - start) / (rounds * len(texts))
+
+    tp = sum(p and r for p, r in zip(predicted, reference))
+    fp = sum(p and not r for p, r in zip(predicted, reference))
+    fn = sum(r and not p for p, r in zip(predicted, reference))
+    results = {
+        "texts": len(texts),
+        "reference": "presidio" if args.presidio else "hand labels",
+        "precision": round(tp / (tp + fp), 4) if tp + fp else 1.0,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else 1.0,
+        "skip_rate": round(predicted.count(False) / len(texts), 4),
+        "filter_us_per_text": round(filter_seconds * 1e6, 2),
+        "ner_us_per_text": round(ner_seconds * 1e6, 1) if ner_seconds else None,
+        "blind_spots_skipped": sum(not needs_ner(text) for text in BLIND_SPOTS),
+    }
+    for key, value in results.items():
+        print(f"{key:>20}: {value}")
+    if not args.presidio:
+        print("  (scored against the hand-written labels only; no miss rate against Presidio was measured)")
+    for text, p, r in zip(texts, predicted, reference):
+        if r and not p:
+            print(f"  missed: {text}")
+    for text in BLIND_SPOTS:
+        if not needs_ner(text):
+            print(f"  known blind spot, passes as clean: {text}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
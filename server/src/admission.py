@@ -0,0 +1,268 @@
+"""
+Admission control: per-workspace and per-actor rate limits, fair queueing
+
+Two mechanisms keep one busy workspace from starving the rest:
+
+* ``TokenBuckets`` -- a token bucket per key (workspace ID or actor) kept in
+  ``SharedState``, so every worker on the host draws from the same bucket.
+  A worker takes tokens in leases (one shared read-modify-write per
+  ``lease`` requests, run on a thread so a busy SQLite lock never stalls
+  the event loop) and serves from its lease in memory, which keeps the
+  per-request cost to a dict lookup.
+* ``FairScheduler`` -- a per-worker limit on requests in progress. When it
+  is reached, waiters queue per workspace and freed slots go round-robin
+  across workspaces, so a workspace with a thousand queued requests waits
+  its turn behind one with a single request.
+
+``AdmissionController.admit`` combines them: it waits up to ``max_wait``
+for tokens and a slot, otherwise raises ``RateLimited`` carrying the
+seconds after which a retry can succeed (the server's ``Retry-After``).
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+BUCKET_STATE_PREFIX = "ratelimit:"
+
+# Smallest default lease: fewer tokens per shared write would make small
+# buckets cost a cross-process write lock per request
+MIN_LEASE = 5
+
+
+class RateLimited(Exception):
+    """
+    A request was refused
+
+    ``scope`` names the limit (``workspace``, ``actor``, ``queue`` or
+    ``capacity``); ``retry_after`` is in seconds.
+    """
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Too many requests: {scope} limit reached")
+        self.scope = scope
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBuckets:
+    """
+    Shared token buckets, one per key
+
+    Args:
+        state: ``SharedState`` holding the buckets
+        name: Namespace for the keys (e.g. ``workspace``)
+        rate: Tokens added per second
+        burst: Bucket capacity
+        lease: Tokens a worker takes from the shared bucket at once
+            (default: a tenth of ``burst``, at least ``MIN_LEASE`` and at
+            most 20, never more than ``burst``)
+    """
+
+    def __init__(self, state: Any, name: str, rate: float, burst: float, lease: Optional[int] = None):
+        if rate <= 0 or burst < 1:
+            raise ValueError("Token buckets need rate > 0 and burst >= 1")
+        self.state = state
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        if lease is None:
+            lease = min(int(burst), max(MIN_LEASE, min(20, int(burst) // 10)))
+        self.lease = lease
+        # Idle buckets refill completely after this long, so they can expire
+        self.ttl = burst / rate + 1
+        self._leased: Dict[str, int] = {}
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """Take a token: 0.0 if granted, else seconds until one is available"""
+        if self._from_lease(key):
+            return 0.0
+        return self._grant(key, *self._draw(key, now if now is not None else time.time()))
+
+    async def take_async(self, key: str) -> float:
+        """``take`` with the shared read-modify-write on a worker thread"""
+        if self._from_lease(key):
+            return 0.0
+        return self._grant(key, *await asyncio.to_thread(self._draw, key, time.time()))
+
+    def _from_lease(self, key: str) -> bool:
+        leased = self._leased.get(key, 0)
+        if not leased:
+            return False
+        self._leased[key] = leased - 1
+        return True
+
+    def _draw(self, key: str, now: float) -> Tuple[int, float]:
+        """Take up to a lease from the shared bucket: (tokens granted, seconds to wait if none)"""
+        outcome = {"granted": 0, "wait": 0.0}
+
+        def refill(bucket: Optional[List[float]]) -> List[float]:
+            tokens, updated = bucket if bucket else (self.burst, now)
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+            granted = min(self.lease, int(tokens))
+            if granted == 0:
+                outcome["wait"] = (1 - tokens) / self.rate
+            outcome["granted"] = granted
+            return [tokens - granted, now]
+
+        self.state.update(f"{BUCKET_STATE_PREFIX}{self.name}:{key}", refill, ttl=self.ttl)
+        return outcome["granted"], outcome["wait"]
+
+    def _grant(self, key: str, granted: int, wait: float) -> float:
+        if not granted:
+            # Another request may have leased tokens while this one drew
+            return 0.0 if self._from_lease(key) else wait
+        if len(self._leased) > 10_000:
+            # Forgetting leases only under-admits, never over-admits
+            self._leased.clear()
+        # Add to what other requests leased while this one drew
+        self._leased[key] = self._leased.get(key, 0) + granted - 1
+        return 0.0
+
+    def refund(self, key: str) -> None:
+        """Return a token taken by ``take`` that went unused"""
+        self._leased[key] = self._leased.get(key, 0) + 1
+
+
+class FairScheduler:
+    """
+    Limit on requests in progress, handed out round-robin across keys
+
+    Args:
+        max_concurrent: Requests allowed in progress at once
+        max_queued: Waiters allowed per key before new ones are refused
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int = 100):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.running = 0
+        # Keys with waiters, in the order they will next be served
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    def queued(self, key: Optional[str] = None) -> int:
+        if key is not None:
+            return len(self._queues.get(key, ()))
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, key: str, timeout: float) -> None:
+        """
+        Wait for a slot
+
+        Raises:
+            RateLimited: If the key's queue is full or no slot frees up in time
+        """
+        if self.running < self.max_concurrent and not self._queues:
+            self.running += 1
+            return
+        if len(self._queues.get(key, ())) >= self.max_queued:
+            raise RateLimited("queue", 1.0)
+        queue = self._queues.setdefault(key, deque())
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self._discard(key, waiter)
+            raise RateLimited("capacity", 1.0)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self.release()
+            self._discard(key, waiter)
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it to the next key in turn if any is waiting"""
+        while self._queues:
+            key, queue = self._queues.popitem(last=False)
+            waiter = queue.popleft()
+            if queue:
+                self._queues[key] = queue
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    def _discard(self, key: str, waiter: asyncio.Future) -> None:
+        queue = self._queues.get(key)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[key]
+
+
+class AdmissionController:
+    """
+    Rate limits plus fair scheduling for one class of requests
+
+    Args:
+        workspace: Buckets keyed by workspace ID, or ``None``
+        actor: Buckets keyed by actor, or ``None``
+        scheduler: Concurrency limit, or ``None``
+        max_wait: Longest a request queues before it is refused
+    """
+
+    def __init__(
+        self,
+        workspace: Optional[TokenBuckets] = None,
+        actor: Optional[TokenBuckets] = None,
+        scheduler: Optional[FairScheduler] = None,
+        max_wait: float = 1.0
+    ):
+        self.workspace = workspace
+        self.actor = actor
+        self.scheduler = scheduler
+        self.max_wait = max_wait
+
+    async def _take(self, buckets: TokenBuckets, key: str, deadline: float) -> None:
+        while True:
+            wait = await buckets.take_async(key)
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimited(buckets.name, wait)
+            await asyncio.sleep(wait)
+
+    def _refund(self, actor: str, workspace_id: Optional[str] = None) -> None:
+        if self.actor:
+            self.actor.refund(actor)
+        if self.workspace and workspace_id is not None:
+            self.workspace.refund(workspace_id)
+
+    @asynccontextmanager
+    async def admit(self, workspace_id: str, actor: str) -> AsyncIterator[None]:
+        """
+        Hold admission for the duration of the block
+
+        Raises:
+            RateLimited: If the request cannot be admitted within ``max_wait``
+        """
+        deadline = time.monotonic() + self.max_wait
+        if self.actor:
+            await self._take(self.actor, actor, deadline)
+        if self.workspace:
+            try:
+                await self._take(self.workspace, workspace_id, deadline)
+            except BaseException:
+                self._refund(actor=actor)
+                raise
+        if self.scheduler is None:
+            yield
+            return
+        try:
+            await self.scheduler.acquire(workspace_id, max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            # Refused or cancelled before running: the tokens went unused
+            self._refund(actor=actor, workspace_id=workspace_id)
+            raise
+        try:
+            yield
+        finally:
+            self.scheduler.release()
@@ -0,0 +1,390 @@
+"""
+Batched, asynchronous audit sinks
+
+Records are queued by the request path and written by a background task in
+batches, so no request waits on a round trip to the audit backend.
+
+``CloudWatchAuditSink`` ships ``put_log_events`` batches bounded by
+CloudWatch's limits (10,000 events, 1 MiB, 24 hours span). When CloudWatch
+is unreachable, batches are spilled to a local NDJSON file and replayed
+after the next successful send. Events CloudWatch accepts the call for but
+rejects (too old, too new or past the group's retention) cannot succeed
+on a retry; they are logged and counted in ``rejected``.
+
+Records that could be neither sent nor spilled are logged and counted in
+``dropped``; the flusher keeps running either way.
+
+``RelationalAuditSink`` writes ``records_to_rows`` tuples through an
+``AuditRowWriter`` (see ``audit_sql``), one transaction per batch.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# CloudWatch PutLogEvents limits
+MAX_BATCH_EVENTS = 10_000
+MAX_BATCH_BYTES = 1_048_576
+EVENT_OVERHEAD_BYTES = 26
+MAX_BATCH_SPAN_MS = 24 * 3600 * 1000
+
+_STOP = object()
+
+
+def event_size(event: Dict[str, Any]) -> int:
+    """Size of a log event as CloudWatch counts it against the batch limit"""
+    return len(event["message"].encode()) + EVENT_OVERHEAD_BYTES
+
+
+def rejected_ranges(info: Dict[str, Any], count: int) -> List[Tuple[str, int, int]]:
+    """
+    ``(reason, start, end)`` index ranges of a batch of ``count`` events
+    that PutLogEvents reported in ``rejectedLogEventsInfo``
+    """
+    ranges = []
+    if info.get("tooOldLogEventEndIndex"):
+        ranges.append(("too old", 0, min(info["tooOldLogEventEndIndex"], count)))
+    if info.get("expiredLogEventEndIndex"):
+        ranges.append(("expired", 0, min(info["expiredLogEventEndIndex"], count)))
+    if info.get("tooNewLogEventStartIndex") is not None:
+        ranges.append(("too new", info["tooNewLogEventStartIndex"], count))
+    return ranges
+
+
+def split_batches(
+    events: List[Dict[str, Any]],
+    max_events: int = MAX_BATCH_EVENTS,
+    max_bytes: int = MAX_BATCH_BYTES
+) -> Iterator[List[Dict[str, Any]]]:
+    """Split time-ordered events into batches that respect the PutLogEvents limits"""
+    batch: List[Dict[str, Any]] = []
+    size = 0
+    for event in events:
+        item_size = event_size(event)
+        if batch and (
+            len(batch) >= max_events
+            or size + item_size > max_bytes
+            or event["timestamp"] - batch[0]["timestamp"] > MAX_BATCH_SPAN_MS
+        ):
+            yield batch
+            batch, size = [], 0
+        batch.append(event)
+        size += item_size
+    if batch:
+        yield batch
+
+
+class BatchingAuditSink:
+    """
+    Queue plus background flusher shared by the audit sinks
+
+    Subclasses queue items with ``_enqueue`` and write them in ``_send``.
+
+    Args:
+        flush_interval: Seconds to wait for a batch to fill before sending it
+        max_queue: Queued records before ``emit`` starts waiting (backpressure)
+        max_batch_events: Most items handed to one ``_send``
+        max_batch_bytes: Most bytes (per ``_item_size``) handed to one ``_send``
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 5.0,
+        max_queue: int = 50_000,
+        max_batch_events: int = MAX_BATCH_EVENTS,
+        max_batch_bytes: Optional[int] = None
+    ):
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_batch_events = max_batch_events
+        self.max_batch_bytes = max_batch_bytes
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Items lost because they could not be written anywhere
+        self.dropped = 0
+
+    # ------------------------------------------------------------------ #
+    #  Lifecycle
+    # ------------------------------------------------------------------ #
+
+    async def start(self) -> None:
+        """Start the background flusher on the running event loop"""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Flush everything queued and stop the flusher"""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    # ------------------------------------------------------------------ #
+    #  Producer side
+    # ------------------------------------------------------------------ #
+
+    async def _enqueue(self, item: Any) -> None:
+        """Queue an item; waits only when the queue is full"""
+        if self._queue is None:
+            raise RuntimeError("audit sink is not running")
+        await self._queue.put(item)
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far has been sent or spilled"""
+        if self._queue is None:
+            return
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put(done)
+        await done
+
+    # ------------------------------------------------------------------ #
+    #  Flusher
+    # ------------------------------------------------------------------ #
+
+    def _item_size(self, item: Any) -> int:
+        return 0
+
+    async def _send(self, batch: List[Any]) -> None:
+        raise NotImplementedError
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        carry = None
+        stopping = False
+        while not stopping:
+            item = carry if carry is not None else await self._queue.get()
+            carry = None
+            if item is _STOP:
+                break
+            if isinstance(item, asyncio.Future):
+                item.set_result(None)
+                continue
+
+            batch = [item]
+            size = self._item_size(item)
+            waiters = []
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch_events:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                if isinstance(item, asyncio.Future):
+                    waiters.append(item)
+                    break
+                item_size = self._item_size(item)
+                if self.max_batch_bytes is not None and size + item_size > self.max_batch_bytes:
+                    carry = item
+                    break
+                batch.append(item)
+                size += item_size
+
+            try:
+                await self._send(batch)
+            except Exception:
+                # Keep flushing: one bad batch must not stop the audit trail
+                self.dropped += len(batch)
+                logger.error("Dropping %d audit records: send failed", len(batch), exc_info=True)
+            for waiter in waiters:
+                waiter.set_result(None)
+
+
+class CloudWatchAuditSink(BatchingAuditSink):
+    """
+    Background CloudWatch Logs shipper
+
+    Args:
+        client: A boto3 ``logs`` client (or anything with ``put_log_events``)
+        log_group: Target log group
+        log_stream: Target log stream
+        flush_interval: Seconds to wait for a batch to fill before sending it
+        max_queue: Queued records before ``emit`` starts waiting (backpressure)
+        spill_path: NDJSON file used while CloudWatch is unreachable
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        log_group: str,
+        log_stream: str,
+        flush_interval: float = 5.0,
+        max_queue: int = 50_000,
+        max_batch_events: int = MAX_BATCH_EVENTS,
+        max_batch_bytes: int = MAX_BATCH_BYTES,
+        spill_path: Optional[str] = None
+    ):
+        super().__init__(
+            flush_interval=flush_interval,
+            max_queue=max_queue,
+            max_batch_events=min(max_batch_events, MAX_BATCH_EVENTS),
+            max_batch_bytes=min(max_batch_bytes, MAX_BATCH_BYTES)
+        )
+        self.client = client
+        self.log_group = log_group
+        self.log_stream = log_stream
+        self.spill_path = Path(spill_path) if spill_path else None
+        # Events CloudWatch rejected for their timestamps
+        self.rejected = 0
+
+    async def emit(self, record: Dict[str, Any], timestamp_ms: Optional[int] = None) -> None:
+        """Queue a record; waits only when the queue is full"""
+        await self._enqueue({
+            "timestamp": timestamp_ms if timestamp_ms is not None else int(time.time() * 1000),
+            "message": json.dumps(record),
+        })
+
+    def _item_size(self, item: Dict[str, Any]) -> int:
+        return event_size(item)
+
+    async def _send(self, batch: List[Dict[str, Any]]) -> None:
+        batch.sort(key=lambda event: event["timestamp"])
+        sent = 0
+        try:
+            for chunk in split_batches(batch, self.max_batch_events, self.max_batch_bytes):
+                self.rejected += await asyncio.to_thread(self._put, chunk)
+                sent += len(chunk)
+        except Exception:
+            logger.warning(
+                "CloudWatch unreachable, spilling %d audit records", len(batch) - sent, exc_info=True
+            )
+            self._spill(batch[sent:])
+            return
+        try:
+            await self._replay_spill()
+        except Exception:
+            # This batch was sent; the spill file is left for the next replay
+            logger.error("Spill replay failed", exc_info=True)
+
+    def _put(self, events: List[Dict[str, Any]]) -> int:
+        """Send one batch; returns how many of its events CloudWatch rejected"""
+        response = self.client.put_log_events(
+            logGroupName=self.log_group,
+            logStreamName=self.log_stream,
+            logEvents=events
+        )
+        info = (response or {}).get("rejectedLogEventsInfo")
+        if not info:
+            return 0
+        rejected = set()
+        for reason, start, end in rejected_ranges(info, len(events)):
+            logger.warning(
+                "CloudWatch rejected audit events %d-%d of %d as %s (timestamps %d-%d)",
+                start, end - 1, len(events), reason,
+                events[start]["timestamp"], events[end - 1]["timestamp"]
+            )
+            rejected.update(range(start, end))
+        return len(rejected)
+
+    # ------------------------------------------------------------------ #
+    #  Spill file
+    # ------------------------------------------------------------------ #
+
+    def _spill(self, events: List[Dict[str, Any]]) -> None:
+        if self.spill_path is None:
+            self.dropped += len(events)
+            logger.error("Dropping %d audit records: no spill path configured", len(events))
+            return
+        try:
+            self._write_spill(events)
+        except OSError:
+            self.dropped += len(events)
+            logger.error("Dropping %d audit records: spill failed", len(events), exc_info=True)
+
+    def _write_spill(self, events: List[Dict[str, Any]]) -> None:
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(event) + "\n" for event in events)
+        with open(self.spill_path, "a") as f:
+            f.write(data)
+
+    async def _replay_spill(self) -> None:
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        # Claim the file atomically so concurrent workers don't replay it twice
+        claimed = self.spill_path.with_name(f"{self.spill_path.name}.{os.getpid()}.replay")
+        try:
+            os.replace(self.spill_path, claimed)
+        except FileNotFoundError:
+            return
+        with open(claimed) as f:
+            events = [json.loads(line) for line in f if line.strip()]
+        events.sort(key=lambda event: event["timestamp"])
+        sent = 0
+        try:
+            for chunk in split_batches(events, self.max_batch_events, self.max_batch_bytes):
+                self.rejected += await asyncio.to_thread(self._put, chunk)
+                sent += len(chunk)
+        except Exception:
+            logger.warning("Spill replay interrupted after %d records", sent, exc_info=True)
+            try:
+                self._write_spill(events[sent:])
+            except OSError:
+                logger.error(
+                    "Could not re-spill %d audit records; they remain in %s",
+                    len(events) - sent, claimed, exc_info=True
+                )
+                return
+        claimed.unlink()
+
+
+class RelationalAuditSink(BatchingAuditSink):
+    """
+    Background writer of audit rows to a relational store
+
+    Rows are tuples in ``fedmcp.audit.POSTGRES_COLUMNS`` order (see
+    ``records_to_rows``); each batch is written by ``writer.write_rows`` in
+    one transaction on a worker thread.
+
+    Args:
+        writer: An ``AuditRowWriter`` (SQLite locally, Postgres COPY in production)
+        flush_interval: Seconds to wait for a batch to fill before writing it
+        max_queue: Queued rows before ``emit_row`` starts waiting (backpressure)
+        max_batch_rows: Most rows written per transaction
+    """
+
+    def __init__(
+        self,
+        writer: Any,
+        flush_interval: float = 1.0,
+        max_queue: int = 50_000,
+        max_batch_rows: int = 10_000
+    ):
+        super().__init__(
+            flush_interval=flush_interval,
+            max_queue=max_queue,
+            max_batch_events=max_batch_rows
+        )
+        self.writer = writer
+
+    async def emit_row(self, row: Tuple[Any, ...]) -> None:
+        """Queue a row; waits only when the queue is full"""
+        await self._enqueue(row)
+
+    async def close(self) -> None:
+        await super().close()
+        self.writer.close()
+
+    async def _send(self, batch: List[Tuple[Any, ...]]) -> None:
+        try:
+            await asyncio.to_thread(self.writer.write_rows, batch)
+        except Exception:
+            self.dropped += len(batch)
+            logger.error("Dropping %d audit rows: write failed", len(batch), exc_info=True)
@@ -0,0 +1,161 @@
+"""
+Relational audit row writers
+
+Writers take batches of rows in ``fedmcp.audit.POSTGRES_COLUMNS`` order
+(``records_to_rows`` output) and persist each batch in one transaction.
+``SQLiteAuditWriter`` runs anywhere and backs local development and tests;
+``PostgresAuditWriter`` streams the same rows through ``COPY``.
+
+Both create an ``audit_events`` table indexed the way ``/audit/events``
+filters: artifact, workspace, actor and action, each paired with the
+timestamp.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Iterable, Sequence, Tuple
+
+# Must match fedmcp.audit.POSTGRES_COLUMNS
+AUDIT_COLUMNS = (
+    "id", "timestamp", "action", "actor", "artifact_id", "workspace_id",
+    "metadata", "ip_address", "user_agent", "session_id",
+)
+
+AUDIT_INDEXES = """
+CREATE INDEX IF NOT EXISTS ix_audit_events_ts ON audit_events (timestamp);
+CREATE INDEX IF NOT EXISTS ix_audit_events_artifact ON audit_events (artifact_id, timestamp);
+CREATE INDEX IF NOT EXISTS ix_audit_events_workspace ON audit_events (workspace_id, timestamp);
+CREATE INDEX IF NOT EXISTS ix_audit_events_actor ON audit_events (actor, timestamp);
+CREATE INDEX IF NOT EXISTS ix_audit_events_action ON audit_events (action, timestamp);
+"""
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    action TEXT NOT NULL,
+    actor TEXT NOT NULL,
+    artifact_id TEXT,
+    workspace_id TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    ip_address TEXT,
+    user_agent TEXT,
+    session_id TEXT
+);
+""" + AUDIT_INDEXES
+
+POSTGRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    id UUID PRIMARY KEY,
+    timestamp TIMESTAMPTZ NOT NULL,
+    action TEXT NOT NULL,
+    actor TEXT NOT NULL,
+    artifact_id UUID,
+    workspace_id UUID NOT NULL,
+    metadata JSONB NOT NULL,
+    ip_address TEXT,
+    user_agent TEXT,
+    session_id TEXT
+);
+""" + AUDIT_INDEXES
+
+
+class AuditRowWriter:
+    """Interface for batch writers used by ``RelationalAuditSink``"""
+
+    def write_rows(self, rows: Sequence[Tuple[Any, ...]]) -> None:
+        """Persist a batch of rows in one transaction"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteAuditWriter(AuditRowWriter):
+    """
+    SQLite-backed audit table
+
+    Timestamps are stored as ISO 8601 text (UTC, microseconds), which sorts
+    chronologically, and metadata as JSON text.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+        placeholders = ", ".join("?" for _ in AUDIT_COLUMNS)
+        self._insert = (
+            f"INSERT INTO audit_events ({', '.join(AUDIT_COLUMNS)}) VALUES ({placeholders})"
+            " ON CONFLICT (id) DO NOTHING"
+        )
+
+    def write_rows(self, rows: Sequence[Tuple[Any, ...]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self._insert, _sqlite_rows(rows))
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class PostgresAuditWriter(AuditRowWriter):
+    """
+    PostgreSQL audit table written with ``COPY ... FROM STDIN``
+
+    Requires ``psycopg`` (v3). ``conninfo`` is a libpq connection string.
+    Unlike the SQLite writer, a batch containing an already-stored id fails
+    as a whole, since ``COPY`` has no conflict clause.
+    """
+
+    def __init__(self, conninfo: str):
+        try:
+            import psycopg
+            from psycopg.types.json import Jsonb
+        except ImportError as e:
+            raise RuntimeError("PostgresAuditWriter requires psycopg") from e
+        self._jsonb = Jsonb
+        self._conn = psycopg.connect(conninfo)
+        with self._conn.transaction():
+            self._conn.execute(POSTGRES_SCHEMA)
+        self._copy = f"COPY audit_events ({', '.join(AUDIT_COLUMNS)}) FROM STDIN"
+
+    def write_rows(self, rows: Sequence[Tuple[Any, ...]]) -> None:
+        metadata = AUDIT_COLUMNS.index("metadata")
+        with self._conn.transaction():
+            with self._conn.cursor() as cur:
+                with cur.copy(self._copy) as copy:
+                    for row in rows:
+                        row = list(row)
+                        row[metadata] = self._jsonb(row[metadata])
+                        copy.write_row(row)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _sqlite_rows(rows: Iterable[Tuple[Any, ...]]) -> Iterable[Tuple[Any, ...]]:
+    for (event_id, timestamp, action, actor, artifact_id, workspace_id,
+         metadata, ip_address, user_agent, session_id) in rows:
+        yield (
+            str(event_id),
+            timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+            action,
+            actor,
+            None if artifact_id is None else str(artifact_id),
+            str(workspace_id),
+            json.dumps(metadata or {}, separators=(",", ":")),
+            ip_address,
+            user_agent,
+            session_id,
+        )
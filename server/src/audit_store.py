@@ -0,0 +1,722 @@
+"""
+Persistent audit store for the FedMCP reference server
+
+Events are appended to time-partitioned segments, one SQLite file per
+partition, so every uvicorn worker on the host shares the same trail and
+nothing is lost on restart. Each segment is indexed on artifactId,
+workspaceId, actor and action (each paired with the timestamp), queries
+only open the segments that overlap the requested time range, and
+retention is enforced by deleting whole segments.
+
+With a ``ChainConfig`` the store also links every event to the previous
+one (see ``fedmcp.audit_chain``) under a cross-process lock and records a
+signed checkpoint every N events in ``checkpoints.db``, signing it once the
+lock is released. The segment holding
+the newest chained event is recorded in ``chain.head``, so an append reads
+the head from that one segment instead of listing the directory.
+
+Every append also bumps an hourly rollup counter keyed by action, actor
+and workspace in the same transaction, so reporting queries read a few
+rollup rows instead of raw events. Closed segments can be exported to
+Parquet (requires ``pyarrow``) for offline analysis; with an export path
+configured, segments are exported before retention drops them. Rolling
+over to a new segment starts retention and export on a background thread,
+so the append that triggers it does not wait for either.
+
+Queries, stats and chain verification read through their own read-only
+connections, pooled per file, so they can run on any thread without
+sharing the connections appends write through.
+"""
+
+import fcntl
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Iterable, Tuple, Callable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "audit-"
+SEGMENT_SUFFIX = ".db"
+SEGMENT_TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+# Indexed filters: query argument -> column
+INDEXED_FIELDS = {
+    "artifact_id": "artifact_id",
+    "workspace_id": "workspace_id",
+    "actor": "actor",
+    "action": "action",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts_ms INTEGER NOT NULL,
+    event_id TEXT,
+    action TEXT,
+    actor TEXT,
+    artifact_id TEXT,
+    workspace_id TEXT,
+    body TEXT NOT NULL,
+    chain_seq INTEGER,
+    prev_hash TEXT,
+    event_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_events_ts ON events (ts_ms);
+CREATE INDEX IF NOT EXISTS ix_events_chain ON events (chain_seq);
+CREATE INDEX IF NOT EXISTS ix_events_artifact ON events (artifact_id, ts_ms);
+CREATE INDEX IF NOT EXISTS ix_events_workspace ON events (workspace_id, ts_ms);
+CREATE INDEX IF NOT EXISTS ix_events_actor ON events (actor, ts_ms);
+CREATE INDEX IF NOT EXISTS ix_events_action ON events (action, ts_ms);
+CREATE TABLE IF NOT EXISTS rollups (
+    bucket INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    actor TEXT NOT NULL,
+    workspace_id TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (bucket, action, actor, workspace_id)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS events_no_update BEFORE UPDATE ON events
+BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS events_no_delete BEFORE DELETE ON events
+BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+"""
+
+# Rollup bucket length; stats intervals must be multiples of it
+ROLLUP_SECONDS = 3600
+
+# Dimensions /audit/stats can group by: name -> rollup column
+ROLLUP_DIMENSIONS = {
+    "action": "action",
+    "actor": "actor",
+    "workspace": "workspace_id",
+}
+
+ROLLUP_UPSERT = """
+INSERT INTO rollups (bucket, action, actor, workspace_id, count) VALUES (?, ?, ?, ?, 1)
+ON CONFLICT (bucket, action, actor, workspace_id) DO UPDATE SET count = count + 1
+"""
+
+# Segments created before chaining was added
+CHAIN_COLUMNS = {"chain_seq": "INTEGER", "prev_hash": "TEXT", "event_hash": "TEXT"}
+
+CHECKPOINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    sequence INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    jws TEXT NOT NULL,
+    ts_ms INTEGER NOT NULL
+);
+"""
+
+
+class ChainConfig(NamedTuple):
+    """
+    Hash-chain hooks for ``AuditStore``
+
+    Args:
+        link: ``(event, prev_hash, sequence) -> linked event``
+        genesis: ``prev_hash`` of the first event
+        sign_checkpoint: ``(sequence, head_hash) -> JWS``; ``None`` disables checkpoints
+        checkpoint_interval: Events between checkpoints
+    """
+    link: Callable[[Dict[str, Any], str, int], Dict[str, Any]]
+    genesis: str
+    sign_checkpoint: Optional[Callable[[int, str], str]] = None
+    checkpoint_interval: int = 1000
+
+
+def to_millis(value: datetime) -> int:
+    """Convert a datetime (naive values are taken as UTC) to epoch milliseconds"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+class AuditStore:
+    """
+    Append-only, time-partitioned audit event store
+
+    Args:
+        path: Directory holding the segment files
+        segment_seconds: Length of each time partition
+        retention_seconds: Drop segments that ended longer ago than this
+            (``None`` keeps everything)
+        chain: Hash-chain every appended event
+        export_path: Directory for Parquet exports of closed segments
+    """
+
+    def __init__(
+        self,
+        path: str,
+        segment_seconds: int = 86400,
+        retention_seconds: Optional[int] = None,
+        chain: Optional[ChainConfig] = None,
+        export_path: Optional[str] = None
+    ):
+        if segment_seconds % ROLLUP_SECONDS and ROLLUP_SECONDS % segment_seconds:
+            raise ValueError(f"segment_seconds must align with {ROLLUP_SECONDS}s rollups")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.segment_seconds = segment_seconds
+        self.retention_seconds = retention_seconds
+        self.chain = chain
+        self.export_path = Path(export_path) if export_path else None
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        self._chain_lock = threading.Lock()
+        self._maintenance_lock = threading.Lock()
+        self._checkpoints: Optional[sqlite3.Connection] = None
+        self._readers: Dict[Path, List[sqlite3.Connection]] = {}
+
+    # ------------------------------------------------------------------ #
+    #  Segments
+    # ------------------------------------------------------------------ #
+
+    def _segment_start(self, ts_ms: int) -> int:
+        """Start (epoch seconds) of the segment containing ``ts_ms``"""
+        ts = ts_ms // 1000
+        return ts - ts % self.segment_seconds
+
+    def _segment_path(self, start: int) -> Path:
+        stamp = datetime.fromtimestamp(start, timezone.utc).strftime(SEGMENT_TIME_FORMAT)
+        return self.path / f"{SEGMENT_PREFIX}{stamp}{SEGMENT_SUFFIX}"
+
+    def segments(self) -> List[int]:
+        """Start times of the segments on disk, oldest first"""
+        starts = []
+        for file_path in self.path.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            stamp = file_path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+            try:
+                parsed = datetime.strptime(stamp, SEGMENT_TIME_FORMAT)
+            except ValueError:
+                continue
+            starts.append(int(parsed.replace(tzinfo=timezone.utc).timestamp()))
+        return sorted(starts)
+
+    def _connect(self, start: int, create: bool) -> Optional[sqlite3.Connection]:
+        with self._lock:
+            conn = self._connections.get(start)
+            if conn is not None:
+                return conn
+            segment_path = self._segment_path(start)
+            if not create and not segment_path.exists():
+                return None
+            conn = sqlite3.connect(
+                str(segment_path),
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            # WAL lets readers in other workers proceed while one appends;
+            # NORMAL sync survives process crashes without an fsync per event
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+            if columns:
+                for name, kind in CHAIN_COLUMNS.items():
+                    if name not in columns:
+                        conn.execute(f"ALTER TABLE events ADD COLUMN {name} {kind}")
+            conn.executescript(SCHEMA)
+            _backfill_rollups(conn)
+            self._connections[start] = conn
+            return conn
+
+    @contextmanager
+    def _reader(self, path: Path) -> Iterator[Optional[sqlite3.Connection]]:
+        """An idle read-only connection to ``path``, or ``None`` if it doesn't exist"""
+        with self._lock:
+            idle = self._readers.get(path)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            conn = _open_read_only(path)
+        if conn is None:
+            yield None
+            return
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                if path.exists():
+                    self._readers.setdefault(path, []).append(conn)
+                else:
+                    conn.close()
+
+    @contextmanager
+    def _segment_reader(self, start: int) -> Iterator[Optional[sqlite3.Connection]]:
+        # The append connection brings segments from older versions up to the schema first
+        if self._connect(start, create=False) is None:
+            yield None
+            return
+        with self._reader(self._segment_path(start)) as conn:
+            yield conn
+
+    def enforce_retention(self, now_ms: Optional[int] = None) -> List[int]:
+        """Delete segments that ended before the retention window; return their starts"""
+        if self.retention_seconds is None:
+            return []
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        cutoff = now_ms // 1000 - self.retention_seconds
+        dropped = []
+        for start in self.segments():
+            if start + self.segment_seconds > cutoff:
+                break
+            if self.export_path is not None:
+                self.export_segment(start)
+                if not self._export_target(start).exists():
+                    # Another worker is still exporting it; drop it next time
+                    continue
+            with self._lock:
+                conn = self._connections.pop(start, None)
+                if conn is not None:
+                    conn.close()
+                segment_path = self._segment_path(start)
+                for reader in self._readers.pop(segment_path, []):
+                    reader.close()
+                for suffix in ("", "-wal", "-shm"):
+                    Path(str(segment_path) + suffix).unlink(missing_ok=True)
+            dropped.append(start)
+        return dropped
+
+    # ------------------------------------------------------------------ #
+    #  Append / query
+    # ------------------------------------------------------------------ #
+
+    def append(self, event: Dict[str, Any], ts_ms: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Append a serialized audit event (as produced by ``AuditEvent.model_dump``)
+
+        Returns the event as stored, including its chain fields when chaining.
+        """
+        ts_ms = ts_ms if ts_ms is not None else int(time.time() * 1000)
+        if self.chain is None:
+            self._insert(event, ts_ms)
+            return event
+
+        with self._chain_locked():
+            marked = self._head_segment()
+            sequence, head, head_ts = self._chain_head(marked)
+            # Keep the chain in time order even if worker clocks disagree
+            ts_ms = max(ts_ms, head_ts)
+            start = self._segment_start(ts_ms)
+            if start != marked:
+                # Move the marker first: if the insert fails, _chain_head
+                # finds no chained event there and falls back to a scan
+                self._mark_head_segment(start)
+            linked = self.chain.link(event, head, sequence + 1)
+            self._insert(linked, ts_ms, sequence + 1, head, linked["eventHash"])
+        # Sign outside the lock: a KMS round trip would hold up every worker's appends
+        if self.chain.sign_checkpoint and (sequence + 1) % self.chain.checkpoint_interval == 0:
+            self._record_checkpoint(sequence + 1, linked["eventHash"], ts_ms)
+        return linked
+
+    def _insert(
+        self,
+        event: Dict[str, Any],
+        ts_ms: int,
+        chain_seq: Optional[int] = None,
+        prev_hash: Optional[str] = None,
+        event_hash: Optional[str] = None
+    ) -> None:
+        start = self._segment_start(ts_ms)
+        if start not in self._connections:
+            # Rolling over to a new segment is when old ones can expire
+            threading.Thread(
+                target=self._maintain, args=(ts_ms,), name="audit-maintenance", daemon=True
+            ).start()
+        conn = self._connect(start, create=True)
+        action = _str_or_none(event.get("action"))
+        actor = _str_or_none(event.get("actor"))
+        workspace_id = _str_or_none(event.get("workspaceId"))
+        conn.execute("BEGIN")
+        try:
+            conn.execute(
+                "INSERT INTO events (ts_ms, event_id, action, actor, artifact_id, workspace_id, body,"
+                " chain_seq, prev_hash, event_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    ts_ms,
+                    _str_or_none(event.get("id")),
+                    action,
+                    actor,
+                    _str_or_none(event.get("artifactId")),
+                    workspace_id,
+                    json.dumps(event, default=str),
+                    chain_seq,
+                    prev_hash,
+                    event_hash,
+                )
+            )
+            bucket = ts_ms // 1000 - (ts_ms // 1000) % ROLLUP_SECONDS
+            conn.execute(ROLLUP_UPSERT, (bucket, action or "", actor or "", workspace_id or ""))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ------------------------------------------------------------------ #
+    #  Hash chain
+    # ------------------------------------------------------------------ #
+
+    @contextmanager
+    def _chain_locked(self) -> Iterator[None]:
+        """Serialize chain appends across threads and worker processes"""
+        with self._chain_lock, open(self.path / "chain.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _chain_head(self, marked: Optional[int]) -> Tuple[int, str, int]:
+        """(sequence, hash, ts_ms) of the newest chained event, looked up in segment ``marked``"""
+        if marked is not None:
+            row = self._newest_chained(marked)
+            if row:
+                return row
+        # No marker yet (or it points past the last insert): scan every segment
+        for segment in reversed(self.segments()):
+            row = self._newest_chained(segment)
+            if row:
+                return row
+        return 0, self.chain.genesis, 0
+
+    def _newest_chained(self, segment: int) -> Optional[Tuple[int, str, int]]:
+        conn = self._connect(segment, create=False)
+        if conn is None:
+            return None
+        row = conn.execute(
+            "SELECT chain_seq, event_hash, ts_ms FROM events"
+            " WHERE chain_seq IS NOT NULL ORDER BY chain_seq DESC LIMIT 1"
+        ).fetchone()
+        return (row[0], row[1], row[2]) if row else None
+
+    def _head_segment(self) -> Optional[int]:
+        """Segment named in ``chain.head``; call with the chain lock held"""
+        try:
+            return int((self.path / "chain.head").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _mark_head_segment(self, start: int) -> None:
+        tmp_path = self.path / "chain.head.tmp"
+        tmp_path.write_text(str(start))
+        tmp_path.replace(self.path / "chain.head")
+
+    def _checkpoint_db(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._checkpoints is None:
+                conn = sqlite3.connect(
+                    str(self.path / "checkpoints.db"),
+                    timeout=5.0,
+                    isolation_level=None,
+                    check_same_thread=False
+                )
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(CHECKPOINT_SCHEMA)
+                self._checkpoints = conn
+            return self._checkpoints
+
+    def _record_checkpoint(self, sequence: int, head_hash: str, ts_ms: int) -> None:
+        jws = self.chain.sign_checkpoint(sequence, head_hash)
+        self._checkpoint_db().execute(
+            "INSERT OR REPLACE INTO checkpoints (sequence, hash, jws, ts_ms) VALUES (?, ?, ?, ?)",
+            (sequence, head_hash, jws, ts_ms)
+        )
+
+    def latest_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """The most recent signed checkpoint, if any"""
+        self._checkpoint_db()
+        with self._reader(self.path / "checkpoints.db") as conn:
+            row = conn.execute(
+                "SELECT sequence, hash, jws FROM checkpoints ORDER BY sequence DESC LIMIT 1"
+            ).fetchone() if conn is not None else None
+        if row is None:
+            return None
+        return {"sequence": row[0], "hash": row[1], "jws": row[2]}
+
+    def events_since(self, sequence: int) -> List[Dict[str, Any]]:
+        """Chained events after ``sequence``, in chain order, touching only the newest segments"""
+        chunks: List[List[str]] = []
+        for segment in reversed(self.segments()):
+            with self._segment_reader(segment) as conn:
+                if conn is None:
+                    continue
+                rows = conn.execute(
+                    "SELECT body FROM events WHERE chain_seq > ? ORDER BY chain_seq",
+                    (sequence,)
+                ).fetchall()
+                oldest = conn.execute(
+                    "SELECT MIN(chain_seq) FROM events WHERE chain_seq IS NOT NULL"
+                ).fetchone()[0]
+            chunks.append([body for (body,) in rows])
+            if oldest is not None and oldest <= sequence + 1:
+                break
+        return [json.loads(body) for chunk in reversed(chunks) for body in chunk]
+
+    def _overlapping(self, start_ms: Optional[int], end_ms: Optional[int]) -> Iterator[int]:
+        """Segments overlapping [start_ms, end_ms), newest first"""
+        for start in reversed(self.segments()):
+            if end_ms is not None and start * 1000 >= end_ms:
+                continue
+            if start_ms is not None and (start + self.segment_seconds) * 1000 <= start_ms:
+                break
+            yield start
+
+    def query(
+        self,
+        artifact_id: Optional[str] = None,
+        workspace_id: Optional[str] = None,
+        actor: Optional[str] = None,
+        action: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the most recent ``limit`` matching events, oldest first
+
+        Filters are applied before the limit, so older matches are found
+        no matter how many unrelated events came after them.
+        """
+        filters = {
+            "artifact_id": artifact_id,
+            "workspace_id": workspace_id,
+            "actor": actor,
+            "action": action,
+        }
+        clauses, params = _where(filters)
+        start_ms = to_millis(start) if start else None
+        end_ms = to_millis(end) if end else None
+        if start_ms is not None:
+            clauses.append("ts_ms >= ?")
+            params.append(start_ms)
+        if end_ms is not None:
+            clauses.append("ts_ms < ?")
+            params.append(end_ms)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        rows: List[str] = []
+        for segment in self._overlapping(start_ms, end_ms):
+            remaining = limit - len(rows)
+            if remaining <= 0:
+                break
+            with self._segment_reader(segment) as conn:
+                if conn is None:
+                    continue
+                cursor = conn.execute(
+                    f"SELECT body FROM events{where} ORDER BY ts_ms DESC, seq DESC LIMIT ?",
+                    (*params, remaining)
+                )
+                rows.extend(body for (body,) in cursor)
+        return [json.loads(body) for body in reversed(rows)]
+
+    # ------------------------------------------------------------------ #
+    #  Rollups / export
+    # ------------------------------------------------------------------ #
+
+    def stats(
+        self,
+        group_by: Iterable[str] = ("action",),
+        interval_seconds: int = 86400,
+        action: Optional[str] = None,
+        actor: Optional[str] = None,
+        workspace_id: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Event counts per time bucket and dimension, read from the rollups only
+
+        ``start``/``end`` are aligned to hourly rollup buckets.
+        """
+        if interval_seconds % ROLLUP_SECONDS:
+            raise ValueError(f"interval must be a multiple of {ROLLUP_SECONDS}s")
+        dimensions = list(dict.fromkeys(group_by))
+        for name in dimensions:
+            if name not in ROLLUP_DIMENSIONS:
+                raise ValueError(f"Cannot group by {name}")
+        columns = [ROLLUP_DIMENSIONS[name] for name in dimensions]
+
+        clauses, params = _where({"action": action, "actor": actor, "workspace_id": workspace_id})
+        start_ms = to_millis(start) if start else None
+        end_ms = to_millis(end) if end else None
+        if start_ms is not None:
+            clauses.append("bucket >= ?")
+            params.append(start_ms // 1000 - (start_ms // 1000) % ROLLUP_SECONDS)
+        if end_ms is not None:
+            clauses.append("bucket < ?")
+            params.append(end_ms // 1000)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        selected = "".join(f", {column}" for column in columns)
+        sql = (
+            f"SELECT bucket - bucket % ?{selected}, SUM(count) FROM rollups{where}"
+            f" GROUP BY 1{''.join(f', {i + 2}' for i in range(len(columns)))}"
+        )
+
+        totals: Dict[Tuple[Any, ...], int] = {}
+        for segment in self._overlapping(start_ms, end_ms):
+            with self._segment_reader(segment) as conn:
+                if conn is None:
+                    continue
+                for row in conn.execute(sql, (interval_seconds, *params)):
+                    key = tuple(row[:-1])
+                    totals[key] = totals.get(key, 0) + row[-1]
+
+        results = []
+        for key in sorted(totals):
+            entry: Dict[str, Any] = {
+                "bucket": datetime.fromtimestamp(key[0], timezone.utc).isoformat().replace("+00:00", "Z")
+            }
+            for name, value in zip(dimensions, key[1:]):
+                entry[name] = value or None
+            entry["count"] = totals[key]
+            results.append(entry)
+        return results
+
+    def closed_segments(self, now_ms: Optional[int] = None) -> List[int]:
+        """Segments whose time range has fully elapsed"""
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        return [s for s in self.segments() if (s + self.segment_seconds) * 1000 <= now_ms]
+
+    def _export_target(self, start: int) -> Path:
+        name = self._segment_path(start).name[:-len(SEGMENT_SUFFIX)]
+        return self.export_path / f"{name}.parquet"
+
+    def export_segment(self, start: int) -> Optional[Path]:
+        """
+        Write a segment's events to ``<export_path>/audit-<start>.parquet``
+
+        Returns the file, or ``None`` if another worker already exported it.
+        """
+        if self.export_path is None:
+            raise ValueError("No export path configured")
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet export requires pyarrow") from e
+
+        self.export_path.mkdir(parents=True, exist_ok=True)
+        target = self._export_target(start)
+        claim = target.with_suffix(".parquet.claim")
+        try:
+            # Only one worker exports a given segment
+            claim.touch(exist_ok=False)
+        except FileExistsError:
+            return None
+
+        try:
+            table = self._segment_table(start, pa)
+            tmp = target.with_suffix(".parquet.tmp")
+            pq.write_table(table, tmp, compression="zstd")
+            tmp.replace(target)
+        except BaseException:
+            claim.unlink()
+            raise
+        return target
+
+    def _segment_table(self, start: int, pa: Any) -> Any:
+        conn = self._connect(start, create=False)
+        rows = conn.execute(
+            "SELECT ts_ms, event_id, action, actor, artifact_id, workspace_id, chain_seq,"
+            " event_hash, body FROM events ORDER BY ts_ms, seq"
+        ).fetchall() if conn is not None else []
+        columns = list(zip(*rows)) if rows else [[]] * 9
+        return pa.table({
+            "timestamp": pa.array(columns[0], type=pa.timestamp("ms", tz="UTC")),
+            "event_id": pa.array(columns[1], type=pa.string()),
+            "action": pa.array(columns[2], type=pa.string()).dictionary_encode(),
+            "actor": pa.array(columns[3], type=pa.string()).dictionary_encode(),
+            "artifact_id": pa.array(columns[4], type=pa.string()),
+            "workspace_id": pa.array(columns[5], type=pa.string()).dictionary_encode(),
+            "sequence": pa.array(columns[6], type=pa.int64()),
+            "event_hash": pa.array(columns[7], type=pa.string()),
+            "metadata": pa.array(
+                [json.dumps(json.loads(body).get("metadata") or {}) for body in columns[8]],
+                type=pa.string()
+            ),
+        })
+
+    def export_closed(self, now_ms: Optional[int] = None) -> List[Path]:
+        """Export every closed segment that has not been exported yet"""
+        exported = []
+        for start in self.closed_segments(now_ms):
+            if self._export_target(start).with_suffix(".parquet.claim").exists():
+                continue
+            path = self.export_segment(start)
+            if path is not None:
+                exported.append(path)
+        return exported
+
+    def _maintain(self, now_ms: int) -> None:
+        """Enforce retention and export closed segments, off the append path"""
+        with self._maintenance_lock:
+            try:
+                self.enforce_retention(now_ms=now_ms)
+            except Exception:
+                logger.warning("Audit retention failed", exc_info=True)
+            if self.export_path is None:
+                return
+            try:
+                self.export_closed(now_ms)
+            except Exception:
+                logger.warning("Audit segment export failed", exc_info=True)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+            for readers in self._readers.values():
+                for reader in readers:
+                    reader.close()
+            self._readers.clear()
+            if self._checkpoints is not None:
+                self._checkpoints.close()
+                self._checkpoints = None
+
+
+def _open_read_only(path: Path) -> Optional[sqlite3.Connection]:
+    try:
+        return sqlite3.connect(
+            f"{path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            timeout=5.0,
+            isolation_level=None,
+            check_same_thread=False
+        )
+    except sqlite3.OperationalError:
+        return None
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _backfill_rollups(conn: sqlite3.Connection) -> None:
+    """Populate rollups for segments written before they existed"""
+    if conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone():
+        return
+    if not conn.execute("SELECT 1 FROM events LIMIT 1").fetchone():
+        return
+    conn.execute(
+        "INSERT INTO rollups (bucket, action, actor, workspace_id, count)"
+        " SELECT ts_ms / 1000 - (ts_ms / 1000) % ?, COALESCE(action, ''), COALESCE(actor, ''),"
+        " COALESCE(workspace_id, ''), COUNT(*) FROM events GROUP BY 1, 2, 3, 4",
+        (ROLLUP_SECONDS,)
+    )
+
+
+def _where(filters: Dict[str, Optional[str]]) -> Tuple[List[str], List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    for name, value in filters.items():
+        if value is not None:
+            clauses.append(f"{INDEXED_FIELDS[name]} = ?")
+            params.append(value)
+    return clauses, params
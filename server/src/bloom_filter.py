@@ -0,0 +1,147 @@
+"""
+Bloom filter of stored artifact IDs, shared by the workers
+
+The filter lives in a file mapped into every worker (``MAP_SHARED``), so
+an ID added by one worker is seen by the others without any messaging.
+Only workers on the same host share it: with several replicas in front of
+one store, an ID written through another replica is missing here.
+Bits are only ever set: adds take a file lock for the read-modify-write
+of their bytes, and lookups read without one. A lookup that says "absent"
+is right for every ID added to the file; "present" is wrong with the configured probability,
+which ``estimated_false_positive_rate`` reports from the bits actually set.
+
+Once filled with the IDs already stored, the filter is marked as such in
+its header, so neither the other workers nor a restart fill it again.
+
+The size is derived from the expected number of IDs and the target
+false-positive rate. A file sized for other settings is replaced when the
+filter is opened, so every worker must use the same settings. IDs are
+never removed: a failed write leaves a stale bit, which only costs a
+backend lookup. Delete the file while the server is stopped to start over.
+"""
+
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+MAGIC = b"FMBLOOM2"
+# magic, number of bits, number of hash functions, filled flag
+HEADER = struct.Struct("<8sQQQ")
+FILLED_OFFSET = 24
+
+
+def optimal_size(capacity: int, false_positive_rate: float) -> Tuple[int, int]:
+    """Bits and hash functions for ``capacity`` IDs at ``false_positive_rate``"""
+    if capacity < 1 or not 0 < false_positive_rate < 1:
+        raise ValueError("Capacity must be positive and the false-positive rate between 0 and 1")
+    bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives
+
+    Args:
+        path: Filter file shared by all workers
+        capacity: Expected number of IDs
+        false_positive_rate: Target rate at ``capacity`` IDs
+    """
+
+    def __init__(self, path: str, capacity: int, false_positive_rate: float):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.bits, self.hashes = optimal_size(capacity, false_positive_rate)
+        self._lock = threading.Lock()
+        self._lock_file = open(self.path.with_name(self.path.name + ".lock"), "a")
+        with self._locked():
+            if not self._matches():
+                tmp_path = self.path.with_name(self.path.name + ".tmp")
+                with open(tmp_path, "wb") as f:
+                    f.write(HEADER.pack(MAGIC, self.bits, self.hashes, 0))
+                    f.truncate(HEADER.size + (self.bits + 7) // 8)
+                os.replace(tmp_path, self.path)
+            self._file = open(self.path, "r+b")
+            self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _matches(self) -> bool:
+        """Whether the file on disk is a filter with this size"""
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(HEADER.size)
+                size = os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            return False
+        return (
+            len(header) == HEADER.size
+            and HEADER.unpack(header)[:3] == (MAGIC, self.bits, self.hashes)
+            and size == HEADER.size + (self.bits + 7) // 8
+        )
+
+    def _positions(self, key: str) -> List[int]:
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        data = self._map
+        for position in self._positions(key):
+            if not data[HEADER.size + (position >> 3)] >> (position & 7) & 1:
+                return False
+        return True
+
+    def add(self, key: str) -> None:
+        self.update([key])
+
+    def update(self, keys: Iterable[str]) -> None:
+        """Add many IDs under one lock"""
+        data = self._map
+        with self._locked():
+            for key in keys:
+                for position in self._positions(key):
+                    data[HEADER.size + (position >> 3)] |= 1 << (position & 7)
+
+    @property
+    def filled(self) -> bool:
+        """Whether the filter was marked as holding every stored ID"""
+        return bool(self._map[FILLED_OFFSET])
+
+    def mark_filled(self) -> None:
+        """Record, for every worker and restart, that the filter is complete"""
+        with self._locked():
+            self._map.flush()
+            self._map[FILLED_OFFSET] = 1
+            self._map.flush()
+
+    def fill_ratio(self) -> float:
+        """Fraction of bits set"""
+        return int.from_bytes(self._map[HEADER.size:], "little").bit_count() / self.bits
+
+    def estimated_false_positive_rate(self) -> float:
+        """Chance that an absent ID is reported present, given the bits set"""
+        return self.fill_ratio() ** self.hashes
+
+    def close(self) -> None:
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+        self._lock_file.close()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
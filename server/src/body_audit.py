@@ -0,0 +1,132 @@
+"""
+Streaming request-body tap for the audit middleware
+
+``BodyAuditMiddleware`` is a plain ASGI middleware that wraps ``receive``:
+every ``http.request`` chunk is fed to an incremental SHA-256 and to a
+bounded sample (a head prefix plus a rolling tail window) and then handed
+to the app unchanged, so downstream handlers read the body exactly as
+before and large uploads are never held in memory twice. Once the body has
+been read, ``on_body`` runs concurrently with the handler; the response is
+held at ``http.response.start`` until it returns, and the digest is added
+as ``X-Content-SHA256``.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+
+
+class BodyTap:
+    """
+    Incremental digest and bounded sample of a request body
+
+    Args:
+        max_sample_bytes: Most bytes kept for scanning
+        tail_bytes: Of those, how many come from the end of the body
+    """
+
+    def __init__(self, max_sample_bytes: int = 65536, tail_bytes: int = 8192):
+        self.max_sample_bytes = max_sample_bytes
+        self.tail_bytes = min(tail_bytes, max_sample_bytes)
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._head = bytearray()
+        self._tail = bytearray()
+
+    def update(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        room = self.max_sample_bytes - self.tail_bytes - len(self._head)
+        if room > 0:
+            self._head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk and self.tail_bytes:
+            self._tail += chunk
+            del self._tail[:-self.tail_bytes]
+
+    @property
+    def truncated(self) -> bool:
+        """True if the sample is not the whole body"""
+        return self.size > len(self._head) + len(self._tail)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def sample(self) -> bytes:
+        """The whole body if it fits, else its head and last ``tail_bytes``"""
+        separator = b"\n" if self.truncated else b""
+        return bytes(self._head) + separator + bytes(self._tail)
+
+
+class BodyAuditMiddleware:
+    """
+    Hash and sample request bodies as the app streams them
+
+    Args:
+        app: The wrapped ASGI app
+        on_body: Awaited with the finished tap and the request scope
+        max_sample_bytes: Passed to ``BodyTap``
+        tail_bytes: Passed to ``BodyTap``
+    """
+
+    def __init__(
+        self,
+        app: Callable[..., Awaitable[None]],
+        on_body: Callable[[BodyTap, Scope], Awaitable[None]],
+        max_sample_bytes: int = 65536,
+        tail_bytes: int = 8192
+    ):
+        self.app = app
+        self.on_body = on_body
+        self.max_sample_bytes = max_sample_bytes
+        self.tail_bytes = tail_bytes
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tap = BodyTap(self.max_sample_bytes, self.tail_bytes)
+        state: Dict[str, Any] = {"done": False, "audit": None}
+
+        def finish() -> None:
+            state["done"] = True
+            state["audit"] = asyncio.ensure_future(self.on_body(tap, scope))
+
+        async def tapped_receive() -> Message:
+            message = await receive()
+            if state["done"]:
+                return message
+            if message["type"] == "http.request":
+                tap.update(message.get("body", b""))
+                if not message.get("more_body", False):
+                    finish()
+            elif message["type"] == "http.disconnect":
+                finish()
+            return message
+
+        async def audited() -> None:
+            # Hash whatever the app left unread, then wait for on_body
+            while not state["done"]:
+                await tapped_receive()
+            await state["audit"]
+
+        async def tapped_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await audited()
+                headers = list(message.get("headers", []))
+                headers.append((b"x-content-sha256", tap.hexdigest().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, tapped_receive, tapped_send)
+        finally:
+            audit: Optional[asyncio.Future] = state["audit"]
+            if audit is None or not audit.done():
+                await audited()
@@ -3,22 +3,77 @@
 
 from __future__ import annotations
 
-import hashlib
-import json
+import asyncio
+import gc
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
 from functools import lru_cache
 
 import boto3
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from presidio_analyzer import AnalyzerEngine
 from presidio_analyzer.nlp_engine import SpacyNlpEngine
 
+from src.audit_sink import CloudWatchAuditSink
+from src.body_audit import BodyAuditMiddleware, BodyTap
+from src.pii_cache import PIIScanCache
+from src.pii_pool import WARMUP_TEXT, PIIScanPool
+from src.pii_prefilter import needs_ner
+
+# --------------------------------------------------------------------------- #
+#  Optional CloudWatch audit sink — batched and flushed in the background
+# --------------------------------------------------------------------------- #
+
+LOG_GROUP = os.getenv("AUDIT_LOG_GROUP")
+LOG_STREAM = os.getenv("AUDIT_LOG_STREAM", "primary")
+FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "5"))
+SPILL_PATH = os.getenv("AUDIT_SPILL_PATH", "/tmp/fedmcp/audit-spill.ndjson")
+
+_sink = (
+    CloudWatchAuditSink(
+        boto3.client("logs"),
+        LOG_GROUP,
+        LOG_STREAM,
+        flush_interval=FLUSH_INTERVAL,
+        spill_path=SPILL_PATH,
+    )
+    if LOG_GROUP
+    else None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the audit flusher and PII workers; drain both on shutdown."""
+    # Workers warm up in the background; /ready reports when they are done
+    await _pii_pool.start(wait=False)
+    if _sink:
+        await _sink.start()
+    try:
+        yield
+    finally:
+        await _pii_pool.close()
+        if _deferred_audits:
+            await asyncio.gather(*_deferred_audits, return_exceptions=True)
+        if _sink:
+            await _sink.close()
+        if _pii_cache:
+            _pii_cache.close()
+
+
+async def _emit_audit(record: dict) -> None:
+    """Queue an audit record for CloudWatch (if configured)."""
+    if _sink:
+        await _sink.emit(record)
+
+
 # --------------------------------------------------------------------------- #
 #  FastAPI app
 # --------------------------------------------------------------------------- #
 
-app = FastAPI(title="FedMCP reference server")
+app = FastAPI(title="FedMCP reference server", lifespan=lifespan)
 
 # --------------------------------------------------------------------------- #
 #  Presidio analyzer — cached to avoid model reload on every request
@@ -33,65 +88,140 @@ def get_analyzer() -> AnalyzerEngine:
     return AnalyzerEngine(nlp_engine=nlp_engine, supported_languages=["en"])
 
 
+# Load the model at import, so children forked afterwards share its pages
+# copy-on-write instead of loading their own copy: the PII pool's workers, and
+# gunicorn's workers under --preload. uvicorn --workers spawns its workers,
+# which re-import this module and each load (and freeze) a copy of their own.
+PII_PRELOAD = os.getenv("PII_PRELOAD", "0") == "1"
+
+if PII_PRELOAD:
+    get_analyzer().analyze(WARMUP_TEXT, language="en")
+    # Keep the collector from touching (and so copying) the preloaded objects
+    gc.collect()
+    gc.freeze()
+
+
 # --------------------------------------------------------------------------- #
-#  Optional CloudWatch audit sink
+#  PII workers — NER runs off the event loop, one warm analyzer per process
 # --------------------------------------------------------------------------- #
 
-LOG_GROUP = os.getenv("AUDIT_LOG_GROUP")
-LOG_STREAM = os.getenv("AUDIT_LOG_STREAM", "primary")
-_logs = boto3.client("logs") if LOG_GROUP else None
+PII_WORKERS = int(os.getenv("PII_WORKERS", str(min(os.cpu_count() or 1, 4))))
+PII_BATCH_SIZE = int(os.getenv("PII_BATCH_SIZE", "16"))
+PII_BATCH_WINDOW = float(os.getenv("PII_BATCH_WINDOW", "0.002"))
+# Seconds a request waits for its scan; slower scans finish in the background
+PII_SCAN_DEADLINE = float(os.getenv("PII_SCAN_DEADLINE", "0.05"))
+# Bodies are hashed in full but only this much (head + tail window) is scanned
+PII_SCAN_MAX_BYTES = int(os.getenv("PII_SCAN_MAX_BYTES", "65536"))
+PII_SCAN_TAIL_BYTES = int(os.getenv("PII_SCAN_TAIL_BYTES", "8192"))
+# Longer texts are split into overlapping sentence windows across the workers
+PII_CHUNK_CHARS = int(os.getenv("PII_CHUNK_CHARS", "8000"))
+PII_CHUNK_OVERLAP = int(os.getenv("PII_CHUNK_OVERLAP", "400"))
+# Skip NER for bodies the regex/token pre-filter finds nothing plausible in
+PII_PREFILTER = os.getenv("PII_PREFILTER", "1") != "0"
+# Results shared by all workers, keyed by body SHA-256; empty path disables
+PII_CACHE_PATH = os.getenv("PII_CACHE_PATH", "/tmp/fedmcp/pii-cache.db")
+PII_CACHE_TTL = float(os.getenv("PII_CACHE_TTL", "3600"))
+PII_CACHE_MAX_ENTRIES = int(os.getenv("PII_CACHE_MAX_ENTRIES", "100000"))
+
+_pii_pool = PIIScanPool(
+    get_analyzer,
+    workers=PII_WORKERS,
+    max_batch=PII_BATCH_SIZE,
+    batch_window=PII_BATCH_WINDOW,
+    chunk_chars=PII_CHUNK_CHARS,
+    chunk_overlap=PII_CHUNK_OVERLAP,
+)
+_pii_cache = (
+    PIIScanCache(PII_CACHE_PATH, ttl_seconds=PII_CACHE_TTL, max_entries=PII_CACHE_MAX_ENTRIES)
+    if PII_CACHE_PATH
+    else None
+)
+_deferred_audits: set[asyncio.Task] = set()
+
+
+async def _scan_result(scan: asyncio.Future) -> bool:
+    try:
+        return bool(await scan)
+    except Exception:
+        return False
+
+
+async def _emit_when_scanned(scan: asyncio.Future, record: dict) -> None:
+    """Complete an audit record whose scan outlived the request deadline."""
+    record["pii"] = await _scan_result(scan)
+    await _emit_audit(record)
+
+
+def _defer_audit(scan: asyncio.Future, record: dict) -> None:
+    task = asyncio.create_task(_emit_when_scanned(scan, record))
+    _deferred_audits.add(task)
+    task.add_done_callback(_deferred_audits.discard)
+
+
+def _cache_scan(sha256: str, scan: asyncio.Future) -> None:
+    # The cache is SQLite with a busy timeout: write (and prune) off the loop
+    if not scan.cancelled() and scan.exception() is None:
+        task = asyncio.create_task(asyncio.to_thread(_pii_cache.put, sha256, scan.result()))
+        _deferred_audits.add(task)
+        task.add_done_callback(_deferred_audits.discard)
 
 
-def _emit_audit(record: dict) -> None:
-    """Send a single audit record to CloudWatch (if configured)."""
-    if not _logs:
+async def _audit_pii(text: str, record: dict) -> None:
+    """Scan ``text`` for PII and emit ``record``, deferring slow scans."""
+    if PII_PREFILTER and not needs_ner(text):
+        record["pii"] = False
+        await _emit_audit(record)
         return
-    _logs.put_log_events(
-        logGroupName=LOG_GROUP,
-        logStreamName=LOG_STREAM,
-        logEvents=[
-            {
-                "timestamp": int(datetime.utcnow().timestamp() * 1000),
-                "message": json.dumps(record),
-            }
-        ],
-    )
+
+    if _pii_cache:
+        cached = await asyncio.to_thread(_pii_cache.get, record["sha256"])
+        if cached is not None:
+            record["pii"] = bool(cached)
+            record["piiCached"] = True
+            await _emit_audit(record)
+            return
+
+    scan = _pii_pool.submit(text)
+    if _pii_cache:
+        scan.add_done_callback(lambda done: _cache_scan(record["sha256"], done))
+    try:
+        record["pii"] = await asyncio.wait_for(_scan_result(asyncio.shield(scan)), PII_SCAN_DEADLINE)
+    except asyncio.TimeoutError:
+        # Let the request through; the audit record is emitted once the scan ends
+        record["piiDeferred"] = True
+        _defer_audit(scan, record)
+    else:
+        await _emit_audit(record)
 
 
 # --------------------------------------------------------------------------- #
-#  Middleware – hashes body + optional PII scan & audit
+#  Middleware – streams body through a hash + sampled PII scan & audit
 # --------------------------------------------------------------------------- #
 
 
-@app.middleware("http")
-async def audit_middleware(request: Request, call_next):  # type: ignore[return-value]
-    raw_body = await request.body()
-    sha256 = hashlib.sha256(raw_body).hexdigest()
+async def _audit_body(tap: BodyTap, scope: dict) -> None:
+    """Audit one request once its body has streamed through the tap."""
+    record = {
+        "ts": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "path": scope["path"],
+        "method": scope["method"],
+        "sha256": tap.hexdigest(),
+    }
+    if tap.truncated:
+        record["piiSampled"] = True
+    await _audit_pii(tap.sample().decode("utf-8", "ignore"), record)
 
-    try:
-        contains_pii = bool(
-            get_analyzer().analyze(raw_body.decode("utf-8", "ignore"), language="en")
-        )
-    except Exception:
-        contains_pii = False
-
-    _emit_audit(
-        {
-            "ts": datetime.utcnow().isoformat(timespec="seconds") + "Z",
-            "path": request.url.path,
-            "method": request.method,
-            "pii": contains_pii,
-            "sha256": sha256,
-        }
-    )
 
-    response: Response = await call_next(request)
-    response.headers["X-Content-SHA256"] = sha256
-    return response
+app.add_middleware(
+    BodyAuditMiddleware,
+    on_body=_audit_body,
+    max_sample_bytes=PII_SCAN_MAX_BYTES,
+    tail_bytes=PII_SCAN_TAIL_BYTES,
+)
 
 
 # --------------------------------------------------------------------------- #
-#  Simple health endpoint
+#  Health (liveness) and readiness endpoints
 # --------------------------------------------------------------------------- #
 
 
@@ -99,3 +229,11 @@ async def audit_middleware(request: Request, call_next):  # type: ignore[return-
 def health() -> dict[str, str]:
     """Basic liveness probe."""
     return {"status": "ok"}
+
+
+@app.get("/ready", tags=["internal"])
+def ready() -> JSONResponse:
+    """Readiness probe: 503 until every PII worker has a warm analyzer."""
+    if not _pii_pool.ready:
+        return JSONResponse({"status": "warming"}, status_code=503)
+    return JSONResponse({"status": "ready"})
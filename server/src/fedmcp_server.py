@@ -7,16 +7,21 @@ Provides artifact storage, signing, verification, and audit capabilities
 import os
 import json
 import hashlib
+import logging
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Tuple
 from uuid import UUID
 import asyncio
+import fcntl
+import time
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import jwk
 from pydantic import BaseModel, Field
-import boto3
 
 # Import our FedMCP core library
 import sys
@@ -24,8 +29,30 @@ sys.path.append(str(Path(__file__).parent.parent))
 from fedmcp import (
     Artifact, ArtifactType, 
     LocalSigner, Verifier,
-    AuditEvent, AuditAction
+    AuditRecord, AuditAction,
+    AuditCheckpoint, verify_chain
 )
+from fedmcp.audit import records_to_rows
+from fedmcp.audit_chain import GENESIS_HASH, SYSTEM_WORKSPACE_ID, link_event
+from fedmcp.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, FedMCPMetrics
+from src.admission import AdmissionController, FairScheduler, RateLimited, TokenBuckets
+from src.audit_sink import RelationalAuditSink
+from src.audit_sql import PostgresAuditWriter, SQLiteAuditWriter
+from src.audit_store import AuditStore, ChainConfig
+from src.bloom_filter import BloomFilter
+from src.json_diff import json_diff
+from src.issued_tokens import IssuedTokens, token_kid
+from src.key_store import KeyStore
+from src.profiler import ProfilerMiddleware, SamplingProfiler
+from src.projection import OFFSET_MIN_BYTES, FieldPath, parse_fields, project_record
+from src.request_metrics import RequestMetricsMiddleware
+from src.search_index import SearchIndex
+from src.shared_state import SharedState
+from src.signing_queue import JobResult, SigningJob, SigningQueue, SigningWorkers
+from src.storage import ArtifactExists, ArtifactMeta, FilteredStorage, LocalStorage, S3Storage
+from src.version_index import ArtifactVersion, VersionConflict, VersionIndex
+
+logger = logging.getLogger(__name__)
 
 
 # --------------------------------------------------------------------------- #
@@ -40,19 +67,109 @@ S3_BUCKET = os.getenv("FEDMCP_ARTIFACT_BUCKET")
 # Signing configuration  
 SIGNING_TYPE = os.getenv("SIGNING_TYPE", "local")  # local or kms
 KMS_KEY_ID = os.getenv("KMS_KEY_ID")
+# Local keys are shared by every worker: a PEM from the environment, or one
+# created once under KEY_STORE_PATH
+SIGNING_KEY_PEM = os.getenv("FEDMCP_SIGNING_KEY_PEM")
+KEY_STORE_PATH = os.getenv("KEY_STORE_PATH", os.path.join(LOCAL_STORAGE_PATH, "keys"))
+KEY_REFRESH_SECONDS = float(os.getenv("KEY_REFRESH_SECONDS", "5"))
+
+# State shared by the workers on this host
+STATE_PATH = os.getenv("STATE_PATH", os.path.join(LOCAL_STORAGE_PATH, "state.db"))
+
+# How long a signed token is recognised by digest on /artifacts/verify;
+# after that it is verified in full again
+ISSUED_TOKEN_TTL = float(os.getenv("ISSUED_TOKEN_TTL", str(30 * 86400)))
+
+# Signed artifacts are immutable (an ID is never rewritten: POST refuses a
+# stored ID and storage writes are create-only), so clients may cache them
+# indefinitely
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
 
 # Audit configuration
 AUDIT_LOG_GROUP = os.getenv("AUDIT_LOG_GROUP")
 AUDIT_LOG_STREAM = os.getenv("AUDIT_LOG_STREAM", "primary")
+AUDIT_STORE_PATH = os.getenv("AUDIT_STORE_PATH", os.path.join(LOCAL_STORAGE_PATH, "audit"))
+AUDIT_SEGMENT_SECONDS = int(os.getenv("AUDIT_SEGMENT_SECONDS", "86400"))
+AUDIT_RETENTION_DAYS = os.getenv("AUDIT_RETENTION_DAYS")  # unset keeps everything
+AUDIT_STREAM = os.getenv("AUDIT_STREAM", "primary")
+AUDIT_CHECKPOINT_INTERVAL = int(os.getenv("AUDIT_CHECKPOINT_INTERVAL", "1000"))
+AUDIT_EXPORT_PATH = os.getenv("AUDIT_EXPORT_PATH")  # Parquet exports of closed segments
+AUDIT_POSTGRES_DSN = os.getenv("AUDIT_POSTGRES_DSN")  # mirror events to Postgres via COPY
+AUDIT_SQLITE_PATH = os.getenv("AUDIT_SQLITE_PATH")  # ... or to a local SQLite table
+
+# Request profiling (off unless enabled): a fraction of requests, plus any
+# request sent with an X-FedMCP-Profile header
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+
+# Admission control for POST /artifacts (each limit is off unless set).
+# Buckets are shared by the workers through STATE_PATH; the concurrency
+# limit is per worker and served round-robin across workspaces.
+RATE_LIMIT_WORKSPACE_RPS = float(os.getenv("RATE_LIMIT_WORKSPACE_RPS", "0"))
+RATE_LIMIT_WORKSPACE_BURST = float(os.getenv("RATE_LIMIT_WORKSPACE_BURST", "0")) or max(1.0, RATE_LIMIT_WORKSPACE_RPS)
+RATE_LIMIT_ACTOR_RPS = float(os.getenv("RATE_LIMIT_ACTOR_RPS", "0"))
+RATE_LIMIT_ACTOR_BURST = float(os.getenv("RATE_LIMIT_ACTOR_BURST", "0")) or max(1.0, RATE_LIMIT_ACTOR_RPS)
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "0"))
+ADMISSION_MAX_QUEUED = int(os.getenv("ADMISSION_MAX_QUEUED", "100"))  # per workspace
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "1.0"))  # seconds queued before a 429
+
+# Asynchronous creates: with the queue enabled, POST /artifacts sent with
+# "Prefer: respond-async" is queued durably and answered with 202
+SIGNING_QUEUE_ENABLED = os.getenv("SIGNING_QUEUE_ENABLED", "false").lower() in ("1", "true", "yes")
+SIGNING_QUEUE_PATH = os.getenv("SIGNING_QUEUE_PATH", os.path.join(LOCAL_STORAGE_PATH, "signing-queue.db"))
+SIGNING_QUEUE_WORKERS = int(os.getenv("SIGNING_QUEUE_WORKERS", "2"))  # batch tasks per process
+SIGNING_QUEUE_BATCH = int(os.getenv("SIGNING_QUEUE_BATCH", "32"))
+SIGNING_QUEUE_LEASE = float(os.getenv("SIGNING_QUEUE_LEASE", "60"))  # seconds before a stuck job is retried
+STATUS_MAX_WAIT = float(os.getenv("STATUS_MAX_WAIT", "30"))  # longest long-poll on /status
+
+# Full-text and field index over jsonBody for GET /search, updated on every
+# write and kept on disk. An index that was never completely filled is
+# filled from storage at startup, by one worker. Like the version index it
+# is a local file: it assumes a single node, whose writes it sees.
+SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", os.path.join(LOCAL_STORAGE_PATH, "search.db"))
+
+# Lineage and version of every artifact, for version history and diffs
+# (local to this node, filled like the search index)
+VERSION_INDEX_PATH = os.getenv("VERSION_INDEX_PATH", os.path.join(LOCAL_STORAGE_PATH, "versions.db"))
+
+# Bloom filter of stored artifact IDs, shared by the workers on one host:
+# lookups of unknown IDs get their 404 without a storage call (a GET per miss
+# on S3). Single node only: an artifact written through another replica is
+# not in this host's filter and would get a 404, so it is off by default.
+EXISTENCE_FILTER_ENABLED = os.getenv("EXISTENCE_FILTER_ENABLED", "false").lower() in ("1", "true", "yes")
+EXISTENCE_FILTER_PATH = os.getenv("EXISTENCE_FILTER_PATH", os.path.join(LOCAL_STORAGE_PATH, "artifacts.bloom"))
+EXISTENCE_FILTER_CAPACITY = int(os.getenv("EXISTENCE_FILTER_CAPACITY", "1000000"))  # expected artifacts
+EXISTENCE_FILTER_FALSE_POSITIVE_RATE = float(os.getenv("EXISTENCE_FILTER_FALSE_POSITIVE_RATE", "0.01"))
 
 # --------------------------------------------------------------------------- #
 #  FastAPI app
 # --------------------------------------------------------------------------- #
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the relational audit writer and signing workers (if configured); drain them on shutdown"""
+    if audit_sql_sink:
+        await audit_sql_sink.start()
+    if signing_workers:
+        await signing_workers.start()
+    prepare = asyncio.create_task(prepare_indexes())
+    try:
+        yield
+    finally:
+        prepare.cancel()
+        if signing_workers:
+            await signing_workers.close()
+        if audit_sql_sink:
+            await audit_sql_sink.close()
+
+
 app = FastAPI(
     title="FedMCP Reference Server",
     version="0.2.0",
-    description="Federal Model Context Protocol reference implementation"
+    description="Federal Model Context Protocol reference implementation",
+    lifespan=lifespan
 )
 
 security = HTTPBearer()
@@ -64,6 +181,8 @@ security = HTTPBearer()
 class CreateArtifactRequest(BaseModel):
     artifact: Dict[str, Any]
     sign: bool = True
+    # ID of the version this artifact replaces; it must be the latest one
+    supersedes: Optional[str] = None
 
 class JWSResponse(BaseModel):
     jws: str
@@ -79,115 +198,144 @@ class VerifyResponse(BaseModel):
     error: Optional[str] = None
 
 # --------------------------------------------------------------------------- #
-#  Storage backend
+#  Initialize components
 # --------------------------------------------------------------------------- #
 
-class StorageBackend:
-    """Abstract storage backend"""
-    
-    async def store_artifact(self, artifact_id: str, data: Dict[str, Any]) -> None:
-        raise NotImplementedError
-        
-    async def get_artifact(self, artifact_id: str) -> Optional[Dict[str, Any]]:
-        raise NotImplementedError
-        
-    async def list_artifacts(self, workspace_id: Optional[str] = None) -> List[str]:
-        raise NotImplementedError
+# Metrics — per worker process, scraped from /metrics
+metrics = FedMCPMetrics()
+app.add_middleware(RequestMetricsMiddleware, metrics=metrics)
 
-
-class LocalStorage(StorageBackend):
-    """Local filesystem storage"""
-    
-    def __init__(self, path: str):
-        self.path = Path(path)
-        self.path.mkdir(parents=True, exist_ok=True)
-        
-    async def store_artifact(self, artifact_id: str, data: Dict[str, Any]) -> None:
-        file_path = self.path / f"{artifact_id}.json"
-        with open(file_path, 'w') as f:
-            json.dump(data, f)
-            
-    async def get_artifact(self, artifact_id: str) -> Optional[Dict[str, Any]]:
-        file_path = self.path / f"{artifact_id}.json"
-        if not file_path.exists():
-            return None
-        with open(file_path, 'r') as f:
-            return json.load(f)
-            
-    async def list_artifacts(self, workspace_id: Optional[str] = None) -> List[str]:
-        artifacts = []
-        for file_path in self.path.glob("*.json"):
-            if workspace_id:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    if data.get("artifact", {}).get("workspaceId") == workspace_id:
-                        artifacts.append(file_path.stem)
-            else:
-                artifacts.append(file_path.stem)
-        return artifacts
-
-
-class S3Storage(StorageBackend):
-    """AWS S3 storage"""
-    
-    def __init__(self, bucket: str):
-        self.bucket = bucket
-        self.s3 = boto3.client('s3')
-        
-    async def store_artifact(self, artifact_id: str, data: Dict[str, Any]) -> None:
-        self.s3.put_object(
-            Bucket=self.bucket,
-            Key=f"artifacts/{artifact_id}.json",
-            Body=json.dumps(data),
-            ContentType='application/json'
-        )
-        
-    async def get_artifact(self, artifact_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            response = self.s3.get_object(
-                Bucket=self.bucket,
-                Key=f"artifacts/{artifact_id}.json"
-            )
-            return json.loads(response['Body'].read())
-        except self.s3.exceptions.NoSuchKey:
-            return None
-            
-    async def list_artifacts(self, workspace_id: Optional[str] = None) -> List[str]:
-        # For workspace filtering, would need to store metadata or scan objects
-        response = self.s3.list_objects_v2(
-            Bucket=self.bucket,
-            Prefix="artifacts/"
-        )
-        artifacts = []
-        for obj in response.get('Contents', []):
-            artifact_id = obj['Key'].split('/')[-1].replace('.json', '')
-            artifacts.append(artifact_id)
-        return artifacts
-
-# --------------------------------------------------------------------------- #
-#  Initialize components
-# --------------------------------------------------------------------------- #
+# Profiler — not installed at all when disabled
+profiler = SamplingProfiler(interval=PROFILE_INTERVAL) if PROFILE_ENABLED else None
+if profiler:
+    app.add_middleware(ProfilerMiddleware, profiler=profiler, sample_rate=PROFILE_SAMPLE_RATE)
 
 # Storage
 if STORAGE_TYPE == "s3" and S3_BUCKET:
     storage = S3Storage(S3_BUCKET)
+    STORAGE_BACKEND = "s3"
 else:
     storage = LocalStorage(LOCAL_STORAGE_PATH)
+    STORAGE_BACKEND = "local"
+if EXISTENCE_FILTER_ENABLED:
+    storage = FilteredStorage(
+        storage,
+        BloomFilter(EXISTENCE_FILTER_PATH, EXISTENCE_FILTER_CAPACITY, EXISTENCE_FILTER_FALSE_POSITIVE_RATE),
+        lookups=metrics.registry.counter(
+            "fedmcp_existence_filter_lookups_total", "Artifact lookups answered by the existence filter", ["result"]
+        )
+    )
+    existence_filter_fpr = metrics.registry.gauge(
+        "fedmcp_existence_filter_false_positive_rate", "Estimated false-positive rate of the existence filter"
+    )
+
+# Shared state
+shared_state = SharedState(STATE_PATH)
 
 # Signer
+key_store = None
 if SIGNING_TYPE == "kms" and KMS_KEY_ID:
     from fedmcp import KMSSigner
     signer = KMSSigner(KMS_KEY_ID)
+    SIGNER_TYPE = "kms"
+else:
+    # Every worker loads the same key
+    key_store = KeyStore(KEY_STORE_PATH, pem=SIGNING_KEY_PEM, state=shared_state)
+    signer = LocalSigner(key_store.signing_key())
+    SIGNER_TYPE = "local"
+
+# Verifier — trusts every key the store has published, including retired ones
+verifier = Verifier(key_store.public_keys() if key_store else {})
+if key_store is None:
+    verifier.add_jwk({"kid": signer.get_key_id(), **signer.get_public_key_jwk()})
+_key_checked_at = time.monotonic()
+_revoked_key_ids: Set[str] = key_store.revoked_key_ids() if key_store else set()
+_revocations_checked_at = time.monotonic()
+
+# Tokens signed here, so /artifacts/verify can skip ECDSA for them
+issued_tokens = IssuedTokens(shared_state, ttl=ISSUED_TOKEN_TTL)
+
+# Audit logger — hash-chained, with a signed checkpoint every N events
+audit_store = AuditStore(
+    AUDIT_STORE_PATH,
+    segment_seconds=AUDIT_SEGMENT_SECONDS,
+    retention_seconds=int(AUDIT_RETENTION_DAYS) * 86400 if AUDIT_RETENTION_DAYS else None,
+    chain=ChainConfig(
+        link=link_event,
+        genesis=GENESIS_HASH,
+        # Not TimedSigner: checkpoints are not artifacts signed for clients
+        sign_checkpoint=lambda sequence, head: AuditCheckpoint.create(
+            current_signer(), AUDIT_STREAM, sequence, head
+        ).jws,
+        checkpoint_interval=AUDIT_CHECKPOINT_INTERVAL
+    ),
+    export_path=AUDIT_EXPORT_PATH
+)
+
+STATS_INTERVALS = {"hour": 3600, "day": 86400}
+
+# Admission control
+if RATE_LIMIT_WORKSPACE_RPS or RATE_LIMIT_ACTOR_RPS or ADMISSION_MAX_CONCURRENT:
+    admission = AdmissionController(
+        workspace=TokenBuckets(
+            shared_state, "workspace", RATE_LIMIT_WORKSPACE_RPS, RATE_LIMIT_WORKSPACE_BURST
+        ) if RATE_LIMIT_WORKSPACE_RPS else None,
+        actor=TokenBuckets(
+            shared_state, "actor", RATE_LIMIT_ACTOR_RPS, RATE_LIMIT_ACTOR_BURST
+        ) if RATE_LIMIT_ACTOR_RPS else None,
+        scheduler=FairScheduler(
+            ADMISSION_MAX_CONCURRENT, ADMISSION_MAX_QUEUED
+        ) if ADMISSION_MAX_CONCURRENT else None,
+        max_wait=ADMISSION_MAX_WAIT
+    )
 else:
-    # Create or load local signer
-    signer = LocalSigner()
+    admission = None
+admission_rejected = metrics.registry.counter(
+    "fedmcp_admission_rejected_total", "Requests refused by admission control", ["scope"]
+)
+
+# Queue for asynchronous creates, drained by a few tasks in every worker
+if SIGNING_QUEUE_ENABLED:
+    signing_queue = SigningQueue(SIGNING_QUEUE_PATH, lease_seconds=SIGNING_QUEUE_LEASE)
+    signing_workers = SigningWorkers(
+        signing_queue,
+        lambda jobs: process_signing_jobs(jobs),
+        workers=SIGNING_QUEUE_WORKERS,
+        batch_size=SIGNING_QUEUE_BATCH
+    )
+else:
+    signing_queue = None
+    signing_workers = None
+signing_queue_depth = metrics.registry.gauge(
+    "fedmcp_signing_queue_depth", "Queued creates not yet signed and stored"
+)
+signing_queue_lag = metrics.registry.gauge(
+    "fedmcp_signing_queue_lag_seconds", "Age of the oldest queued create"
+)
+signing_queue_seconds = metrics.registry.histogram(
+    "fedmcp_signing_queue_seconds", "Time from enqueue to signed and stored", ["outcome"]
+)
 
-# Verifier
-verifier = Verifier()
-verifier.add_public_key(signer.get_key_id(), signer.private_key.public_key())
+# Search index
+search_index = SearchIndex(SEARCH_INDEX_PATH) if SEARCH_INDEX_ENABLED else None
+search_seconds = metrics.registry.histogram(
+    "fedmcp_search_seconds", "Search index updates and queries", ["operation"]
+)
+
+# Version history
+version_index = VersionIndex(VERSION_INDEX_PATH)
 
-# Audit logger
-audit_logs = []  # In-memory for demo, use CloudWatch in production
+verify_preverified = metrics.registry.counter(
+    "fedmcp_verify_preverified_total", "Verifications answered from the ingest record, without ECDSA"
+)
+
+# Relational mirror of the audit trail, written in batches off the request path
+if AUDIT_POSTGRES_DSN:
+    audit_sql_sink = RelationalAuditSink(PostgresAuditWriter(AUDIT_POSTGRES_DSN))
+elif AUDIT_SQLITE_PATH:
+    audit_sql_sink = RelationalAuditSink(SQLiteAuditWriter(AUDIT_SQLITE_PATH))
+else:
+    audit_sql_sink = None
 
 # --------------------------------------------------------------------------- #
 #  Helper functions
@@ -197,6 +345,251 @@ def get_current_user(auth: HTTPAuthorizationCredentials = Depends(security)) ->
     """Extract user from auth token (simplified for demo)"""
     return f"user:{auth.credentials[:8]}"
 
+def current_signer():
+    """
+    The signer for new signatures
+
+    Picks up a key rotated by another worker (seen through shared state)
+    at most ``KEY_REFRESH_SECONDS`` after it happened.
+    """
+    global signer, _key_checked_at
+    if key_store is None:
+        return signer
+    now = time.monotonic()
+    if now - _key_checked_at >= KEY_REFRESH_SECONDS:
+        _key_checked_at = now
+        active = key_store.active_key_id()
+        if active and active != signer.get_key_id():
+            signer = LocalSigner(key_store.signing_key())
+            refresh_verifier_keys()
+    return signer
+
+
+def refresh_verifier_keys() -> None:
+    """Trust keys published by other workers since startup, and no revoked ones"""
+    if key_store is not None:
+        verifier.public_keys = key_store.public_keys()
+
+
+def revoked_key_ids() -> Set[str]:
+    """
+    Keys revoked in the key store
+
+    Picks up a revocation by another process at most
+    ``KEY_REFRESH_SECONDS`` after it happened.
+    """
+    global _revoked_key_ids, _revocations_checked_at
+    if key_store is None:
+        return _revoked_key_ids
+    now = time.monotonic()
+    if now - _revocations_checked_at >= KEY_REFRESH_SECONDS:
+        _revocations_checked_at = now
+        revoked = key_store.revoked_key_ids()
+        if revoked != _revoked_key_ids:
+            _revoked_key_ids = revoked
+            refresh_verifier_keys()
+    return _revoked_key_ids
+
+
+class TimedSigner:
+    """The current signer, with each signature recorded in ``metrics``"""
+
+    def sign(self, artifact: Artifact) -> str:
+        with metrics.sign_seconds.time(signer=SIGNER_TYPE):
+            jws_token = current_signer().sign(artifact)
+        metrics.artifacts_signed_total.inc(signer=SIGNER_TYPE)
+        return jws_token
+
+
+def storage_timer(operation: str):
+    """Time a storage call for ``fedmcp_storage_seconds``"""
+    return metrics.storage_seconds.time(backend=STORAGE_BACKEND, operation=operation)
+
+
+async def write_artifact(artifact: Artifact, jws_token: Optional[str], lineage_id: Optional[str] = None) -> None:
+    """
+    Store a new artifact record, signed or not
+
+    Its ID and version are claimed in the version index first, so a stored
+    artifact is never rewritten: changed content needs a new ID that
+    supersedes it.
+
+    Raises:
+        VersionConflict: If the version is already taken, or the artifact
+            already exists
+    """
+    if shared_state.get(INDEX_BACKFILL_STATE + VERSION_INDEX_PATH) is None:
+        # Until the backfill completes the index may not know every stored artifact
+        with storage_timer("head"):
+            stored = await storage.head_artifact(str(artifact.id))
+        if stored is not None:
+            raise VersionConflict(f"Artifact {artifact.id} already exists")
+    record = {"artifact": artifact.model_dump(by_alias=True, mode="json")}
+    if jws_token:
+        record["jws"] = jws_token
+    if lineage_id and lineage_id != str(artifact.id):
+        record["lineage"] = lineage_id
+    await asyncio.to_thread(version_index.add, record_version(record))
+    try:
+        with storage_timer("write"):
+            await storage.store_artifact(str(artifact.id), record, etag=artifact_etag(artifact, jws_token))
+    except BaseException as e:
+        await asyncio.to_thread(version_index.remove, str(artifact.id))
+        if isinstance(e, ArtifactExists):
+            # Stored by another node, or before the index knew it
+            raise VersionConflict(str(e)) from e
+        raise
+    # The record is stored: failing to index it must not fail the write
+    if jws_token:
+        try:
+            await asyncio.to_thread(
+                issued_tokens.record, jws_token, str(artifact.id), str(artifact.workspaceId)
+            )
+        except Exception as e:
+            # Its token is still verified, just in full
+            logger.warning("Could not record the token of %s: %s", artifact.id, e)
+    if search_index is not None:
+        try:
+            with search_seconds.time(operation="index"):
+                await asyncio.to_thread(search_index.add, record["artifact"])
+        except Exception as e:
+            metrics.errors_total.inc(stage="search_index")
+            # The next backfill picks it up
+            shared_state.delete(INDEX_BACKFILL_STATE + SEARCH_INDEX_PATH)
+            logger.warning("Could not index %s for search: %s", artifact.id, e)
+
+
+def record_version(record: Dict[str, Any]) -> ArtifactVersion:
+    """A stored record's place in its lineage"""
+    artifact = record["artifact"]
+    return ArtifactVersion(
+        lineage_id=record.get("lineage") or artifact["id"],
+        version=artifact.get("version", 1),
+        artifact_id=artifact["id"],
+        workspace_id=artifact.get("workspaceId"),
+        created_at=artifact.get("createdAt")
+    )
+
+
+async def backfill_indexes(search: bool, versions: bool) -> None:
+    """Index artifacts stored before the indexes existed (or were last complete)"""
+    with storage_timer("list"):
+        artifact_ids = await storage.list_artifacts(None)
+    for artifact_id in artifact_ids:
+        try:
+            with storage_timer("read"):
+                record = await storage.get_artifact(artifact_id)
+            if not record:
+                continue
+            if search:
+                await asyncio.to_thread(search_index.add, record["artifact"])
+            if versions:
+                # Artifacts written since the backfill started are indexed already
+                with suppress(VersionConflict):
+                    await asyncio.to_thread(version_index.add, record_version(record))
+        except Exception as e:
+            logger.warning("Index backfill skipped %s: %s", artifact_id, e)
+
+
+INDEX_BACKFILL_STATE = "indexes:backfilled:"
+
+
+async def index_needs_backfill(index: Any, path: str) -> bool:
+    """Whether an index was never completely filled, or has been emptied since"""
+    if shared_state.get(INDEX_BACKFILL_STATE + path) is None:
+        return True
+    return not await asyncio.to_thread(len, index)
+
+
+async def prepare_indexes() -> None:
+    """
+    Backfill indexes that aren't complete, and fill a new existence filter
+
+    Every worker runs this at startup, but only the one that takes the
+    backfill lock does the work; a worker that starts later finds the
+    indexes and the filter marked complete. Until a backfill finishes, searches and
+    version lookups miss the artifacts it hasn't reached yet.
+    """
+    with open(STATE_PATH + ".backfill.lock", "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another worker is on it
+            return
+        search = search_index is not None and await index_needs_backfill(search_index, SEARCH_INDEX_PATH)
+        versions = await index_needs_backfill(version_index, VERSION_INDEX_PATH)
+        if search or versions:
+            logger.info("Backfilling indexes from storage (search=%s, versions=%s)", search, versions)
+            await backfill_indexes(search, versions)
+            for done, path in ((search, SEARCH_INDEX_PATH), (versions, VERSION_INDEX_PATH)):
+                if done:
+                    shared_state.set(INDEX_BACKFILL_STATE + path, datetime.now(timezone.utc).isoformat())
+        if isinstance(storage, FilteredStorage) and not storage.ready:
+            # Storage, not a local index, is the record of what exists
+            with storage_timer("list"):
+                artifact_ids = await storage.list_artifacts(None)
+            await asyncio.to_thread(storage.rebuild, artifact_ids)
+
+
+def verify_token(jws_token: str) -> Artifact:
+    """Verify a JWS, reloading published keys once if its key is unknown"""
+    with metrics.verify_seconds.time(signer=SIGNER_TYPE):
+        try:
+            return _verify_token(jws_token)
+        except Exception:
+            metrics.errors_total.inc(stage="verify")
+            raise
+
+
+def _verify_token(jws_token: str) -> Artifact:
+    try:
+        return verifier.verify(jws_token)
+    except ValueError as e:
+        if key_store is None or not str(e).startswith("Unknown key ID"):
+            raise
+    refresh_verifier_keys()
+    return verifier.verify(jws_token)
+
+
+def artifact_etag(artifact: Artifact, jws_token: Optional[str] = None) -> str:
+    """
+    Strong validator for a stored record
+
+    The artifact hash identifies the content; signed records also carry
+    the JWS digest since re-signing changes the stored bytes.
+    """
+    etag = artifact.hash()
+    if jws_token:
+        etag += "-" + hashlib.sha256(jws_token.encode()).hexdigest()[:16]
+    return etag
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Evaluate an If-None-Match header (weak comparison, RFC 7232 3.2)"""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+def projection_etag(etag: Optional[str], fields: Optional[List[FieldPath]], include_jws: bool) -> Optional[str]:
+    """Validator for a projection: the record's ETag plus a digest of the selection"""
+    if not etag or (fields is None and include_jws):
+        return etag
+    selection = json.dumps([fields, include_jws]).encode()
+    return f"{etag}-p{hashlib.sha256(selection).hexdigest()[:8]}"
+
+def cache_headers(meta: ArtifactMeta, etag: Optional[str] = None) -> Dict[str, str]:
+    """Caching headers for an artifact; signed versions never change"""
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL if meta.signed else "private, no-cache"}
+    etag = etag or meta.etag
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+    return headers
+
 async def log_audit_event(
     action: AuditAction,
     actor: str,
@@ -205,15 +598,20 @@ async def log_audit_event(
     metadata: Optional[Dict[str, Any]] = None
 ):
     """Log an audit event"""
-    event = AuditEvent(
+    record = AuditRecord(
         action=action,
         actor=actor,
-        artifactId=UUID(artifact_id) if artifact_id else None,
-        workspaceId=UUID(workspace_id) if workspace_id else UUID("00000000-0000-0000-0000-000000000000"),
-        metadata=metadata or {}
+        artifact_id=UUID(artifact_id) if artifact_id else None,
+        workspace_id=UUID(workspace_id) if workspace_id else SYSTEM_WORKSPACE_ID,
+        metadata=metadata
     )
     
-    audit_logs.append(event.model_dump(by_alias=True))
+    with metrics.audit_append_seconds.time(sink="store"):
+        # The chain lock and SQLite commit block; keep them off the event loop
+        await asyncio.to_thread(audit_store.append, record.to_dict(), ts_ms=record.ts_ns // 1_000_000)
+    if audit_sql_sink:
+        with metrics.audit_append_seconds.time(sink="sql"):
+            await audit_sql_sink.emit_row(records_to_rows([record])[0])
     
     # Optionally send to CloudWatch
     if AUDIT_LOG_GROUP:
@@ -230,45 +628,73 @@ async def health():
     return {"status": "healthy", "version": "0.2.0"}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for this worker process"""
+    if signing_queue:
+        signing_queue_depth.set(await asyncio.to_thread(signing_queue.depth))
+        signing_queue_lag.set(await asyncio.to_thread(signing_queue.lag))
+    if isinstance(storage, FilteredStorage):
+        existence_filter_fpr.set(await asyncio.to_thread(storage.bloom.estimated_false_positive_rate))
+    return Response(content=metrics.registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.post("/artifacts", response_model=JWSResponse)
 async def create_artifact(
     request: CreateArtifactRequest,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    prefer: Optional[str] = Header(None)
 ):
-    """Create and optionally sign a new artifact"""
+    """
+    Create and optionally sign a new artifact
+
+    Subject to admission control: a request over its workspace's or
+    actor's rate, or queued longer than ``ADMISSION_MAX_WAIT``, gets 429
+    with ``Retry-After``. With the signing queue enabled, a request sent
+    with ``Prefer: respond-async`` is queued and answered with 202.
+    """
+    # A new version is checked against the latest one, so it isn't queued
+    if signing_queue and prefer and "respond-async" in prefer.lower() and not request.supersedes:
+        handler = enqueue_new_artifact
+    else:
+        handler = store_new_artifact
+    if admission is None:
+        return await handler(request, current_user)
+    try:
+        async with admission.admit(str(request.artifact.get("workspaceId")), current_user):
+            return await handler(request, current_user)
+    except RateLimited as e:
+        admission_rejected.inc(scope=e.scope)
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header}
+        )
+
+
+async def store_new_artifact(request: CreateArtifactRequest, current_user: str) -> JWSResponse:
+    """Sign (if requested), store and audit a new artifact"""
     try:
         # Create artifact from request
-        artifact = Artifact(**request.artifact)
+        fields = dict(request.artifact)
+        lineage_id = None
+        if request.supersedes:
+            lineage_id, fields["version"] = await next_version(request.supersedes, fields)
+        artifact = Artifact(**fields)
         
-        # Validate
-        artifact.validate()
-        
-        # Sign if requested
-        if request.sign:
-            jws_token = signer.sign(artifact)
-            
-            # Store the signed artifact
-            await storage.store_artifact(
-                str(artifact.id),
-                {
-                    "artifact": artifact.model_dump(by_alias=True),
-                    "jws": jws_token
-                }
-            )
-        else:
-            # Store unsigned artifact
-            await storage.store_artifact(
-                str(artifact.id),
-                {"artifact": artifact.model_dump(by_alias=True)}
-            )
-            jws_token = None
+        # Sign if requested, then store
+        jws_token = TimedSigner().sign(artifact) if request.sign else None
+        try:
+            await write_artifact(artifact, jws_token, lineage_id)
+        except VersionConflict as e:
+            # The ID exists, or another version was stored since next_version looked
+            raise HTTPException(status_code=409, detail=str(e))
         
         # Audit
         await log_audit_event(
             action=AuditAction.CREATE,
             actor=current_user,
             artifact_id=str(artifact.id),
-            workspace_id=str(artifact.workspaceId)
+            workspace_id=str(artifact.workspaceId),
+            metadata={"supersedes": request.supersedes} if request.supersedes else None
         )
         
         return JWSResponse(
@@ -277,19 +703,203 @@ async def create_artifact(
             workspace_id=str(artifact.workspaceId)
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+async def next_version(supersedes: str, fields: Dict[str, Any]) -> Tuple[str, int]:
+    """
+    Lineage and version number for an artifact superseding ``supersedes``
+
+    The version number is assigned here; one in the request is replaced.
+
+    Raises:
+        HTTPException: 404 if the superseded artifact is unknown, 409 if it
+            isn't the latest version, 400 if the new artifact changes workspace
+    """
+    previous = await asyncio.to_thread(version_index.get, supersedes)
+    if previous is None:
+        raise HTTPException(status_code=404, detail=f"Artifact {supersedes} not found")
+    latest = await asyncio.to_thread(version_index.resolve, previous.lineage_id)
+    if latest.artifact_id != previous.artifact_id:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Artifact {supersedes} is not the latest version; version {latest.version} is {latest.artifact_id}"
+        )
+    if str(fields.get("workspaceId")) != str(previous.workspace_id):
+        raise HTTPException(status_code=400, detail="A new version must stay in the same workspace")
+    return previous.lineage_id, previous.version + 1
+
+
+async def enqueue_new_artifact(request: CreateArtifactRequest, current_user: str) -> JSONResponse:
+    """Validate a new artifact and queue it for signing and storage"""
+    try:
+        artifact = Artifact(**request.artifact)
+        if await asyncio.to_thread(version_index.get, str(artifact.id)) is not None:
+            raise VersionConflict(f"Artifact {artifact.id} already exists")
+        await asyncio.to_thread(
+            signing_queue.enqueue,
+            str(artifact.id),
+            str(artifact.workspaceId),
+            current_user,
+            artifact.model_dump(by_alias=True, mode="json"),
+            request.sign
+        )
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    signing_workers.notify()
+
+    status_url = f"/artifacts/{artifact.id}/status"
+    return JSONResponse(
+        status_code=202,
+        content={
+            "artifact_id": str(artifact.id),
+            "workspace_id": str(artifact.workspaceId),
+            "status": "pending",
+            "status_url": status_url
+        },
+        headers={"Location": status_url, "Preference-Applied": "respond-async"}
+    )
+
+
+async def process_signing_jobs(jobs: List[SigningJob]) -> List[JobResult]:
+    """Sign, store and audit a batch of queued creates"""
+    def sign_all() -> List[Any]:
+        # KMS calls block and local signing is CPU work: keep both off the loop
+        signed = []
+        for job in jobs:
+            try:
+                artifact = Artifact(**job.artifact)
+                signed.append((artifact, TimedSigner().sign(artifact) if job.sign else None))
+            except Exception as e:
+                signed.append(e)
+        return signed
+
+    signed = await asyncio.to_thread(sign_all)
+    # Signing may have outlasted the lease: leave jobs claimed again since alone
+    held = await asyncio.to_thread(signing_queue.held, jobs[0].claim, [job.artifact_id for job in jobs])
+    signed = [
+        outcome if job.artifact_id in held or isinstance(outcome, Exception)
+        else RuntimeError("Signing lease expired")
+        for job, outcome in zip(jobs, signed)
+    ]
+    writes = await asyncio.gather(
+        *(write_artifact(*outcome) for outcome in signed if not isinstance(outcome, Exception)),
+        return_exceptions=True
+    )
+    write_errors = iter(writes)
+
+    results = []
+    now = time.time()
+    for job, outcome in zip(jobs, signed):
+        error = outcome if isinstance(outcome, Exception) else next(write_errors)
+        if isinstance(error, Exception):
+            results.append(JobResult(job.artifact_id, error=str(error)))
+            signing_queue_seconds.observe(now - job.enqueued_at, outcome="failed")
+            continue
+        artifact, jws_token = outcome
+        await log_audit_event(
+            action=AuditAction.CREATE,
+            actor=job.actor,
+            artifact_id=job.artifact_id,
+            workspace_id=str(artifact.workspaceId),
+            metadata={"queued": True}
+        )
+        results.append(JobResult(job.artifact_id, jws=jws_token))
+        signing_queue_seconds.observe(now - job.enqueued_at, outcome="done")
+    return results
+
+
+@app.get("/artifacts/{artifact_id}/status")
+async def get_artifact_status(
+    artifact_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for a pending job to finish"),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    State of an asynchronous create: pending, done (with the JWS) or failed
+
+    With ``wait`` the request is held until the job finishes or ``wait``
+    seconds (at most ``STATUS_MAX_WAIT``) pass. Artifacts created
+    synchronously report ``done``.
+    """
+    deadline = time.monotonic() + min(wait, STATUS_MAX_WAIT)
+    while True:
+        job = await asyncio.to_thread(signing_queue.status, artifact_id) if signing_queue else None
+        if job is None or job["status"] != "pending" or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(0.05)
+
+    if job is None:
+        with storage_timer("head"):
+            meta = await storage.head_artifact(artifact_id)
+        if meta is None:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+        stored = await storage.get_artifact(artifact_id) if meta.signed else None
+        return {"artifact_id": artifact_id, "status": "done", "jws": (stored or {}).get("jws")}
+    return {
+        "artifact_id": artifact_id,
+        "status": job["status"],
+        "jws": job["jws"],
+        "error": job["error"]
+    }
+
+
 @app.get("/artifacts/{artifact_id}")
 async def get_artifact(
     artifact_id: str,
+    request: Request,
+    fields: List[str] = Query([], description="Artifact paths to return, e.g. jsonBody.name or /jsonBody/name"),
+    include_jws: bool = True,
+    version: Optional[str] = Query(None, description="latest, or a version number of the artifact's lineage"),
     current_user: str = Depends(get_current_user)
 ):
-    """Retrieve an artifact by ID"""
-    data = await storage.get_artifact(artifact_id)
+    """
+    Retrieve an artifact by ID, streaming the stored record untouched
+
+    Honors If-None-Match against the ETag stored at create time; a match
+    is answered with 304 from metadata alone, without reading the record.
+    With ``fields`` or ``include_jws=false`` only part of the record is
+    returned, cut from the stored bytes. With ``version`` the artifact
+    served is that version of the given artifact's lineage.
+    """
+    try:
+        selection = parse_fields(fields) if fields else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    extra_headers = {}
+    if version is not None:
+        artifact_id = (await resolve_version(artifact_id, version)).artifact_id
+        extra_headers["Content-Location"] = f"/artifacts/{artifact_id}"
+        if version == "latest":
+            # The next version changes what this URL returns
+            extra_headers["Cache-Control"] = "private, no-cache"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        with storage_timer("head"):
+            meta = await storage.head_artifact(artifact_id)
+        if meta is None:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+        etag = projection_etag(meta.etag, selection, include_jws)
+        if etag and etag_matches(if_none_match, etag):
+            await log_audit_event(
+                action=AuditAction.READ,
+                actor=current_user,
+                artifact_id=artifact_id,
+                workspace_id=meta.workspace_id,
+                metadata={"notModified": True}
+            )
+            return Response(status_code=304, headers={**cache_headers(meta, etag), **extra_headers})
     
-    if not data:
+    with storage_timer("read"):
+        stored = await storage.open_artifact(artifact_id)
+    
+    if stored is None:
         raise HTTPException(status_code=404, detail="Artifact not found")
     
     # Audit
@@ -297,10 +907,105 @@ async def get_artifact(
         action=AuditAction.READ,
         actor=current_user,
         artifact_id=artifact_id,
-        workspace_id=data["artifact"].get("workspaceId")
+        workspace_id=stored.meta.workspace_id
     )
     
-    return data
+    body = stored.body
+    if selection is not None or not include_jws:
+        offsets = None
+        if len(body) >= OFFSET_MIN_BYTES:
+            with storage_timer("read"):
+                offsets = await storage.read_offsets(artifact_id, body)
+        body = project_record(body, offsets, selection, include_jws)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={
+            **cache_headers(stored.meta, projection_etag(stored.meta.etag, selection, include_jws)),
+            **extra_headers
+        }
+    )
+
+
+async def resolve_version(artifact_id: str, version: str) -> ArtifactVersion:
+    """
+    A version (a number or ``latest``) of the lineage ``artifact_id`` belongs to
+
+    Raises:
+        HTTPException: 400 for a malformed version, 404 if there is no such
+            artifact or version
+    """
+    if version == "latest":
+        number = None
+    elif version.isdigit():
+        number = int(version)
+    else:
+        raise HTTPException(status_code=400, detail=f"Expected a version number or 'latest', got {version!r}")
+    entry = await asyncio.to_thread(version_index.get, artifact_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    target = await asyncio.to_thread(version_index.resolve, entry.lineage_id, number)
+    if target is None:
+        raise HTTPException(status_code=404, detail=f"Version {version} not found")
+    return target
+
+
+@app.get("/artifacts/{artifact_id}/versions")
+async def list_artifact_versions(
+    artifact_id: str,
+    current_user: str = Depends(get_current_user)
+):
+    """All versions of the artifact's lineage, oldest first"""
+    entry = await asyncio.to_thread(version_index.get, artifact_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    versions = await asyncio.to_thread(version_index.versions, entry.lineage_id)
+    return {
+        "lineage_id": entry.lineage_id,
+        "latest": versions[-1].version,
+        "versions": [
+            {"version": v.version, "artifact_id": v.artifact_id, "createdAt": v.created_at}
+            for v in versions
+        ]
+    }
+
+
+@app.get("/artifacts/{artifact_id}/diff")
+async def diff_artifact_versions(
+    artifact_id: str,
+    from_version: Optional[str] = Query(None, alias="from", description="Version to diff from (default: this artifact's)"),
+    to_version: str = Query("latest", alias="to", description="Version to diff to"),
+    current_user: str = Depends(get_current_user)
+):
+    """Structural diff (JSON Patch) between two versions of the artifact's lineage"""
+    if from_version:
+        source = await resolve_version(artifact_id, from_version)
+    else:
+        source = await asyncio.to_thread(version_index.get, artifact_id)
+        if source is None:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+    target = await resolve_version(artifact_id, to_version)
+
+    with storage_timer("read"):
+        old, new = await asyncio.gather(
+            storage.get_artifact(source.artifact_id), storage.get_artifact(target.artifact_id)
+        )
+    if old is None or new is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    for entry in (source, target):
+        await log_audit_event(
+            action=AuditAction.READ,
+            actor=current_user,
+            artifact_id=entry.artifact_id,
+            workspace_id=entry.workspace_id,
+            metadata={"diff": True}
+        )
+    return {
+        "lineage_id": source.lineage_id,
+        "from": {"version": source.version, "artifact_id": source.artifact_id},
+        "to": {"version": target.version, "artifact_id": target.artifact_id},
+        "changes": json_diff(old["artifact"], new["artifact"])
+    }
 
 
 @app.post("/artifacts/verify", response_model=VerifyResponse)
@@ -308,10 +1013,37 @@ async def verify_artifact(
     request: VerifyRequest,
     current_user: str = Depends(get_current_user)
 ):
-    """Verify a JWS-signed artifact"""
+    """
+    Verify a JWS-signed artifact
+
+    A token this server issued (its digest was recorded at ingest) is
+    answered from that record unless its key has been revoked; any other
+    token is verified in full.
+    """
     try:
+        revoked = revoked_key_ids()
+        kid = token_kid(request.jws)
+        if kid in revoked:
+            raise ValueError(f"Key {kid} has been revoked")
+
+        issued = issued_tokens.lookup(request.jws)
+        if issued is not None:
+            verify_preverified.inc()
+            await log_audit_event(
+                action=AuditAction.VERIFY,
+                actor=current_user,
+                artifact_id=issued["artifactId"],
+                workspace_id=issued["workspaceId"],
+                metadata={"preverified": True}
+            )
+            # The payload holds the canonical artifact JSON: no need to parse it
+            return Response(
+                content=f'{{"valid": true, "artifact": {IssuedTokens.artifact_json(request.jws)}, "error": null}}',
+                media_type="application/json"
+            )
+
         # Verify the JWS
-        artifact = verifier.verify(request.jws)
+        artifact = verify_token(request.jws)
         
         # Audit
         await log_audit_event(
@@ -339,7 +1071,8 @@ async def list_artifacts(
     current_user: str = Depends(get_current_user)
 ):
     """List artifacts, optionally filtered by workspace"""
-    artifact_ids = await storage.list_artifacts(workspace_id)
+    with storage_timer("list"):
+        artifact_ids = await storage.list_artifacts(workspace_id)
     
     return {
         "artifacts": artifact_ids,
@@ -347,29 +1080,177 @@ async def list_artifacts(
     }
 
 
+@app.get("/search")
+async def search_artifacts(
+    q: Optional[str] = Query(None, description="Words that must all appear in jsonBody string values"),
+    field: List[str] = Query([], description="path:value conditions on jsonBody, e.g. model.name:medllm-7b"),
+    workspace_id: Optional[str] = None,
+    type: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user: str = Depends(get_current_user)
+):
+    """Search artifact bodies, newest first"""
+    if search_index is None:
+        raise HTTPException(status_code=404, detail="Search is not enabled")
+    fields = {}
+    for condition in field:
+        path, sep, value = condition.partition(":")
+        if not sep or not path:
+            raise HTTPException(status_code=400, detail=f"Expected path:value, got {condition!r}")
+        fields[path] = value
+    if not q and not fields:
+        raise HTTPException(status_code=400, detail="Give a query (q) or at least one field")
+
+    with search_seconds.time(operation="query"):
+        artifact_ids, total = await asyncio.to_thread(
+            search_index.search, q, fields, workspace_id, type, limit, offset
+        )
+    return {
+        "artifacts": artifact_ids,
+        "count": len(artifact_ids),
+        "total": total,
+        "next_offset": offset + len(artifact_ids) if offset + len(artifact_ids) < total else None
+    }
+
+
 @app.get("/audit/events")
 async def get_audit_events(
     artifact_id: Optional[str] = None,
     workspace_id: Optional[str] = None,
-    limit: int = 100
+    actor: Optional[str] = None,
+    action: Optional[AuditAction] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000)
 ):
-    """Query audit events"""
-    events = audit_logs[-limit:]
-    
-    # Filter if requested
-    if artifact_id:
-        events = [e for e in events if e.get("artifactId") == artifact_id]
-    if workspace_id:
-        events = [e for e in events if e.get("workspaceId") == workspace_id]
+    """Query audit events, most recent ``limit`` matches in time order"""
+    events = await asyncio.to_thread(
+        audit_store.query,
+        artifact_id=artifact_id,
+        workspace_id=workspace_id,
+        actor=actor,
+        action=action.value if action else None,
+        start=start_time,
+        end=end_time,
+        limit=limit
+    )
     
     return {"events": events}
 
 
+@app.get("/audit/stats")
+async def get_audit_stats(
+    group_by: str = "action",
+    interval: str = Query("day", pattern="^(hour|day)$"),
+    workspace_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    action: Optional[AuditAction] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+):
+    """Event counts per time bucket, grouped by action, actor and/or workspace"""
+    dimensions = [name.strip() for name in group_by.split(",") if name.strip()]
+    try:
+        stats = await asyncio.to_thread(
+            audit_store.stats,
+            group_by=dimensions,
+            interval_seconds=STATS_INTERVALS[interval],
+            action=action.value if action else None,
+            actor=actor,
+            workspace_id=workspace_id,
+            start=start_time,
+            end=end_time
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"interval": interval, "groupBy": dimensions, "stats": stats}
+
+
+@app.get("/audit/checkpoints/latest")
+async def get_latest_checkpoint():
+    """Most recent signed checkpoint over the audit chain head"""
+    checkpoint = await asyncio.to_thread(audit_store.latest_checkpoint)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="No checkpoint yet")
+    return {"stream": AUDIT_STREAM, **checkpoint}
+
+
+@app.get("/audit/verify")
+async def verify_audit_chain():
+    """
+    Verify the audit chain since the last signed checkpoint
+    
+    Only events after the checkpoint are replayed, so the cost is bounded
+    by the checkpoint interval rather than the size of the trail.
+    """
+    try:
+        checkpoint = await asyncio.to_thread(audit_store.latest_checkpoint)
+        # Another worker may have signed it with a key rotated in since startup
+        refresh_verifier_keys()
+        since = AuditCheckpoint.from_jws(checkpoint["jws"], verifier) if checkpoint else None
+        if since and (since.sequence, since.hash) != (checkpoint["sequence"], checkpoint["hash"]):
+            raise ValueError("Checkpoint record does not match its signature")
+        # Replaying the chain reads and hashes every event since the checkpoint
+        result = await asyncio.to_thread(
+            lambda: verify_chain(audit_store.events_since(since.sequence if since else 0), since)
+        )
+    except ValueError as e:
+        return {"valid": False, "error": str(e)}
+    
+    return {
+        "valid": True,
+        "checkpointSequence": since.sequence if since else None,
+        "sequence": result.sequence,
+        "hash": result.hash,
+        "eventsVerified": result.events_verified
+    }
+
+
+def require_profiler() -> SamplingProfiler:
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is not enabled")
+    return profiler
+
+
+@app.get("/admin/profile")
+async def get_profile_summary(current_user: str = Depends(get_current_user)):
+    """Profiled requests, wall seconds and samples per route"""
+    return {"interval": PROFILE_INTERVAL, "routes": require_profiler().summary()}
+
+
+@app.get("/admin/profile/collapsed")
+async def get_profile_collapsed(
+    route: Optional[str] = None,
+    current_user: str = Depends(get_current_user)
+):
+    """Collapsed stacks (``route;frame;... count``) for flame graph tools"""
+    return Response(content=require_profiler().collapsed(route), media_type="text/plain")
+
+
+@app.delete("/admin/profile")
+async def reset_profile(current_user: str = Depends(get_current_user)):
+    """Discard collected samples"""
+    require_profiler().reset()
+    return {"status": "reset"}
+
+
 @app.get("/jwks")
 async def get_jwks():
-    """Get public keys for verification"""
+    """
+    Get public keys for verification
+
+    Every worker serves the same set: all keys published to the shared key
+    store, including retired ones that older tokens were signed with.
+    """
+    if key_store is None:
+        return {"keys": [{"kid": signer.get_key_id(), **signer.get_public_key_jwk()}]}
     return {
-        "keys": [signer.get_public_key_jwk()]
+        "keys": [
+            {"kid": kid, "use": "sig", **jwk.construct(public_key, algorithm="ES256").to_dict()}
+            for kid, public_key in key_store.public_keys().items()
+        ]
     }
 
 
@@ -0,0 +1,73 @@
+"""
+Ingest records of the tokens this server signed
+
+When an artifact is stored with a JWS the server just produced, the
+token's SHA-256 digest is recorded in ``SharedState`` with its key ID and
+artifact. A token presented to ``/artifacts/verify`` whose digest is
+recorded is byte-for-byte one the server signed, so it is valid as long as
+its key has not been revoked, and its payload can be read without an
+ECDSA verification. Any other token is verified in full.
+
+Records expire after ``ttl`` seconds; a token whose record has expired is
+simply verified in full again. Every ``PURGE_EVERY`` records a worker
+deletes the expired rows, so the table stays bounded by what was signed
+within the TTL.
+"""
+
+import base64
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+ISSUED_STATE_PREFIX = "issued:"
+
+# Records written by this worker between purges of expired state rows
+PURGE_EVERY = 1000
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def token_kid(jws_token: str) -> Optional[str]:
+    """Key ID from a JWS header, without verifying anything"""
+    try:
+        return json.loads(_b64decode(jws_token.split(".", 1)[0])).get("kid")
+    except ValueError:
+        return None
+
+
+class IssuedTokens:
+    """
+    Digests of issued tokens, shared by the workers
+
+    Args:
+        state: ``SharedState`` holding the records
+        ttl: Seconds a record is kept (``None`` keeps it forever)
+    """
+
+    def __init__(self, state: Any, ttl: Optional[float] = None):
+        self.state = state
+        self.ttl = ttl
+        self._recorded = 0
+
+    @staticmethod
+    def _key(jws_token: str) -> str:
+        return ISSUED_STATE_PREFIX + hashlib.sha256(jws_token.encode()).hexdigest()
+
+    def record(self, jws_token: str, artifact_id: str, workspace_id: str) -> None:
+        self.state.set(self._key(jws_token), {
+            "kid": token_kid(jws_token), "artifactId": artifact_id, "workspaceId": workspace_id
+        }, ttl=self.ttl)
+        self._recorded += 1
+        if self._recorded % PURGE_EVERY == 0:
+            self.state.purge_expired()
+
+    def lookup(self, jws_token: str) -> Optional[Dict[str, Any]]:
+        """The ingest record of a token, or ``None`` if it wasn't issued here"""
+        return self.state.get(self._key(jws_token))
+
+    @staticmethod
+    def artifact_json(jws_token: str) -> str:
+        """The canonical artifact JSON in an issued token's payload (trusted: the digest matched)"""
+        return json.loads(_b64decode(jws_token.split(".")[1]))["artifact"]
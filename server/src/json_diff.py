@@ -0,0 +1,44 @@
+"""
+Structural diff of two JSON documents as JSON Patch (RFC 6902)
+
+Applying the operations to the old document yields the new one. Objects
+are compared member by member and arrays element by element (trailing
+elements are added or removed), so a change deep in a large artifact is
+one operation at its path. ``replace`` and ``remove`` operations also
+carry the old value as ``previous``, which patch tools ignore.
+"""
+
+from typing import Any, Dict, List
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def json_diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """Operations turning ``old`` into ``new``"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, value in old.items():
+            member = f"{path}/{_escape(str(key))}"
+            if key not in new:
+                ops.append({"op": "remove", "path": member, "previous": value})
+            else:
+                ops.extend(json_diff(value, new[key], member))
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": f"{path}/{_escape(str(key))}", "value": value})
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        for i in range(min(len(old), len(new))):
+            ops.extend(json_diff(old[i], new[i], f"{path}/{i}"))
+        for i in range(len(old), len(new)):
+            ops.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+        # From the end, so earlier indices stay valid
+        for i in range(len(old) - 1, len(new) - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}", "previous": old[i]})
+        return ops
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new, "previous": old}]
@@ -0,0 +1,193 @@
+"""
+Signing keys shared by every server worker
+
+With ``uvicorn --workers N`` or several replicas, a key generated at import
+time differs per process: each worker signs with its own key and ``/jwks``
+answers differently depending on which worker serves it. ``KeyStore`` keeps
+one active ECDSA P-256 key where all workers find it:
+
+* ``FEDMCP_SIGNING_KEY_PEM`` (a PEM private key in the environment), for
+  replicas on different nodes fed from the same secret; or
+* ``<path>/signing-key.pem`` on disk, created once by whichever worker gets
+  there first.
+
+Every key that has been active is kept as ``<path>/public/<kid>.pem`` so
+tokens signed before a rotation still verify and stay listed in ``/jwks``,
+until the key is revoked: ``revoke`` moves it to ``<path>/revoked/``, after
+which nothing signed with it verifies.
+With a ``SharedState`` the active key ID is also recorded there, which is
+how workers notice that another process rotated the key.
+
+Key IDs match ``LocalSigner``: the first 16 hex chars of the SHA-256 of the
+DER SubjectPublicKeyInfo.
+"""
+
+import fcntl
+import hashlib
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+SIGNING_KEY_FILE = "signing-key.pem"
+PUBLIC_KEY_DIR = "public"
+REVOKED_KEY_DIR = "revoked"
+ACTIVE_KEY_STATE = "signing:active_kid"
+
+
+def key_id(public_key: ec.EllipticCurvePublicKey) -> str:
+    """Key ID as computed by ``LocalSigner``"""
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return hashlib.sha256(der).hexdigest()[:16]
+
+
+def load_private_key_pem(data: bytes) -> ec.EllipticCurvePrivateKey:
+    """
+    Parse an unencrypted PEM private key
+
+    Raises:
+        ValueError: If the PEM is not a P-256 private key
+    """
+    key = serialization.load_pem_private_key(data, password=None)
+    if not isinstance(key, ec.EllipticCurvePrivateKey) or key.curve.name != "secp256r1":
+        raise ValueError("Signing key must be an ECDSA P-256 private key")
+    return key
+
+
+class KeyStore:
+    """
+    Active signing key plus the public half of every key ever used
+
+    Args:
+        path: Directory shared by the workers on this host
+        pem: PEM private key that overrides the on-disk key (e.g. from env)
+        state: ``SharedState`` in which to record the active key ID
+    """
+
+    def __init__(self, path: str, pem: Optional[str] = None, state: Optional[Any] = None):
+        self.path = Path(path)
+        self.pem = pem
+        self.state = state
+        (self.path / PUBLIC_KEY_DIR).mkdir(parents=True, exist_ok=True)
+        (self.path / REVOKED_KEY_DIR).mkdir(exist_ok=True)
+
+    # ------------------------------------------------------------------ #
+    #  Active key
+    # ------------------------------------------------------------------ #
+
+    def signing_key(self) -> ec.EllipticCurvePrivateKey:
+        """The active private key, created on first use"""
+        if self.pem:
+            key = load_private_key_pem(self.pem.encode())
+            self._record_active(self._publish(key.public_key()))
+            return key
+        key_file = self.path / SIGNING_KEY_FILE
+        if key_file.exists():
+            key = load_private_key_pem(key_file.read_bytes())
+            self._record_active(key_id(key.public_key()))
+            return key
+        with self._locked():
+            # Another worker may have created it while we waited
+            if key_file.exists():
+                return load_private_key_pem(key_file.read_bytes())
+            return self._activate(ec.generate_private_key(ec.SECP256R1()))
+
+    def rotate(self) -> ec.EllipticCurvePrivateKey:
+        """
+        Replace the active key; earlier public keys stay published
+
+        Workers that already loaded the old key keep signing with it until
+        they restart, which is safe because its public key is still trusted.
+        """
+        if self.pem:
+            raise ValueError("Keys from FEDMCP_SIGNING_KEY_PEM are rotated by replacing the secret")
+        with self._locked():
+            return self._activate(ec.generate_private_key(ec.SECP256R1()))
+
+    def _activate(self, key: ec.EllipticCurvePrivateKey) -> ec.EllipticCurvePrivateKey:
+        # Publish first, so no token can be signed by a key verifiers can't find
+        kid = self._publish(key.public_key())
+        pem = key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        tmp = self.path / f".{SIGNING_KEY_FILE}.{os.getpid()}"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path / SIGNING_KEY_FILE)
+        if self.state is not None:
+            self.state.set(ACTIVE_KEY_STATE, kid)
+        return key
+
+    def _record_active(self, kid: str) -> None:
+        if self.state is not None and self.state.get(ACTIVE_KEY_STATE) != kid:
+            self.state.set(ACTIVE_KEY_STATE, kid)
+
+    def active_key_id(self) -> Optional[str]:
+        """Key ID of the active key as recorded in shared state"""
+        return self.state.get(ACTIVE_KEY_STATE) if self.state is not None else None
+
+    # ------------------------------------------------------------------ #
+    #  Public keys
+    # ------------------------------------------------------------------ #
+
+    def _publish(self, public_key: ec.EllipticCurvePublicKey) -> str:
+        kid = key_id(public_key)
+        target = self.path / PUBLIC_KEY_DIR / f"{kid}.pem"
+        if not target.exists():
+            pem = public_key.public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+            tmp = target.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(pem)
+            os.replace(tmp, target)
+        return kid
+
+    def public_keys(self) -> Dict[str, ec.EllipticCurvePublicKey]:
+        """Every published public key by key ID, oldest first"""
+        keys = {}
+        files = sorted((self.path / PUBLIC_KEY_DIR).glob("*.pem"), key=lambda p: p.stat().st_mtime)
+        for file_path in files:
+            keys[file_path.stem] = serialization.load_pem_public_key(file_path.read_bytes())
+        return keys
+
+    def revoke(self, kid: str) -> None:
+        """
+        Stop trusting a retired key
+
+        Raises:
+            ValueError: If the key is the active one (rotate first) or unknown
+        """
+        with self._locked():
+            key_file = self.path / SIGNING_KEY_FILE
+            if self.pem or key_file.exists():
+                active = self.pem.encode() if self.pem else key_file.read_bytes()
+                if key_id(load_private_key_pem(active).public_key()) == kid:
+                    raise ValueError(f"Key {kid} is active; rotate before revoking it")
+            public = self.path / PUBLIC_KEY_DIR / f"{kid}.pem"
+            if not public.exists():
+                raise ValueError(f"Unknown key ID: {kid}")
+            os.replace(public, self.path / REVOKED_KEY_DIR / f"{kid}.pem")
+
+    def revoked_key_ids(self) -> Set[str]:
+        return {file_path.stem for file_path in (self.path / REVOKED_KEY_DIR).glob("*.pem")}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(self.path / "keys.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,101 @@
+"""
+On-disk cache of PII scan results keyed by body SHA-256
+
+Retries, polling clients and idempotent re-submissions send byte-identical
+bodies; the middleware already hashes every body, so a hit returns the
+earlier findings without touching the analyzer. The cache is one SQLite
+file in WAL mode, so every worker on the host shares it, and it is bounded
+by a TTL and an entry limit enforced every ``prune_every`` writes.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    sha256 TEXT PRIMARY KEY,
+    findings TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_scans_expires ON scans (expires_at);
+"""
+
+
+class PIIScanCache:
+    """
+    Shared cache from body hash to PII findings
+
+    Args:
+        path: SQLite file shared by all workers
+        ttl_seconds: How long a result stays valid
+        max_entries: Entries kept after pruning (soonest-expiring go first)
+        prune_every: Writes between pruning passes
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 3600,
+        max_entries: int = 100_000,
+        prune_every: int = 1000
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, sha256: str, now: Optional[float] = None) -> Optional[List[Any]]:
+        """Cached findings for a body hash, or ``None`` on a miss"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT findings FROM scans WHERE sha256 = ? AND expires_at > ?", (sha256, now)
+            ).fetchone()
+        if row is None:
+            return None
+        return [tuple(finding) for finding in json.loads(row[0])]
+
+    def put(self, sha256: str, findings: List[Any], now: Optional[float] = None) -> None:
+        """Store findings for a body hash"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scans (sha256, findings, expires_at) VALUES (?, ?, ?)",
+                (sha256, json.dumps(findings), now + self.ttl_seconds)
+            )
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                self._prune(now)
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Drop expired entries, then the soonest-expiring beyond ``max_entries``"""
+        with self._lock:
+            self._prune(now if now is not None else time.time())
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute("DELETE FROM scans WHERE expires_at <= ?", (now,))
+        excess = self._conn.execute("SELECT COUNT(*) FROM scans").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM scans WHERE sha256 IN"
+                " (SELECT sha256 FROM scans ORDER BY expires_at LIMIT ?)",
+                (excess,)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scans").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,88 @@
+"""
+Sentence-aligned windows for analyzing long texts in parallel
+
+``split_windows`` cuts a text into windows of at most ``max_chars`` that
+start and end on sentence boundaries, each overlapping the previous one by
+at least ``overlap`` characters (whole sentences), so an entity cut by one
+window's edge is seen whole by its neighbour. ``merge_findings`` shifts
+window-relative spans back to text offsets, drops spans that touch an
+interior cut, and collapses the duplicates found in overlaps.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, List, Sequence, Tuple
+
+Finding = Tuple[str, int, int, float]
+
+# Sentence ends: terminal punctuation plus whitespace, or a blank line
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def sentence_starts(text: str) -> List[int]:
+    """Offsets where sentences start (always includes 0)"""
+    return [0] + [m.end() for m in SENTENCE_BOUNDARY.finditer(text) if m.end() < len(text)]
+
+
+def split_windows(text: str, max_chars: int = 8000, overlap: int = 400) -> List[Tuple[int, int]]:
+    """
+    ``(start, end)`` windows covering ``text``
+
+    A sentence longer than ``max_chars`` is cut at ``max_chars`` (with the
+    same overlap), so no window exceeds the limit.
+    """
+    if overlap >= max_chars:
+        raise ValueError("overlap must be smaller than max_chars")
+    if len(text) <= max_chars:
+        return [(0, len(text))]
+
+    starts = sentence_starts(text)
+    windows: List[Tuple[int, int]] = []
+    start = 0
+    while True:
+        limit = start + max_chars
+        if limit >= len(text):
+            windows.append((start, len(text)))
+            return windows
+        # Last sentence start that keeps the window within the limit (and
+        # past the overlap, so the next window still moves forward)
+        end = _last_start(starts, start + overlap, limit)
+        windows.append((start, end))
+        # Back up to a sentence start at least ``overlap`` before the cut
+        target = end - overlap
+        start = _last_start(starts, start, target)
+
+
+def _last_start(starts: List[int], after: int, limit: int) -> int:
+    """Last sentence start in ``(after, limit]``, else ``limit`` itself"""
+    index = bisect_right(starts, limit) - 1
+    if index >= 0 and starts[index] > after:
+        return starts[index]
+    return limit
+
+
+def merge_findings(
+    windows: Sequence[Tuple[int, int]],
+    results: Sequence[Sequence[Finding]]
+) -> List[Finding]:
+    """Combine per-window findings into text-level findings"""
+    last = len(windows) - 1
+    spans: List[Finding] = []
+    for index, ((start, end), findings) in enumerate(zip(windows, results)):
+        for entity_type, f_start, f_end, score in findings:
+            # A span touching an interior cut may be a fragment; the
+            # overlapping neighbour sees the whole entity
+            if (index > 0 and f_start == 0) or (index < last and f_end == end - start):
+                continue
+            spans.append((entity_type, start + f_start, start + f_end, score))
+
+    # Longest first at each start, so contained duplicates come after their container
+    spans.sort(key=lambda f: (f[1], -f[2], -f[3], f[0]))
+    merged: List[Finding] = []
+    reach: Dict[str, int] = {}
+    for span in spans:
+        if span[2] <= reach.get(span[0], -1):
+            continue
+        reach[span[0]] = span[2]
+        merged.append(span)
+    return merged
@@ -0,0 +1,231 @@
+"""
+Process pool for PII analysis
+
+Presidio's analyzer runs spaCy NER, which is CPU-bound and holds the GIL,
+so calling it from the event loop stalls every request and caps the server
+at one core. ``PIIScanPool`` runs it in warm worker processes instead: each
+worker builds the analyzer once in its initializer, and texts submitted
+within a short window are sent to a worker together so per-task IPC is
+paid once per batch.
+
+Results are lists of ``(entity_type, start, end, score)`` tuples, which are
+cheap to pickle back to the parent.
+
+Workers are forked, so an analyzer the parent loaded before ``start`` (see
+``PII_PRELOAD`` in ``fed_server``) is inherited copy-on-write instead of
+being loaded again in every worker.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from src.pii_chunking import Finding, merge_findings, split_windows
+
+logger = logging.getLogger(__name__)
+
+_analyzer: Any = None
+
+
+# One run of each recognizer family so lazily built pieces load before real traffic
+WARMUP_TEXT = "Jane Doe (jane@example.com, 212-555-0199) moved to Denver on 2024-03-01."
+
+# Pause between warm-up rounds while some workers are still loading
+WARMUP_POLL_SECONDS = 0.05
+
+
+def _init_worker(factory: Callable[[], Any], language: str) -> None:
+    global _analyzer
+    _analyzer = factory()
+    _analyzer.analyze(WARMUP_TEXT, language=language)
+
+
+def _ping() -> int:
+    # Runs after the initializer, so the answering worker is warm
+    return os.getpid()
+
+
+def _analyze_batch(texts: List[str], language: str) -> List[List[Finding]]:
+    results = []
+    for text in texts:
+        findings = _analyzer.analyze(text, language=language)
+        results.append([(f.entity_type, f.start, f.end, f.score) for f in findings])
+    return results
+
+
+class PIIScanPool:
+    """
+    Batched PII analysis on warm worker processes
+
+    Args:
+        factory: Picklable zero-argument callable returning an analyzer with
+            Presidio's ``analyze(text, language=...)`` signature
+        workers: Worker processes; 0 analyzes on a single background thread
+        max_batch: Most texts sent to a worker in one task
+        batch_window: Seconds to wait for more texts before dispatching a batch
+        language: Language passed to ``analyze``
+        chunk_chars: Texts longer than this are split into sentence-aligned
+            windows analyzed in parallel (0 disables)
+        chunk_overlap: Minimum overlap between neighbouring windows
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        workers: int = 2,
+        max_batch: int = 16,
+        batch_window: float = 0.002,
+        language: str = "en",
+        chunk_chars: int = 0,
+        chunk_overlap: int = 400
+    ):
+        self.factory = factory
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.language = language
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self._executor: Optional[Executor] = None
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._dispatch: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+        self._warmup: Optional[asyncio.Future] = None
+        self.ready = False
+
+    # ------------------------------------------------------------------ #
+    #  Lifecycle
+    # ------------------------------------------------------------------ #
+
+    async def start(self, wait: bool = True) -> None:
+        """
+        Start the workers and warm their analyzers
+
+        With ``wait=False`` warm-up continues in the background and
+        ``ready`` turns true once every worker has analyzed a sample text;
+        scans submitted earlier queue behind it.
+        """
+        if self._executor is not None:
+            return
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+                initargs=(self.factory, self.language)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, initializer=_init_worker, initargs=(self.factory, self.language)
+            )
+        self._warmup = asyncio.ensure_future(self._warm())
+        if wait:
+            await self._warmup
+
+    async def wait_ready(self) -> None:
+        """Wait for warm-up started by ``start``"""
+        if self._warmup is not None:
+            await asyncio.shield(self._warmup)
+
+    async def _warm(self) -> None:
+        loop = asyncio.get_running_loop()
+        expected = max(self.workers, 1)
+        warm: set = set()
+        try:
+            # Workers start together and the first one warm can answer every
+            # ping, so keep pinging until each has answered at least once
+            while True:
+                warm.update(await asyncio.gather(*(
+                    loop.run_in_executor(self._executor, _ping) for _ in range(expected)
+                )))
+                if len(warm) >= expected:
+                    break
+                await asyncio.sleep(WARMUP_POLL_SECONDS)
+        except Exception:
+            logger.error("PII analyzer warm-up failed", exc_info=True)
+            raise
+        self.ready = True
+
+    async def close(self) -> None:
+        """Finish queued and running scans, then stop the workers"""
+        if self._executor is None:
+            return
+        if self._warmup is not None:
+            await asyncio.gather(self._warmup, return_exceptions=True)
+            self._warmup = None
+        self.ready = False
+        if self._pending:
+            self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown)
+
+    # ------------------------------------------------------------------ #
+    #  Scanning
+    # ------------------------------------------------------------------ #
+
+    def submit(self, text: str) -> "asyncio.Future[List[Finding]]":
+        """Queue a text for analysis; the future resolves to its findings"""
+        if self._executor is None:
+            raise RuntimeError("PII scan pool is not running")
+        if self.chunk_chars and len(text) > self.chunk_chars:
+            windows = split_windows(text, self.chunk_chars, self.chunk_overlap)
+            parts = [self._enqueue(text[start:end]) for start, end in windows]
+            # All windows are queued; send them to the workers now
+            self._flush()
+            return asyncio.ensure_future(self._merge(windows, parts))
+        return self._enqueue(text)
+
+    def _enqueue(self, text: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._dispatch is None:
+            self._dispatch = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    async def _merge(self, windows: List[Tuple[int, int]], parts: List[asyncio.Future]) -> List[Finding]:
+        return merge_findings(windows, await asyncio.gather(*parts))
+
+    async def analyze(self, text: str) -> List[Finding]:
+        """Analyze one text and wait for the result"""
+        return await self.submit(text)
+
+    def _flush(self) -> None:
+        if self._dispatch is not None:
+            self._dispatch.cancel()
+            self._dispatch = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Spread the batch over the workers rather than queueing it on one
+        size = -(-len(batch) // max(self.workers, 1))
+        for i in range(0, len(batch), size):
+            part = batch[i:i + size]
+            task = asyncio.ensure_future(
+                self._run_batch([text for text, _ in part], [future for _, future in part])
+            )
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, texts: List[str], futures: List[asyncio.Future]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._executor, _analyze_batch, texts, self.language
+            )
+        except Exception as e:
+            logger.warning("PII analysis failed for a batch of %d", len(texts), exc_info=True)
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
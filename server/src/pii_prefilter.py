@@ -0,0 +1,81 @@
+"""
+Cheap first-stage PII filter
+
+Most request bodies are identifiers, numbers, enum values and JSON keys,
+and full Presidio NER on them only confirms there is nothing there.
+``needs_ner`` looks for anything that could make Presidio report an
+entity, and the middleware skips the analyzer when it finds nothing:
+
+* one compiled alternation over the shapes of Presidio's pattern
+  recognizers (email, phone, SSN, card and bank numbers, IPs, IBAN, URLs,
+  dates) and the context words they key on;
+* a token heuristic for the spaCy entities (PERSON, LOCATION, NRP, DATE):
+  a capitalized word that is not a JSON key, an all-caps constant or a
+  common word at the start of a sentence.
+
+The filter is tuned for recall; a false positive only costs the NER run
+that would have happened anyway. It has blind spots: a lowercase name is
+only caught after a title ("dr. okafor") or in a name field, so one
+written in free lowercase text skips NER. ``benchmarks/bench_pii_prefilter.py``
+scores it against the bundled corpus, whose labels were written by hand
+for this filter and are a regression check rather than a measure of
+agreement with Presidio; run it with ``--presidio`` for that.
+"""
+
+import re
+from typing import FrozenSet
+
+# Shapes matched by Presidio's predefined pattern recognizers (and a bit wider)
+PII_PATTERN = re.compile(
+    r"""
+      [\w.+-]+@[\w-]+\.[\w.-]+                                  # email
+    | \b\d{3}[-\s.]?\d{2}[-\s.]?\d{4}\b                         # SSN / ITIN
+    | (?:\+\d{1,3}[\s.-]?)?\(?\b\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b   # phone
+    | \b(?:\d[\s-]?){12,18}\d\b                                 # card / bank account
+    | \b\d{1,3}(?:\.\d{1,3}){3}\b                               # IPv4
+    | \b[0-9a-f]{0,4}(?::[0-9a-f]{0,4}){2,7}\b                  # IPv6
+    | \b[A-Z]{2}\d{2}(?:\s?[A-Z0-9]{4}){2,7}                    # IBAN
+    | \bhttps?://|\bwww\.                                       # URL
+    | \b[13][a-km-zA-HJ-NP-Z1-9]{25,34}\b                       # bitcoin address
+    | \b(?:19|20)\d{2}[-/.]\d{1,2}[-/.]\d{1,2}\b                # ISO-ish date
+    | \b\d{1,2}[-/.]\d{1,2}[-/.](?:19|20)?\d{2}\b               # US/EU date
+    | (?<![\w-])(?:19|20)\d{2}(?![\w-])                          # bare year, not inside a UUID
+    | \b(?:ssn|social\ security|passport|driver'?s?\ licen[cs]e|dob|date\ of\ birth
+         |birth\ ?date|medical\ record|mrn|patient|phone|email|address|routing
+         |(?:first|last|full|given|family|middle|sur)[\ _-]?name|name\ is)\b
+    | \b(?:(?:mr|mrs|dr|prof)\.?|(?:ms|mx)\.)\ +[a-z]{2,}           # title before a (lowercase) name
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# Words spaCy tags as DATE/TIME regardless of capitalization
+TEMPORAL_PATTERN = re.compile(
+    r"\b(?:yesterday|today|tomorrow|tonight|(?:last|next|this)\s+(?:week|month|year)"
+    r"|\d+\s+(?:days?|weeks?|months?|years?)\s+ago)\b",
+    re.IGNORECASE,
+)
+
+# A capitalized word that is not the key of a JSON member
+CAPITALIZED_WORD = re.compile(r'(?<!\w)"?([A-Z][a-z]+)\b(?!"\s*:)')
+
+# Capitalized words that are too common at sentence starts to mean anything
+COMMON_WORDS: FrozenSet[str] = frozenset("""
+A An The This That These Those It Its I We You They He She Our Your Their
+And Or But If When While For To From With Without In On At By Of As Is Are
+Was Were Be Been Has Have Had Do Does Did Not No Yes Please Thanks Thank
+Hello Hi Dear Note Error Warning Info Debug True False None Null Ok Okay
+Get Set Put Post Delete Create Read Update Verify Sign Request Response
+Success Failed Pending Done Total Count Id Type Name Value Data Result
+""".split())
+
+
+def needs_ner(text: str, common_words: FrozenSet[str] = COMMON_WORDS) -> bool:
+    """True if ``text`` could contain something Presidio would report"""
+    if not text:
+        return False
+    if PII_PATTERN.search(text) or TEMPORAL_PATTERN.search(text):
+        return True
+    for match in CAPITALIZED_WORD.finditer(text):
+        if match.group(1) not in common_words:
+            return True
+    return False
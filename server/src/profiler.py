@@ -0,0 +1,240 @@
+"""
+Sampling request profiler
+
+``ProfilerMiddleware`` picks a fraction of requests (or any request sent
+with the profile header) and registers its asyncio task with a
+``SamplingProfiler``. While at least one profiled request is in flight, a
+daemon thread wakes every ``interval`` seconds and records each request's
+stack:
+
+* if the request's task holds the event loop, the loop thread's Python
+  stack (``sys._current_frames``), trimmed to the frames above the task
+  step;
+* otherwise the coroutine chain the task is suspended in, ending in the
+  awaited object (``<await Future>``), so time spent waiting on storage or
+  KMS shows up too.
+
+The result is a wall-clock profile. Stacks are folded into the collapsed
+format used by flame graph tools (``route;frame;frame count``) and
+aggregated per route template. Nothing is installed unless profiling is
+enabled, and requests that are not picked cost one random draw.
+
+Work that handlers push to other threads (``run_in_threadpool``,
+``to_thread``) is seen only as the awaiting coroutine.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.request_metrics import endpoint_label
+
+Scope = Dict[str, Any]
+
+PROFILE_HEADER = b"x-fedmcp-profile"
+OTHER_STACKS = "[other]"
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_task_step(frame: FrameType) -> bool:
+    # Handle._run in asyncio/events.py calls into the task; everything below
+    # it is the event loop and server machinery
+    code = frame.f_code
+    return code.co_name == "_run" and code.co_filename.endswith(os.path.join("asyncio", "events.py"))
+
+
+def running_stack(frame: Optional[FrameType]) -> List[str]:
+    """Frames of a thread above the asyncio task step, outermost first"""
+    frames = []
+    while frame is not None and not _is_task_step(frame):
+        frames.append(_frame_name(frame))
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def suspended_stack(task: "asyncio.Task[Any]") -> List[str]:
+    """The coroutine chain a suspended task is waiting in, outermost first"""
+    frames = []
+    awaitable: Any = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            # The C Future is awaited through its FutureIter
+            name = type(awaitable).__name__
+            frames.append(f"<await {'Future' if name == 'FutureIter' else name}>")
+            break
+        frames.append(_frame_name(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return frames
+
+
+class _Profiled:
+    __slots__ = ("task", "loop", "thread_id", "stacks")
+
+    def __init__(self, task: "asyncio.Task[Any]", loop: asyncio.AbstractEventLoop, thread_id: int):
+        self.task = task
+        self.loop = loop
+        self.thread_id = thread_id
+        self.stacks: Counter = Counter()
+
+
+class SamplingProfiler:
+    """
+    Per-route collapsed stacks of profiled requests
+
+    Args:
+        interval: Seconds between samples
+        max_stacks: Distinct stacks kept per route; the rest count as ``[other]``
+    """
+
+    def __init__(self, interval: float = 0.005, max_stacks: int = 10_000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._lock = threading.Lock()
+        self._active: Dict[int, _Profiled] = {}
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stacks: Dict[str, Counter] = {}
+        self._requests: Counter = Counter()
+        self._seconds: Counter = Counter()
+
+    def begin(self) -> None:
+        """Start sampling the calling task"""
+        task = asyncio.current_task()
+        if task is None:
+            return
+        profiled = _Profiled(task, asyncio.get_running_loop(), threading.get_ident())
+        with self._lock:
+            self._active[id(task)] = profiled
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def end(self, route: str, seconds: float) -> None:
+        """Stop sampling the calling task and file its samples under ``route``"""
+        task = asyncio.current_task()
+        with self._lock:
+            profiled = self._active.pop(id(task), None)
+            if not self._active:
+                self._wake.clear()
+            if profiled is None:
+                return
+            self._requests[route] += 1
+            self._seconds[route] += seconds
+            totals = self._stacks.setdefault(route, Counter())
+            for stack, count in profiled.stacks.items():
+                if stack in totals or len(totals) < self.max_stacks:
+                    totals[stack] += count
+                else:
+                    totals[OTHER_STACKS] += count
+
+    def sample(self) -> None:
+        """Record one sample of every profiled request"""
+        frames = sys._current_frames()
+        with self._lock:
+            active = list(self._active.values())
+        samples = []
+        for profiled in active:
+            if asyncio.current_task(profiled.loop) is profiled.task:
+                stack = running_stack(frames.get(profiled.thread_id))
+            else:
+                stack = suspended_stack(profiled.task)
+            if stack:
+                samples.append((profiled, ";".join(stack)))
+        with self._lock:
+            # Requests that ended meanwhile have already been filed
+            for profiled, stack in samples:
+                if id(profiled.task) in self._active:
+                    profiled.stacks[stack] += 1
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            self.sample()
+
+    # ------------------------------------------------------------------ #
+    #  Results
+    # ------------------------------------------------------------------ #
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Profiled requests, wall seconds and samples per route"""
+        with self._lock:
+            return {
+                route: {
+                    "requests": self._requests[route],
+                    "seconds": round(self._seconds[route], 6),
+                    "samples": sum(self._stacks.get(route, {}).values())
+                }
+                for route in sorted(self._requests)
+            }
+
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """``route;frame;...;frame count`` lines for flame graph tools"""
+        with self._lock:
+            routes = [route] if route is not None else sorted(self._stacks)
+            lines = [
+                f"{name};{stack} {count}"
+                for name in routes
+                for stack, count in sorted(self._stacks.get(name, {}).items())
+            ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self._requests.clear()
+            self._seconds.clear()
+
+
+class ProfilerMiddleware:
+    """
+    Profile sampled or flagged requests
+
+    Args:
+        app: The wrapped ASGI app
+        profiler: Where samples go
+        sample_rate: Fraction of requests to profile
+        header: Requests carrying this header are always profiled
+    """
+
+    def __init__(
+        self,
+        app: Callable[..., Awaitable[None]],
+        profiler: SamplingProfiler,
+        sample_rate: float = 0.01,
+        header: bytes = PROFILE_HEADER
+    ):
+        self.app = app
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+        self.header = header.lower()
+
+    def _wanted(self, scope: Scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        return any(name == self.header for name, _ in scope.get("headers", ()))
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self.profiler.begin()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end(endpoint_label(scope), time.perf_counter() - start)
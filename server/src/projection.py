@@ -0,0 +1,170 @@
+"""
+Field projection on stored artifact records
+
+Records are written with an offset map: the byte range of every object
+member down to ``OFFSET_DEPTH`` levels (``/artifact/jsonBody/name``,
+``/jws``, ...), keyed by JSON pointer. ``project_record`` copies those
+ranges out of the stored bytes; only a path deeper than the map (or into
+an array) parses the fragment holding it, and a record without a map is
+parsed whole. Records under ``OFFSET_MIN_BYTES`` have no map: parsing
+them is cheaper than loading one.
+
+A projection keeps the record's shape with only the selected members:
+``{"artifact": {"jsonBody": {"name": ...}}, "jws": ...}``.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+# /artifact/jsonBody/<key>/<key>
+OFFSET_DEPTH = 4
+
+# Smaller records parse faster than their offset map loads, so they get none
+OFFSET_MIN_BYTES = 16 * 1024
+
+Offsets = Dict[str, List[int]]
+FieldPath = Tuple[str, ...]
+
+_MISSING = object()
+
+
+def _pointer(segments: Sequence[str]) -> str:
+    return "".join("/" + s.replace("~", "~0").replace("/", "~1") for s in segments)
+
+
+def encode_record_with_offsets(data: Dict[str, Any], depth: int = OFFSET_DEPTH) -> Tuple[bytes, Offsets]:
+    """
+    Serialize a record exactly as ``json.dumps`` does, noting member offsets
+
+    The output is ASCII (``ensure_ascii``), so character offsets are byte
+    offsets.
+    """
+    parts: List[str] = []
+    offsets: Offsets = {}
+    _encode(data, "", depth, parts, 0, offsets)
+    return "".join(parts).encode(), offsets
+
+
+def _encode(value: Any, pointer: str, depth: int, parts: List[str], pos: int, offsets: Offsets) -> int:
+    if not isinstance(value, dict) or not value or depth == 0:
+        text = json.dumps(value)
+        parts.append(text)
+        return pos + len(text)
+    parts.append("{")
+    pos += 1
+    for i, (key, item) in enumerate(value.items()):
+        prefix = (", " if i else "") + json.dumps(str(key)) + ": "
+        parts.append(prefix)
+        pos += len(prefix)
+        member = pointer + _pointer([str(key)])
+        start = pos
+        pos = _encode(item, member, depth - 1, parts, pos, offsets)
+        offsets[member] = [start, pos]
+    parts.append("}")
+    return pos + 1
+
+
+def parse_fields(fields: Union[str, Sequence[str]]) -> List[FieldPath]:
+    """
+    Paths within the artifact from JSON pointers or dotted paths
+
+    Accepts ``/jsonBody/name``, ``jsonBody.name`` and comma-separated lists
+    of either.
+
+    Raises:
+        ValueError: If a path is empty
+    """
+    if isinstance(fields, str):
+        fields = [fields]
+    paths = []
+    for entry in fields:
+        for path in entry.split(","):
+            path = path.strip()
+            if path.startswith("/"):
+                segments = tuple(s.replace("~1", "/").replace("~0", "~") for s in path[1:].split("/"))
+            else:
+                segments = tuple(path.split("."))
+            if not path or not all(segments):
+                raise ValueError(f"Invalid field path {path!r}")
+            paths.append(segments)
+    return paths
+
+
+def project_record(
+    body: bytes,
+    offsets: Optional[Offsets],
+    fields: Optional[List[FieldPath]] = None,
+    include_jws: bool = True
+) -> bytes:
+    """
+    The stored record reduced to ``fields`` of the artifact (all of it if
+    ``None``), with or without the JWS. Paths that don't exist are left out.
+    """
+    if fields is None and include_jws:
+        return body
+    resolver = _Resolver(body, offsets or {})
+    tree: Dict[str, Any] = {}
+    for path in ([()] if fields is None else fields):
+        raw = resolver.get(("artifact",) + path)
+        if raw is not None:
+            _insert(tree, ("artifact",) + path, raw)
+    if include_jws:
+        raw = resolver.get(("jws",))
+        if raw is not None:
+            tree["jws"] = raw
+    return _serialize(tree)
+
+
+class _Resolver:
+    """Raw JSON of a path: from the offset map if possible, else by parsing"""
+
+    def __init__(self, body: bytes, offsets: Offsets):
+        self.body = body
+        self.offsets = offsets
+        self._parsed: Any = _MISSING
+
+    def get(self, segments: FieldPath) -> Optional[bytes]:
+        for length in range(len(segments), 0, -1):
+            span = self.offsets.get(_pointer(segments[:length]))
+            if span is None:
+                continue
+            raw = self.body[span[0]:span[1]]
+            if length == len(segments):
+                return raw
+            if length < OFFSET_DEPTH and raw.startswith(b"{"):
+                # The map lists this object's members, and the next one isn't there
+                return None
+            return self._walk(json.loads(raw), segments[length:])
+        if self._parsed is _MISSING:
+            self._parsed = json.loads(self.body)
+        return self._walk(self._parsed, segments)
+
+    @staticmethod
+    def _walk(value: Any, segments: Sequence[str]) -> Optional[bytes]:
+        for segment in segments:
+            if isinstance(value, dict) and segment in value:
+                value = value[segment]
+            elif isinstance(value, list) and segment.isdigit() and int(segment) < len(value):
+                value = value[int(segment)]
+            else:
+                return None
+        return json.dumps(value).encode()
+
+
+def _insert(tree: Dict[str, Any], segments: FieldPath, raw: bytes) -> None:
+    node = tree
+    for segment in segments[:-1]:
+        child = node.setdefault(segment, {})
+        if isinstance(child, bytes):
+            # A parent member is already included whole
+            return
+        node = child
+    node[segments[-1]] = raw
+
+
+def _serialize(node: Union[Dict[str, Any], bytes]) -> bytes:
+    if isinstance(node, bytes):
+        return node
+    return b"{" + b", ".join(
+        json.dumps(key).encode() + b": " + _serialize(child) for key, child in node.items()
+    ) + b"}"
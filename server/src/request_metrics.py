@@ -0,0 +1,59 @@
+"""
+Per-endpoint request latency and status counts
+
+``RequestMetricsMiddleware`` is a plain ASGI middleware that times each HTTP
+request from the first call until the app returns and records it against
+the matched route template (``/artifacts/{artifact_id}``, not the concrete
+path), so one label value exists per endpoint however many IDs are served.
+Requests that match no route are recorded as ``unmatched``.
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+
+UNMATCHED_ENDPOINT = "unmatched"
+
+
+def endpoint_label(scope: Scope) -> str:
+    """Route template the router matched, if any"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ENDPOINT
+
+
+class RequestMetricsMiddleware:
+    """
+    Record request latency and status per endpoint
+
+    Args:
+        app: The wrapped ASGI app
+        metrics: A ``FedMCPMetrics`` (``request_seconds`` and ``requests_total``)
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]], metrics: Any):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def recording_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            endpoint = endpoint_label(scope)
+            method = scope["method"]
+            self.metrics.request_seconds.observe(elapsed, endpoint=endpoint, method=method)
+            self.metrics.requests_total.inc(endpoint=endpoint, method=method, status=str(status["code"]))
@@ -0,0 +1,255 @@
+"""
+Inverted index over artifact ``jsonBody`` content
+
+Two posting tables in one SQLite file (WAL mode, shared by the workers and
+persisted across restarts):
+
+* ``terms`` -- every token of every string value, lowercased. Tokens keep
+  inner ``-``, ``_`` and ``.`` (``ac-2``, ``medllm-7b``) and their parts
+  are indexed too, so ``ac`` also finds ``AC-2``.
+* ``fields`` -- ``(path, value)`` for every scalar, with the dotted path
+  from the top of ``jsonBody`` and array indices dropped
+  (``model.name``, ``capabilities``). String values are lowercased.
+
+Postings refer to documents by number, assigned in indexing order, so a
+posting list read backwards is newest first: ``search`` walks the list of
+its rarest condition and probes the others by primary key. Pages are
+cheap; the exact ``total`` costs a pass over every match. Each ``docs``
+row also lists its own postings, so re-indexing or removing an artifact
+deletes them by key.
+
+The index only sees writes made on this node: replicas behind one store
+each need their own, filled from storage.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc INTEGER PRIMARY KEY AUTOINCREMENT,
+    artifact_id TEXT NOT NULL UNIQUE,
+    workspace_id TEXT,
+    type TEXT,
+    postings TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    PRIMARY KEY (term, doc)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fields (
+    path TEXT NOT NULL,
+    value TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    PRIMARY KEY (path, value, doc)
+) WITHOUT ROWID;
+"""
+TOKEN = re.compile(r"[0-9a-z]+(?:[-_.][0-9a-z]+)*")
+TOKEN_PART = re.compile(r"[0-9a-z]+")
+
+# Posting lists longer than this count as equally long when picking the
+# condition that drives a query
+ESTIMATE_LIMIT = 1000
+
+# Longer strings are searchable by their words but not as field values
+MAX_FIELD_VALUE = 256
+
+
+def tokenize(text: str) -> Set[str]:
+    """Lowercased tokens of ``text``, plus the parts of compound tokens"""
+    tokens = set()
+    for token in TOKEN.findall(text.lower()):
+        tokens.add(token)
+        if not token.isalnum():
+            tokens.update(TOKEN_PART.findall(token))
+    return tokens
+
+
+def field_value(value: Any) -> str:
+    """How a scalar is stored in (and looked up from) the field index"""
+    if isinstance(value, str):
+        return value.lower()
+    return json.dumps(value)
+
+
+def normalize_path(path: str) -> str:
+    """Dotted path from a JSON pointer or dotted path, without ``jsonBody``"""
+    if path.startswith("/"):
+        parts = [p.replace("~1", "/").replace("~0", "~") for p in path[1:].split("/")]
+    else:
+        parts = path.split(".")
+    parts = [p for p in parts if p and not p.isdigit()]
+    if parts and parts[0] == "jsonBody":
+        parts = parts[1:]
+    return ".".join(parts)
+
+
+def postings(body: Any) -> Tuple[Set[str], Set[Tuple[str, str]]]:
+    """Terms and (path, value) pairs for a ``jsonBody``"""
+    terms: Set[str] = set()
+    fields: Set[Tuple[str, str]] = set()
+    for path, value in _scalars(body, ""):
+        if isinstance(value, str):
+            terms |= tokenize(value)
+            if len(value) > MAX_FIELD_VALUE:
+                continue
+        fields.add((path, field_value(value)))
+    return terms, fields
+
+
+def _scalars(value: Any, path: str) -> Iterator[Tuple[str, Any]]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _scalars(item, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, list):
+        for item in value:
+            yield from _scalars(item, path)
+    elif value is not None and path:
+        yield path, value
+
+
+class SearchIndex:
+    """
+    Persistent inverted index of artifact bodies
+
+    Args:
+        path: SQLite file shared by all workers
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def add(self, artifact: Dict[str, Any]) -> None:
+        """Index (or re-index) a serialized artifact"""
+        artifact_id = str(artifact["id"])
+        terms, fields = postings(artifact.get("jsonBody") or {})
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._delete(artifact_id)
+                doc = self._conn.execute(
+                    "INSERT INTO docs (artifact_id, workspace_id, type, postings) VALUES (?, ?, ?, ?)",
+                    (artifact_id, artifact.get("workspaceId"), artifact.get("type"),
+                     json.dumps([sorted(terms), sorted(fields)]))
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO terms (term, doc) VALUES (?, ?)", [(term, doc) for term in terms]
+                )
+                self._conn.executemany(
+                    "INSERT INTO fields (path, value, doc) VALUES (?, ?, ?)",
+                    [(path, value, doc) for path, value in fields]
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def remove(self, artifact_id: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._delete(artifact_id)
+            self._conn.execute("COMMIT")
+
+    def _delete(self, artifact_id: str) -> None:
+        row = self._conn.execute(
+            "SELECT doc, postings FROM docs WHERE artifact_id = ?", (artifact_id,)
+        ).fetchone()
+        if row is None:
+            return
+        doc = row[0]
+        terms, fields = json.loads(row[1])
+        self._conn.executemany("DELETE FROM terms WHERE term = ? AND doc = ?", [(term, doc) for term in terms])
+        self._conn.executemany(
+            "DELETE FROM fields WHERE path = ? AND value = ? AND doc = ?",
+            [(path, value, doc) for path, value in fields]
+        )
+        self._conn.execute("DELETE FROM docs WHERE doc = ?", (doc,))
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None,
+        workspace_id: Optional[str] = None,
+        artifact_type: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> Tuple[List[str], int]:
+        """
+        IDs of artifacts matching every query token and field, newest first
+
+        Returns:
+            One page of artifact IDs and the total number of matches
+        """
+        # Only the whole tokens of the query: parts would widen the match
+        tokens = sorted(set(TOKEN.findall(query.lower()))) if query else []
+        conditions = [("terms", ("term",), (token,)) for token in tokens] + [
+            ("fields", ("path", "value"), (normalize_path(path), field_value(value)))
+            for path, value in sorted((fields or {}).items())
+        ]
+
+        with self._lock:
+            if len(conditions) > 1:
+                # Drive the query from the shortest posting list
+                conditions.sort(key=self._estimate)
+            return self._search(conditions, workspace_id, artifact_type, limit, offset)
+
+    def _estimate(self, condition: Tuple[str, Tuple[str, ...], Tuple[Any, ...]]) -> int:
+        """Postings for a condition, counted up to ``ESTIMATE_LIMIT``"""
+        table, columns, values = condition
+        match = " AND ".join(f"{column} = ?" for column in columns)
+        return self._conn.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {match} LIMIT {ESTIMATE_LIMIT})", values
+        ).fetchone()[0]
+
+    def _search(
+        self,
+        conditions: List[Tuple[str, Tuple[str, ...], Tuple[Any, ...]]],
+        workspace_id: Optional[str],
+        artifact_type: Optional[str],
+        limit: int,
+        offset: int
+    ) -> Tuple[List[str], int]:
+        params: List[Any] = []
+        if conditions:
+            table, columns, values = conditions[0]
+            match = " AND ".join(f"p.{column} = ?" for column in columns)
+            source = f"{table} p JOIN docs d ON d.doc = p.doc WHERE {match}"
+            order = "p.doc"
+            params.extend(values)
+        else:
+            source, order = "docs d WHERE 1", "d.doc"
+        for table, columns, values in conditions[1:]:
+            match = " AND ".join(f"{column} = ?" for column in columns)
+            source += f" AND EXISTS (SELECT 1 FROM {table} WHERE {match} AND doc = d.doc)"
+            params.extend(values)
+        if workspace_id:
+            source += " AND d.workspace_id = ?"
+            params.append(workspace_id)
+        if artifact_type:
+            source += " AND d.type = ?"
+            params.append(artifact_type)
+
+        total = self._conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+        rows = self._conn.execute(
+            f"SELECT d.artifact_id FROM {source} ORDER BY {order} DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        return [row[0] for row in rows], total
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,113 @@
+"""
+Shared state for server workers on one host
+
+A small key/value store in a SQLite file (WAL mode), so every uvicorn
+worker on the host reads and updates the same values: the active signing
+key ID, admission-control buckets and the like. Values are JSON, entries
+may carry a TTL, and ``update`` runs a read-modify-write under SQLite's
+write lock so concurrent workers never lose each other's changes.
+
+Replicas on different nodes need a network store behind the same interface.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL
+) WITHOUT ROWID;
+"""
+
+
+class SharedState:
+    """
+    Key/value store shared across processes
+
+    Args:
+        path: SQLite file
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Current value, or ``default`` if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, optionally expiring after ``ttl`` seconds"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl if ttl is not None else None)
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def update(
+        self,
+        key: str,
+        fn: Callable[[Any], Any],
+        default: Any = None,
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Atomically replace a value with ``fn(current)`` and return the result
+
+        ``fn`` sees ``default`` when the key is missing or expired. It runs
+        while the database write lock is held, so keep it short.
+        """
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (key, now)
+                ).fetchone()
+                value = fn(json.loads(row[0]) if row else default)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now + ttl if ttl is not None else None)
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return value
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Atomically add to an integer counter and return the new value"""
+        return self.update(key, lambda current: current + amount, default=0, ttl=ttl)
+
+    def purge_expired(self) -> int:
+        """Delete expired entries; returns how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
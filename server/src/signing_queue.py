@@ -0,0 +1,299 @@
+"""
+Durable queue for signing and storing artifacts off the request path
+
+With asynchronous creates, ``POST /artifacts`` validates the artifact,
+writes a job to ``SigningQueue`` and answers 202 right away; the client
+follows the status URL for the JWS. The queue is a SQLite file in WAL mode
+shared by every worker on the host, so a job survives a restart and any
+worker may process it.
+
+``SigningWorkers`` runs a few tasks per process that claim pending jobs in
+batches, hand each batch to a callback (sign, store, audit) and record the
+outcome. A claim is a lease: jobs claimed by a worker that died are
+claimed again once ``lease_seconds`` pass. Each claim carries a token and
+only the current holder's outcome is recorded, so a batch that outlived
+its lease (a slow KMS call) can't overwrite the outcome of the claim that
+replaced it.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    artifact_id TEXT PRIMARY KEY,
+    workspace_id TEXT NOT NULL,
+    actor TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    sign INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    jws TEXT,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    claimed_until REAL,
+    claim TEXT,
+    finished_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, enqueued_at);
+"""
+
+# Pending, or leased by a claim whose lease ran out: (PENDING, PROCESSING, now)
+CLAIMABLE = "status = ? OR (status = ? AND claimed_until < ?)"
+
+
+class SigningJob(NamedTuple):
+    artifact_id: str
+    workspace_id: str
+    actor: str
+    artifact: Dict[str, Any]
+    sign: bool
+    enqueued_at: float
+    # Token of the claim that leased the job, passed back to ``finish``
+    claim: str
+
+
+class JobResult(NamedTuple):
+    """Outcome of one job: the JWS (``None`` if unsigned) or an error"""
+    artifact_id: str
+    jws: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SigningQueue:
+    """
+    Pending, in-progress and recently finished signing jobs
+
+    Args:
+        path: SQLite file shared by all workers
+        lease_seconds: How long a claim lasts before the job is claimable again
+        retention_seconds: How long finished jobs stay queryable
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, retention_seconds: float = 86400.0):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Jobs are acknowledged with 202, so they must survive a power loss
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "claim" not in columns:
+            # Queues created before claims carried a token
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN claim TEXT")
+
+    def enqueue(
+        self,
+        artifact_id: str,
+        workspace_id: str,
+        actor: str,
+        artifact: Dict[str, Any],
+        sign: bool = True,
+        now: Optional[float] = None
+    ) -> None:
+        """
+        Durably record a job
+
+        Raises:
+            ValueError: If a job for this artifact already exists
+        """
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO jobs (artifact_id, workspace_id, actor, artifact, sign, status, enqueued_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (artifact_id, workspace_id, actor, json.dumps(artifact), int(sign), PENDING,
+                     now if now is not None else time.time())
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Artifact {artifact_id} is already queued")
+
+    def claim(self, limit: int, now: Optional[float] = None) -> List[SigningJob]:
+        """Lease up to ``limit`` of the oldest claimable jobs"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            # Idle workers poll often: look before taking the write lock
+            if self._conn.execute(
+                f"SELECT 1 FROM jobs WHERE {CLAIMABLE} LIMIT 1", (PENDING, PROCESSING, now)
+            ).fetchone() is None:
+                return []
+            token = uuid.uuid4().hex
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT artifact_id, workspace_id, actor, artifact, sign, enqueued_at FROM jobs"
+                    f" WHERE {CLAIMABLE} ORDER BY enqueued_at LIMIT ?",
+                    (PENDING, PROCESSING, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, claimed_until = ?, claim = ? WHERE artifact_id = ?",
+                    [(PROCESSING, now + self.lease_seconds, token, row[0]) for row in rows]
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return [
+            SigningJob(row[0], row[1], row[2], json.loads(row[3]), bool(row[4]), row[5], token)
+            for row in rows
+        ]
+
+    def held(self, claim: str, artifact_ids: List[str]) -> Set[str]:
+        """Which of the jobs ``claim`` leased it still holds"""
+        with self._lock:
+            return {
+                row[0] for row in self._conn.execute(
+                    f"SELECT artifact_id FROM jobs WHERE claim = ? AND status = ?"
+                    f" AND artifact_id IN ({','.join('?' * len(artifact_ids))})",
+                    (claim, PROCESSING, *artifact_ids)
+                )
+            }
+
+    def finish(self, claim: str, results: List[JobResult], now: Optional[float] = None) -> List[str]:
+        """
+        Record the outcome of jobs leased by ``claim``, in one transaction
+
+        Returns:
+            Artifact IDs whose outcome was dropped because another claim
+            took the job over after this one's lease ran out
+        """
+        now = now if now is not None else time.time()
+        lost = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for r in results:
+                    cursor = self._conn.execute(
+                        "UPDATE jobs SET status = ?, jws = ?, error = ?, finished_at = ?, artifact = '{}'"
+                        " WHERE artifact_id = ? AND claim = ? AND status = ?",
+                        (FAILED if r.error else DONE, r.jws, r.error, now, r.artifact_id, claim, PROCESSING)
+                    )
+                    if not cursor.rowcount:
+                        lost.append(r.artifact_id)
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                    (DONE, FAILED, now - self.retention_seconds)
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return lost
+
+    def status(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        """The job's state, or ``None`` if there is no such job"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, jws, error, enqueued_at, finished_at FROM jobs WHERE artifact_id = ?",
+                (artifact_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        status = row[0] if row[0] != PROCESSING else PENDING
+        return {"status": status, "jws": row[1], "error": row[2], "enqueuedAt": row[3], "finishedAt": row[4]}
+
+    def depth(self) -> int:
+        """Jobs not finished yet"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (PENDING, PROCESSING)
+            ).fetchone()[0]
+
+    def lag(self, now: Optional[float] = None) -> float:
+        """Age in seconds of the oldest unfinished job (0 when idle)"""
+        with self._lock:
+            oldest = self._conn.execute(
+                "SELECT MIN(enqueued_at) FROM jobs WHERE status IN (?, ?)", (PENDING, PROCESSING)
+            ).fetchone()[0]
+        if oldest is None:
+            return 0.0
+        return max(0.0, (now if now is not None else time.time()) - oldest)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SigningWorkers:
+    """
+    Background tasks that drain a ``SigningQueue`` in batches
+
+    Args:
+        queue: The shared queue
+        process: Awaited with a batch of claimed jobs; returns one result per job
+        workers: Concurrent batch tasks in this process
+        batch_size: Most jobs claimed at once
+        poll_interval: Seconds between polls for jobs queued by other processes
+    """
+
+    def __init__(
+        self,
+        queue: SigningQueue,
+        process: Callable[[List[SigningJob]], Awaitable[List[JobResult]]],
+        workers: int = 2,
+        batch_size: int = 32,
+        poll_interval: float = 0.05
+    ):
+        self.queue = queue
+        self.process = process
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        """Stop after the batches in progress; unclaimed jobs stay queued"""
+        self._stopping = True
+        if self._wake is not None:
+            self._wake.set()
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """A job was queued by this process; skip the poll wait"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            jobs = await asyncio.to_thread(self.queue.claim, self.batch_size)
+            if not jobs:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                results = await self.process(jobs)
+            except Exception as e:
+                logger.exception("Signing batch of %d jobs failed", len(jobs))
+                results = [JobResult(job.artifact_id, error=str(e)) for job in jobs]
+            lost = await asyncio.to_thread(self.queue.finish, jobs[0].claim, results)
+            if lost:
+                logger.warning("Signing lease ran out before the batch finished; dropped outcomes for %s", lost)
@@ -0,0 +1,380 @@
+"""
+Artifact storage backends for the FedMCP reference server
+
+Stored records are kept as the exact JSON bytes written at create time so
+reads can be served without a parse/re-encode round trip. Local storage
+also keeps each record's offset map, so field projections are cut from
+those bytes without parsing them (see ``projection``). ``FilteredStorage``
+puts a Bloom filter of stored IDs in front of a backend so lookups of
+unknown IDs never reach it.
+
+Writes are create-only: storing an ID that already exists raises
+``ArtifactExists`` and leaves the stored record untouched, so an ID names
+the same bytes for as long as it exists.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, List, NamedTuple
+
+import boto3
+
+from src.bloom_filter import BloomFilter
+from src.projection import OFFSET_MIN_BYTES, Offsets, encode_record_with_offsets
+
+
+def encode_record(data: Dict[str, Any]) -> bytes:
+    """Serialize a stored artifact record once, at write time"""
+    return json.dumps(data).encode()
+
+
+class ArtifactExists(ValueError):
+    """A record is already stored under this ID"""
+
+
+class ArtifactMeta(NamedTuple):
+    """Per-artifact metadata kept alongside the record"""
+    workspace_id: Optional[str]
+    etag: Optional[str] = None
+    signed: bool = False
+
+
+class StoredArtifact(NamedTuple):
+    """Raw stored artifact record plus the metadata the server needs"""
+    body: bytes
+    meta: ArtifactMeta
+
+
+def _meta_from_record(data: Dict[str, Any]) -> ArtifactMeta:
+    """Derive metadata for records written before it was stored separately"""
+    return ArtifactMeta(
+        workspace_id=data.get("artifact", {}).get("workspaceId"),
+        signed=bool(data.get("jws"))
+    )
+
+
+class StorageBackend:
+    """Abstract storage backend"""
+
+    async def store_artifact(
+        self,
+        artifact_id: str,
+        data: Dict[str, Any],
+        etag: Optional[str] = None
+    ) -> None:
+        raise NotImplementedError
+
+    async def head_artifact(self, artifact_id: str) -> Optional[ArtifactMeta]:
+        """Return artifact metadata without reading the record"""
+        raise NotImplementedError
+
+    async def open_artifact(self, artifact_id: str) -> Optional[StoredArtifact]:
+        """Return the stored record without parsing it"""
+        raise NotImplementedError
+
+    async def get_artifact(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        stored = await self.open_artifact(artifact_id)
+        if stored is None:
+            return None
+        return json.loads(stored.body)
+
+    async def read_offsets(self, artifact_id: str, body: bytes) -> Optional[Offsets]:
+        """Return the offset map of ``body``, if the backend keeps one for those bytes"""
+        return None
+
+    async def list_artifacts(self, workspace_id: Optional[str] = None) -> List[str]:
+        raise NotImplementedError
+
+
+class LocalStorage(StorageBackend):
+    """
+    Local filesystem storage
+
+    Each artifact is written to ``<id>.json`` with a small ``<id>.meta``
+    sidecar holding the fields the server needs without opening the record.
+    Large records also get an ``<id>.offsets`` file with their offset map,
+    read only for projections.
+
+    Every file is written to a temporary file and moved into place, so
+    readers never see a partial one. The sidecars go first and the record
+    last: once ``<id>.json`` exists, its sidecars are there too. The record
+    is hard-linked into place, which fails if it already exists. The offset
+    map also carries the SHA-256 of the record it describes and is ignored
+    if the record doesn't match, so a projection is never cut from bytes
+    the map wasn't made for.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _record_path(self, artifact_id: str) -> Path:
+        return self.path / f"{artifact_id}.json"
+
+    def _meta_path(self, artifact_id: str) -> Path:
+        return self.path / f"{artifact_id}.meta"
+
+    def _offsets_path(self, artifact_id: str) -> Path:
+        return self.path / f"{artifact_id}.offsets"
+
+    def _read_meta(self, artifact_id: str) -> ArtifactMeta:
+        try:
+            meta = json.loads(self._meta_path(artifact_id).read_bytes())
+        except FileNotFoundError:
+            # Records written before sidecars existed
+            with open(self._record_path(artifact_id), 'rb') as f:
+                return _meta_from_record(json.load(f))
+        return ArtifactMeta(
+            workspace_id=meta.get("workspaceId"),
+            etag=meta.get("etag"),
+            signed=meta.get("signed", False)
+        )
+
+    async def store_artifact(
+        self,
+        artifact_id: str,
+        data: Dict[str, Any],
+        etag: Optional[str] = None
+    ) -> None:
+        body, offsets = encode_record_with_offsets(data)
+        meta = {
+            "workspaceId": data.get("artifact", {}).get("workspaceId"),
+            "etag": etag,
+            "signed": bool(data.get("jws"))
+        }
+        record_path = self._record_path(artifact_id)
+        if record_path.exists():
+            # Don't touch the stored record's sidecars either
+            raise ArtifactExists(f"Artifact {artifact_id} already exists")
+        if len(body) >= OFFSET_MIN_BYTES:
+            self._write(self._offsets_path(artifact_id), encode_record({
+                "sha256": hashlib.sha256(body).hexdigest(), "offsets": offsets
+            }))
+        self._write(self._meta_path(artifact_id), encode_record(meta))
+        self._write(record_path, body, create=True)
+
+    def _write(self, path: Path, data: bytes, create: bool = False) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            if not create:
+                os.replace(tmp_path, path)
+                return
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                raise ArtifactExists(f"Artifact {path.stem} already exists") from None
+        finally:
+            Path(tmp_path).unlink(missing_ok=True)
+
+    async def head_artifact(self, artifact_id: str) -> Optional[ArtifactMeta]:
+        if not self._record_path(artifact_id).exists():
+            return None
+        return self._read_meta(artifact_id)
+
+    async def open_artifact(self, artifact_id: str) -> Optional[StoredArtifact]:
+        try:
+            body = self._record_path(artifact_id).read_bytes()
+        except FileNotFoundError:
+            return None
+        return StoredArtifact(body=body, meta=self._read_meta(artifact_id))
+
+    async def read_offsets(self, artifact_id: str, body: bytes) -> Optional[Offsets]:
+        try:
+            stored = json.loads(self._offsets_path(artifact_id).read_bytes())
+        except FileNotFoundError:
+            return None
+        # Maps written before they carried a digest can't be checked
+        if stored.get("sha256") != hashlib.sha256(body).hexdigest():
+            return None
+        return stored["offsets"]
+
+    async def list_artifacts(self, workspace_id: Optional[str] = None) -> List[str]:
+        artifacts = []
+        for file_path in self.path.glob("*.json"):
+            if workspace_id:
+                meta = self._read_meta(file_path.stem)
+                if meta.workspace_id == workspace_id:
+                    artifacts.append(file_path.stem)
+            else:
+                artifacts.append(file_path.stem)
+        return artifacts
+
+
+class S3Storage(StorageBackend):
+    """
+    AWS S3 storage
+
+    Artifact metadata travels as S3 object metadata so reads don't need to
+    parse the body and conditional requests only need a HEAD. Offset maps
+    don't fit in the 2 KB of object metadata, so projections parse the record.
+    Records are written with ``If-None-Match: *``, so S3 refuses to replace
+    one, whichever replica writes it.
+    """
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+        self.s3 = boto3.client('s3')
+
+    async def store_artifact(
+        self,
+        artifact_id: str,
+        data: Dict[str, Any],
+        etag: Optional[str] = None
+    ) -> None:
+        workspace_id = data.get("artifact", {}).get("workspaceId")
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=f"artifacts/{artifact_id}.json",
+                Body=encode_record(data),
+                ContentType='application/json',
+                IfNoneMatch='*',
+                Metadata={
+                    "workspace-id": workspace_id or "",
+                    "content-etag": etag or "",
+                    "signed": "1" if data.get("jws") else ""
+                }
+            )
+        except self.s3.exceptions.ClientError as e:
+            # 412 if the key exists, 409 if another write of it is in flight
+            if e.response.get('Error', {}).get('Code') in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                raise ArtifactExists(f"Artifact {artifact_id} already exists") from e
+            raise
+
+    @staticmethod
+    def _meta_from_s3(metadata: Dict[str, str]) -> Optional[ArtifactMeta]:
+        if not metadata.get("workspace-id"):
+            return None
+        return ArtifactMeta(
+            workspace_id=metadata["workspace-id"],
+            etag=metadata.get("content-etag") or None,
+            signed=bool(metadata.get("signed"))
+        )
+
+    async def head_artifact(self, artifact_id: str) -> Optional[ArtifactMeta]:
+        try:
+            response = self.s3.head_object(
+                Bucket=self.bucket,
+                Key=f"artifacts/{artifact_id}.json"
+            )
+        except self.s3.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey'):
+                return None
+            raise
+        meta = self._meta_from_s3(response.get('Metadata', {}))
+        if meta is None:
+            stored = await self.open_artifact(artifact_id)
+            return stored.meta if stored else None
+        return meta
+
+    async def open_artifact(self, artifact_id: str) -> Optional[StoredArtifact]:
+        try:
+            response = self.s3.get_object(
+                Bucket=self.bucket,
+                Key=f"artifacts/{artifact_id}.json"
+            )
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        body = response['Body'].read()
+        meta = self._meta_from_s3(response.get('Metadata', {}))
+        if meta is None:
+            meta = _meta_from_record(json.loads(body))
+        return StoredArtifact(body=body, meta=meta)
+
+    async def list_artifacts(self, workspace_id: Optional[str] = None) -> List[str]:
+        # For workspace filtering, would need to store metadata or scan objects
+        artifacts = []
+        pages = self.s3.get_paginator('list_objects_v2').paginate(
+            Bucket=self.bucket,
+            Prefix="artifacts/"
+        )
+        for page in pages:
+            for obj in page.get('Contents', []):
+                artifact_id = obj['Key'].split('/')[-1].replace('.json', '')
+                artifacts.append(artifact_id)
+        return artifacts
+
+
+class FilteredStorage(StorageBackend):
+    """
+    A backend behind a Bloom filter of the IDs stored in it
+
+    Lookups of IDs the filter has never seen return ``None`` without calling
+    the backend, so on S3 a 404 costs no request. Writes add the ID before
+    storing, so no reader finds a stored record missing from the filter.
+    Until the filter has been filled with the IDs already in the backend
+    (``rebuild``, once per filter file), every lookup goes to the backend.
+
+    All writes must go through this host's filter: records stored by
+    another node are only picked up by the next ``rebuild``.
+
+    Args:
+        backend: Storage holding the records
+        bloom: Filter of stored IDs
+        lookups: Optional counter of filter answers, labelled ``result``
+            (``absent``, ``present`` or ``false_positive``)
+    """
+
+    def __init__(self, backend: StorageBackend, bloom: BloomFilter, lookups: Any = None):
+        self.backend = backend
+        self.bloom = bloom
+        self.lookups = lookups
+
+    @property
+    def ready(self) -> bool:
+        return self.bloom.filled
+
+    def rebuild(self, artifact_ids: Iterable[str]) -> None:
+        """Add the IDs already stored, then trust the filter"""
+        self.bloom.update(artifact_ids)
+        self.bloom.mark_filled()
+
+    def _absent(self, artifact_id: str) -> bool:
+        if not self.ready:
+            return False
+        if artifact_id in self.bloom:
+            return False
+        self._count("absent")
+        return True
+
+    def _count(self, result: str) -> None:
+        if self.lookups is not None:
+            self.lookups.inc(result=result)
+
+    def _found(self, found: bool) -> None:
+        if self.ready:
+            self._count("present" if found else "false_positive")
+
+    async def store_artifact(
+        self,
+        artifact_id: str,
+        data: Dict[str, Any],
+        etag: Optional[str] = None
+    ) -> None:
+        self.bloom.add(artifact_id)
+        await self.backend.store_artifact(artifact_id, data, etag=etag)
+
+    async def head_artifact(self, artifact_id: str) -> Optional[ArtifactMeta]:
+        if self._absent(artifact_id):
+            return None
+        meta = await self.backend.head_artifact(artifact_id)
+        self._found(meta is not None)
+        return meta
+
+    async def open_artifact(self, artifact_id: str) -> Optional[StoredArtifact]:
+        if self._absent(artifact_id):
+            return None
+        stored = await self.backend.open_artifact(artifact_id)
+        self._found(stored is not None)
+        return stored
+
+    async def read_offsets(self, artifact_id: str, body: bytes) -> Optional[Offsets]:
+        return await self.backend.read_offsets(artifact_id, body)
+
+    async def list_artifacts(self, workspace_id: Optional[str] = None) -> List[str]:
+        return await self.backend.list_artifacts(workspace_id)
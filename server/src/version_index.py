@@ -0,0 +1,130 @@
+"""
+Version history of logical artifacts
+
+Every stored artifact belongs to a lineage: a new artifact starts one
+(named after its own ID) and an artifact created to supersede another
+joins that one's lineage with the next version number. ``VersionIndex``
+keeps ``(lineage, version) -> artifact`` in a SQLite file (WAL mode,
+shared by the workers), so the versions of a lineage, its latest version
+and the lineage of an artifact are each one B-tree lookup.
+
+The ``(lineage, version)`` key and the artifact ID are claimed before the
+record is written, so of two creates superseding the same version (or
+posting the same ID) only one succeeds.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    lineage_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    artifact_id TEXT NOT NULL,
+    workspace_id TEXT,
+    created_at TEXT,
+    PRIMARY KEY (lineage_id, version)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS ix_versions_artifact ON versions (artifact_id);
+"""
+
+
+class VersionConflict(ValueError):
+    """The version is taken, or the artifact already exists"""
+
+
+class ArtifactVersion(NamedTuple):
+    lineage_id: str
+    version: int
+    artifact_id: str
+    workspace_id: Optional[str]
+    created_at: Optional[str]
+
+
+class VersionIndex:
+    """
+    Lineage and version of every stored artifact
+
+    Args:
+        path: SQLite file shared by all workers
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def add(self, entry: ArtifactVersion) -> None:
+        """
+        Record a new artifact's place in its lineage
+
+        Raises:
+            VersionConflict: If the version is taken, or the artifact is
+                already indexed (stored artifacts are never rewritten)
+        """
+        with self._lock:
+            try:
+                self._conn.execute("INSERT INTO versions VALUES (?, ?, ?, ?, ?)", entry)
+            except sqlite3.IntegrityError:
+                existing = self._get(entry.artifact_id)
+                if existing is None:
+                    raise VersionConflict(f"Version {entry.version} of {entry.lineage_id} already exists")
+                raise VersionConflict(
+                    f"Artifact {entry.artifact_id} already exists as version "
+                    f"{existing.version} of {existing.lineage_id}"
+                )
+
+    def remove(self, artifact_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM versions WHERE artifact_id = ?", (artifact_id,))
+
+    def get(self, artifact_id: str) -> Optional[ArtifactVersion]:
+        """An artifact's lineage and version, or ``None`` if it isn't indexed"""
+        with self._lock:
+            return self._get(artifact_id)
+
+    def _get(self, artifact_id: str) -> Optional[ArtifactVersion]:
+        row = self._conn.execute(
+            "SELECT * FROM versions WHERE artifact_id = ?", (artifact_id,)
+        ).fetchone()
+        return ArtifactVersion(*row) if row else None
+
+    def resolve(self, lineage_id: str, version: Optional[int] = None) -> Optional[ArtifactVersion]:
+        """A version of a lineage, the latest if ``version`` is ``None``"""
+        with self._lock:
+            if version is None:
+                row = self._conn.execute(
+                    "SELECT * FROM versions WHERE lineage_id = ? ORDER BY version DESC LIMIT 1",
+                    (lineage_id,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT * FROM versions WHERE lineage_id = ? AND version = ?", (lineage_id, version)
+                ).fetchone()
+        return ArtifactVersion(*row) if row else None
+
+    def versions(self, lineage_id: str) -> List[ArtifactVersion]:
+        """All versions of a lineage, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM versions WHERE lineage_id = ? ORDER BY version", (lineage_id,)
+            ).fetchall()
+        return [ArtifactVersion(*row) for row in rows]
+
+    def artifact_ids(self) -> List[str]:
+        """Every indexed artifact, which is every stored one"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT artifact_id FROM versions")]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
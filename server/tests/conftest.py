@@ -0,0 +1,47 @@
+import copy
+import json
+import os
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+ROOT = Path(__file__).parents[2]
+EXAMPLE = ROOT / "examples" / "healthcare" / "clinical_decision_support.json"
+
+# The server runs on the fedmcp core package, which must win over the legacy
+# server/fedmcp one that a run from server/ would otherwise import
+sys.path[:0] = [str(ROOT / "core" / "python"), str(ROOT / "server")]
+AUTH = {"Authorization": "Bearer test-user"}
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """The reference server, configured once per session to store under a temp dir"""
+    os.environ["LOCAL_STORAGE_PATH"] = str(tmp_path_factory.mktemp("server"))
+    from src import fedmcp_server
+
+    return fedmcp_server
+
+
+@pytest.fixture(scope="session")
+def client(server):
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app, headers=AUTH) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def new_artifact():
+    """A fresh copy of the example artifact with its own ID"""
+    template = json.loads(EXAMPLE.read_text())
+
+    def make(**changes):
+        artifact = copy.deepcopy(template)
+        artifact["id"] = str(uuid4())
+        artifact.update(changes)
+        return artifact
+
+    return make
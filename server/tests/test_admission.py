@@ -0,0 +1,135 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.admission import MIN_LEASE, AdmissionController, FairScheduler, RateLimited, TokenBuckets
+from src.shared_state import SharedState
+
+
+def test_buckets_are_shared_across_workers(tmp_path):
+    path = str(tmp_path / "state.db")
+    first = TokenBuckets(SharedState(path), "workspace", rate=1.0, burst=4, lease=2)
+    second = TokenBuckets(SharedState(path), "workspace", rate=1.0, burst=4, lease=2)
+    now = 1000.0
+
+    # Each worker leases two of the four tokens
+    assert [first.take("ws-a", now) for _ in range(2)] == [0.0, 0.0]
+    assert [second.take("ws-a", now) for _ in range(2)] == [0.0, 0.0]
+    assert first.take("ws-a", now) == pytest.approx(1.0)
+    assert second.take("ws-a", now + 0.5) == pytest.approx(0.5)
+    # Other workspaces have their own bucket; time refills this one
+    assert first.take("ws-b", now) == 0.0
+    assert second.take("ws-a", now + 1.0) == 0.0
+
+
+def test_scheduler_serves_workspaces_round_robin():
+    async def scenario():
+        scheduler = FairScheduler(max_concurrent=1, max_queued=10)
+        order = []
+
+        async def request(workspace, label):
+            await scheduler.acquire(workspace, timeout=5)
+            order.append(label)
+            await asyncio.sleep(0)
+            scheduler.release()
+
+        await scheduler.acquire("noisy", timeout=5)
+        tasks = [asyncio.ensure_future(request("noisy", f"noisy-{i}")) for i in range(3)]
+        tasks.append(asyncio.ensure_future(request("quiet", "quiet-0")))
+        await asyncio.sleep(0)
+        assert scheduler.queued() == 4
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        return order, scheduler.running
+
+    order, running = asyncio.run(scenario())
+    assert order == ["noisy-0", "quiet-0", "noisy-1", "noisy-2"]
+    assert running == 0
+
+
+def test_scheduler_refuses_full_queue_and_times_out():
+    async def scenario():
+        scheduler = FairScheduler(max_concurrent=1, max_queued=1)
+        await scheduler.acquire("ws", timeout=1)
+        waiter = asyncio.ensure_future(scheduler.acquire("ws", timeout=0.01))
+        await asyncio.sleep(0)
+        with pytest.raises(RateLimited) as full:
+            await scheduler.acquire("ws", timeout=1)
+        with pytest.raises(RateLimited) as late:
+            await waiter
+        return full.value.scope, late.value.scope, scheduler.queued()
+
+    assert asyncio.run(scenario()) == ("queue", "capacity", 0)
+
+
+def test_admit_refunds_actor_token_when_workspace_is_limited(tmp_path):
+    state = SharedState(str(tmp_path / "state.db"))
+    actor = TokenBuckets(state, "actor", rate=0.001, burst=2, lease=1)
+    controller = AdmissionController(
+        workspace=TokenBuckets(state, "workspace", rate=0.001, burst=1, lease=1),
+        actor=actor,
+        max_wait=0.01
+    )
+
+    async def scenario():
+        async with controller.admit("ws", "user:alice"):
+            pass
+        with pytest.raises(RateLimited) as refused:
+            async with controller.admit("ws", "user:alice"):
+                pass
+        return refused.value
+
+    refused = asyncio.run(scenario())
+    assert refused.scope == "workspace"
+    assert int(refused.retry_after_header) > 900
+    # The actor's second token was handed back, so another workspace can use it
+    assert actor.take("user:alice") == 0.0
+
+
+def test_admit_refunds_both_tokens_when_scheduling_fails(tmp_path):
+    state = SharedState(str(tmp_path / "state.db"))
+    actor = TokenBuckets(state, "actor", rate=0.001, burst=2, lease=1)
+    workspace = TokenBuckets(state, "workspace", rate=0.001, burst=2, lease=1)
+    controller = AdmissionController(
+        workspace=workspace,
+        actor=actor,
+        scheduler=FairScheduler(max_concurrent=1, max_queued=10),
+        max_wait=0.01
+    )
+
+    async def scenario():
+        async with controller.admit("ws", "user:alice"):
+            # No slot frees up in time: refused for capacity
+            with pytest.raises(RateLimited) as refused:
+                async with controller.admit("ws", "user:alice"):
+                    pass
+        return refused.value.scope
+
+    assert asyncio.run(scenario()) == "capacity"
+    # The refused request's tokens were handed back
+    assert actor.take("user:alice") == 0.0
+    assert workspace.take("ws") == 0.0
+
+
+def test_shared_refills_run_off_the_event_loop(tmp_path):
+    state = SharedState(str(tmp_path / "state.db"))
+    update = state.update
+    refills = []
+
+    def recording_update(*args, **kwargs):
+        refills.append(threading.current_thread() is threading.main_thread())
+        return update(*args, **kwargs)
+
+    state.update = recording_update
+    buckets = TokenBuckets(state, "workspace", rate=0.001, burst=8)
+    assert buckets.lease == MIN_LEASE
+    assert TokenBuckets(state, "actor", rate=1, burst=2).lease == 2
+
+    async def scenario():
+        return await asyncio.gather(*(buckets.take_async("ws") for _ in range(10)))
+
+    waits = asyncio.run(scenario())
+    # Every token of the bucket was handed out once, each refill on a worker thread
+    assert sum(wait == 0.0 for wait in waits) == 8
+    assert refills and not any(refills)
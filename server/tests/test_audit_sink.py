@@ -0,0 +1,164 @@
+import asyncio
+import json
+
+from src.audit_sink import CloudWatchAuditSink, MAX_BATCH_BYTES, rejected_ranges, split_batches
+
+
+class FakeLogsClient:
+    """Stands in for boto3's ``logs`` client"""
+
+    def __init__(self):
+        self.calls = []
+        self.online = True
+        self.rejected_info = None
+
+    def put_log_events(self, logGroupName, logStreamName, logEvents):
+        if not self.online:
+            raise ConnectionError("network down")
+        self.calls.append(list(logEvents))
+        if self.rejected_info:
+            return {"nextSequenceToken": "t", "rejectedLogEventsInfo": self.rejected_info}
+        return {"nextSequenceToken": "t"}
+
+    @property
+    def messages(self):
+        return [json.loads(e["message"]) for call in self.calls for e in call]
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_batches_records_into_one_call():
+    client = FakeLogsClient()
+
+    async def scenario():
+        sink = CloudWatchAuditSink(client, "group", "stream", flush_interval=0.05)
+        await sink.start()
+        for n in range(250):
+            await sink.emit({"n": n})
+        await sink.close()
+
+    _run(scenario())
+    assert len(client.calls) == 1
+    assert [m["n"] for m in client.messages] == list(range(250))
+
+
+def test_flushes_on_interval():
+    client = FakeLogsClient()
+
+    async def scenario():
+        sink = CloudWatchAuditSink(client, "group", "stream", flush_interval=0.05)
+        await sink.start()
+        await sink.emit({"n": 1})
+        await asyncio.sleep(0.2)
+        sent_before_close = len(client.calls)
+        await sink.close()
+        return sent_before_close
+
+    assert _run(scenario()) == 1
+
+
+def test_respects_event_count_limit():
+    client = FakeLogsClient()
+
+    async def scenario():
+        sink = CloudWatchAuditSink(client, "group", "stream", flush_interval=10, max_batch_events=100)
+        await sink.start()
+        for n in range(250):
+            await sink.emit({"n": n})
+        await sink.flush()
+        await sink.close()
+
+    _run(scenario())
+    assert [len(call) for call in client.calls] == [100, 100, 50]
+
+
+def test_split_batches_respects_byte_limit():
+    message = "x" * (100 * 1024)
+    events = [{"timestamp": n, "message": message} for n in range(25)]
+    batches = list(split_batches(events))
+    assert sum(len(b) for b in batches) == 25
+    for batch in batches:
+        assert sum(len(e["message"]) + 26 for e in batch) <= MAX_BATCH_BYTES
+
+
+def test_backpressure_when_queue_full():
+    client = FakeLogsClient()
+
+    async def scenario():
+        sink = CloudWatchAuditSink(client, "group", "stream", flush_interval=10, max_queue=2)
+        # Not started as a flusher yet: fill the queue by hand
+        sink._queue = asyncio.Queue(maxsize=sink.max_queue)
+        await sink.emit({"n": 1})
+        await sink.emit({"n": 2})
+        blocked = asyncio.ensure_future(sink.emit({"n": 3}))
+        await asyncio.sleep(0.05)
+        return blocked.done()
+
+    assert _run(scenario()) is False
+
+
+def test_spills_when_offline_and_replays(tmp_path):
+    client = FakeLogsClient()
+    spill = tmp_path / "spill.ndjson"
+
+    async def scenario():
+        sink = CloudWatchAuditSink(client, "group", "stream", flush_interval=10, spill_path=str(spill))
+        await sink.start()
+        client.online = False
+        await sink.emit({"n": 1})
+        await sink.emit({"n": 2})
+        await sink.flush()
+        assert spill.exists()
+        assert client.calls == []
+
+        client.online = True
+        await sink.emit({"n": 3})
+        await sink.close()
+
+    _run(scenario())
+    assert not spill.exists()
+    assert sorted(m["n"] for m in client.messages) == [1, 2, 3]
+
+
+def test_counts_rejected_events(caplog):
+    client = FakeLogsClient()
+    client.rejected_info = {"tooOldLogEventEndIndex": 2, "expiredLogEventEndIndex": 1, "tooNewLogEventStartIndex": 9}
+
+    async def scenario():
+        sink = CloudWatchAuditSink(client, "group", "stream", flush_interval=10)
+        await sink.start()
+        for n in range(10):
+            await sink.emit({"n": n}, timestamp_ms=1000 + n)
+        await sink.close()
+        return sink.rejected
+
+    assert _run(scenario()) == 3
+    assert "rejected audit events 0-1 of 10 as too old (timestamps 1000-1001)" in caplog.text
+    assert rejected_ranges({"tooNewLogEventStartIndex": 0}, 4) == [("too new", 0, 4)]
+
+
+def test_keeps_flushing_when_spill_fails(tmp_path):
+    client = FakeLogsClient()
+    # The spill file's parent is a regular file: every spill write fails
+    (tmp_path / "not-a-dir").write_text("")
+    spill = tmp_path / "not-a-dir" / "spill.ndjson"
+
+    async def scenario():
+        sink = CloudWatchAuditSink(client, "group", "stream", flush_interval=10, spill_path=str(spill))
+        await sink.start()
+        client.online = False
+        await sink.emit({"n": 1})
+        await sink.flush()
+        dropped = sink.dropped
+
+        client.online = True
+        await sink.emit({"n": 2})
+        await sink.flush()
+        running = not sink._task.done()
+        await sink.close()
+        return dropped, running
+
+    assert _run(scenario()) == (1, True)
+    assert [m["n"] for m in client.messages] == [2]
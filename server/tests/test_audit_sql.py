@@ -0,0 +1,86 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.audit_sink import RelationalAuditSink
+from src.audit_sql import AUDIT_COLUMNS, SQLiteAuditWriter
+
+T0 = datetime(2025, 1, 15, tzinfo=timezone.utc)
+
+
+def _row(n: int, action: str = "read"):
+    return (
+        f"00000000-0000-4000-8000-{n:012d}",
+        T0 + timedelta(milliseconds=n),
+        action,
+        "user:alice",
+        None,
+        "11111111-1111-4111-8111-111111111111",
+        {"n": n} if n % 2 else {},
+        None,
+        None,
+        None,
+    )
+
+
+def test_writer_stores_rows_and_indexes(tmp_path):
+    path = str(tmp_path / "audit.db")
+    writer = SQLiteAuditWriter(path)
+    writer.write_rows([_row(n) for n in range(5)])
+    # Replayed rows are ignored rather than failing the whole batch
+    writer.write_rows([_row(4), _row(5, action="create")])
+    writer.close()
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute(f"SELECT {', '.join(AUDIT_COLUMNS)} FROM audit_events ORDER BY timestamp").fetchall()
+    assert len(rows) == 6
+    assert rows[1][1] == "2025-01-15T00:00:00.001000+00:00"
+    assert rows[1][6] == '{"n":1}'
+    assert rows[-1][2] == "create"
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM audit_events WHERE action = ? ORDER BY timestamp DESC",
+        ("create",)
+    ).fetchall()
+    assert "ix_audit_events_action" in str(plan)
+
+
+def test_failed_batch_is_rolled_back(tmp_path):
+    writer = SQLiteAuditWriter(str(tmp_path / "audit.db"))
+    bad = list(_row(1))
+    bad[2] = None  # action is NOT NULL
+    with pytest.raises(sqlite3.IntegrityError):
+        writer.write_rows([_row(0), tuple(bad)])
+    writer.write_rows([_row(2)])
+    count = writer._conn.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0]
+    assert count == 1
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+
+    def write_rows(self, rows):
+        self.batches.append(list(rows))
+
+    def close(self):
+        self.closed = True
+
+
+def test_sink_writes_one_batch_per_flush():
+    writer = RecordingWriter()
+
+    async def scenario():
+        sink = RelationalAuditSink(writer, flush_interval=0.05, max_batch_rows=100)
+        await sink.start()
+        for n in range(250):
+            await sink.emit_row(_row(n))
+        await sink.flush()
+        await sink.close()
+
+    asyncio.run(scenario())
+    assert [len(b) for b in writer.batches] == [100, 100, 50]
+    assert writer.closed
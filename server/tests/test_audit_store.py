@@ -0,0 +1,251 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from src.audit_store import AuditStore, ChainConfig
+
+HOUR_MS = 3600 * 1000
+T0 = int(datetime(2025, 1, 15, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _event(n: int, action: str = "read", artifact_id: str = "a-1", actor: str = "user:alice") -> dict:
+    return {
+        "id": f"evt-{n}",
+        "action": action,
+        "actor": actor,
+        "artifactId": artifact_id,
+        "workspaceId": "ws-1",
+        "metadata": {},
+    }
+
+
+def _wait_for_maintenance():
+    # Rolling over starts retention and export in the background
+    for thread in threading.enumerate():
+        if thread.name == "audit-maintenance":
+            thread.join(timeout=5)
+
+
+def test_filters_apply_before_limit(tmp_path):
+    store = AuditStore(str(tmp_path))
+    store.append(_event(0, action="create"), ts_ms=T0)
+    for n in range(1, 200):
+        store.append(_event(n), ts_ms=T0 + n)
+
+    created = store.query(action="create", limit=10)
+    assert [e["id"] for e in created] == ["evt-0"]
+
+    recent = store.query(limit=3)
+    assert [e["id"] for e in recent] == ["evt-197", "evt-198", "evt-199"]
+
+
+def test_time_range_spans_segments(tmp_path):
+    store = AuditStore(str(tmp_path), segment_seconds=3600)
+    for n in range(6):
+        store.append(_event(n), ts_ms=T0 + n * HOUR_MS)
+    assert len(store.segments()) == 6
+
+    start = datetime.fromtimestamp((T0 + 2 * HOUR_MS) / 1000, timezone.utc)
+    end = datetime.fromtimestamp((T0 + 4 * HOUR_MS) / 1000, timezone.utc)
+    events = store.query(start=start, end=end)
+    assert [e["id"] for e in events] == ["evt-2", "evt-3"]
+
+
+def test_indexed_fields(tmp_path):
+    store = AuditStore(str(tmp_path))
+    store.append(_event(0, artifact_id="a-1", actor="user:alice"), ts_ms=T0)
+    store.append(_event(1, artifact_id="a-2", actor="user:bob"), ts_ms=T0 + 1)
+    store.append(_event(2, artifact_id="a-2", actor="user:alice"), ts_ms=T0 + 2)
+
+    assert [e["id"] for e in store.query(artifact_id="a-2")] == ["evt-1", "evt-2"]
+    assert [e["id"] for e in store.query(artifact_id="a-2", actor="user:alice")] == ["evt-2"]
+
+    conn = store._connect(store.segments()[0], create=False)
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT body FROM events WHERE actor = ? ORDER BY ts_ms DESC",
+        ("user:bob",)
+    ).fetchall()
+    assert "ix_events_actor" in str(plan)
+
+
+def test_store_is_shared_and_persistent(tmp_path):
+    writer = AuditStore(str(tmp_path))
+    writer.append(_event(0), ts_ms=T0)
+    reader = AuditStore(str(tmp_path))
+    writer.append(_event(1), ts_ms=T0 + 1)
+
+    assert [e["id"] for e in reader.query()] == ["evt-0", "evt-1"]
+
+
+def test_append_only(tmp_path):
+    store = AuditStore(str(tmp_path))
+    store.append(_event(0), ts_ms=T0)
+    conn = store._connect(store.segments()[0], create=False)
+    with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+        conn.execute("DELETE FROM events")
+
+
+def test_reads_use_their_own_read_only_connections(tmp_path):
+    store = AuditStore(str(tmp_path), segment_seconds=3600, retention_seconds=3600)
+    store.append(_event(0), ts_ms=T0)
+    results = []
+    reader = threading.Thread(target=lambda: results.append(store.query()))
+    reader.start()
+    reader.join()
+    assert [e["id"] for e in results[0]] == ["evt-0"]
+
+    segment_path = store._segment_path(store.segments()[0])
+    [conn] = store._readers[segment_path]
+    assert conn is not store._connect(store.segments()[0], create=False)
+    with pytest.raises(sqlite3.OperationalError, match="readonly"):
+        conn.execute("INSERT INTO rollups VALUES (0, '', '', '', 1)")
+
+    assert store.enforce_retention(now_ms=T0 + 3 * HOUR_MS) == [T0 // 1000]
+    assert segment_path not in store._readers
+    assert store.query() == []
+
+
+def test_retention_drops_whole_segments(tmp_path):
+    store = AuditStore(str(tmp_path), segment_seconds=3600, retention_seconds=2 * 3600)
+    for n in range(5):
+        store.append(_event(n), ts_ms=T0 + n * HOUR_MS)
+    _wait_for_maintenance()
+
+    # Rolling over to each new segment already expired the oldest ones
+    assert [e["id"] for e in store.query()] == ["evt-2", "evt-3", "evt-4"]
+
+    dropped = store.enforce_retention(now_ms=T0 + 5 * HOUR_MS)
+    assert dropped == [(T0 + 2 * HOUR_MS) // 1000]
+    assert [e["id"] for e in store.query()] == ["evt-3", "evt-4"]
+
+
+def _link(event, prev_hash, sequence):
+    # Stand-in for fedmcp.audit_chain.link_event
+    linked = dict(event, sequence=sequence, prevHash=prev_hash)
+    linked["eventHash"] = hashlib.sha256(
+        (prev_hash + json.dumps(linked, sort_keys=True)).encode()
+    ).hexdigest()
+    return linked
+
+
+def test_chain_links_across_segments_and_checkpoints(tmp_path):
+    chain = ChainConfig(
+        link=_link,
+        genesis="0" * 64,
+        sign_checkpoint=lambda sequence, head: f"jws:{sequence}:{head}",
+        checkpoint_interval=3
+    )
+    store = AuditStore(str(tmp_path), segment_seconds=3600, chain=chain)
+    for n in range(7):
+        store.append(_event(n), ts_ms=T0 + n * HOUR_MS // 2)
+
+    events = store.query()
+    assert [e["sequence"] for e in events] == list(range(1, 8))
+    assert events[0]["prevHash"] == "0" * 64
+    for prev, event in zip(events, events[1:]):
+        assert event["prevHash"] == prev["eventHash"]
+
+    checkpoint = store.latest_checkpoint()
+    assert checkpoint["sequence"] == 6
+    assert checkpoint["hash"] == events[5]["eventHash"]
+    assert [e["sequence"] for e in store.events_since(6)] == [7]
+
+    # A second store on the same directory continues the same chain
+    other = AuditStore(str(tmp_path), segment_seconds=3600, chain=chain)
+    linked = other.append(_event(7), ts_ms=T0)
+    assert linked["sequence"] == 8
+    assert linked["prevHash"] == events[-1]["eventHash"]
+    assert store.append(_event(8), ts_ms=T0)["sequence"] == 9
+
+    # The head is read from the marked segment; a marker left pointing past
+    # the last insert falls back to scanning every segment
+    assert (tmp_path / "chain.head").read_text() == str((T0 + 3 * HOUR_MS) // 1000)
+    (tmp_path / "chain.head").write_text(str((T0 + 10 * HOUR_MS) // 1000))
+    assert other.append(_event(9), ts_ms=T0)["sequence"] == 10
+    assert (tmp_path / "chain.head").read_text() == str((T0 + 3 * HOUR_MS) // 1000)
+
+
+def test_checkpoints_are_signed_outside_the_chain_lock(tmp_path):
+    locked = []
+
+    def sign(sequence, head):
+        locked.append(store._chain_lock.locked())
+        return f"jws:{sequence}:{head}"
+
+    chain = ChainConfig(link=_link, genesis="0" * 64, sign_checkpoint=sign, checkpoint_interval=2)
+    store = AuditStore(str(tmp_path), chain=chain)
+    for n in range(4):
+        store.append(_event(n), ts_ms=T0 + n)
+    assert locked == [False, False]
+    assert store.latest_checkpoint()["sequence"] == 4
+
+
+def test_stats_read_rollups(tmp_path):
+    store = AuditStore(str(tmp_path), segment_seconds=3600)
+    store.append(_event(0, action="create"), ts_ms=T0)
+    for n in range(1, 5):
+        store.append(_event(n, actor="user:bob" if n % 2 else "user:alice"), ts_ms=T0 + n * HOUR_MS // 2)
+
+    by_action = store.stats(group_by=["action"], interval_seconds=86400)
+    assert [(s["action"], s["count"]) for s in by_action] == [("create", 1), ("read", 4)]
+    assert by_action[0]["bucket"] == "2025-01-15T00:00:00Z"
+
+    hourly = store.stats(group_by=["actor"], interval_seconds=3600, action="read")
+    assert [(s["bucket"][11:13], s["actor"], s["count"]) for s in hourly] == [
+        ("00", "user:bob", 1), ("01", "user:alice", 1), ("01", "user:bob", 1), ("02", "user:alice", 1)
+    ]
+
+    start = datetime.fromtimestamp((T0 + HOUR_MS) / 1000, timezone.utc)
+    assert sum(s["count"] for s in store.stats(group_by=[], start=start)) == 3
+
+    with pytest.raises(ValueError):
+        store.stats(group_by=["artifact"])
+
+
+def test_rollups_backfilled_for_old_segments(tmp_path):
+    store = AuditStore(str(tmp_path))
+    for n in range(3):
+        store.append(_event(n), ts_ms=T0 + n)
+    conn = store._connect(store.segments()[0], create=False)
+    conn.execute("DELETE FROM rollups")
+    store.close()
+
+    reopened = AuditStore(str(tmp_path))
+    assert reopened.stats(group_by=["action"]) == [
+        {"bucket": "2025-01-15T00:00:00Z", "action": "read", "count": 3}
+    ]
+
+
+def test_export_closed_segments_to_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    store = AuditStore(str(tmp_path / "audit"), segment_seconds=3600, export_path=str(tmp_path / "export"))
+    for n in range(3):
+        store.append(_event(n, action="create" if n == 0 else "read"), ts_ms=T0 + n * HOUR_MS)
+
+    exported = store.export_closed(now_ms=T0 + 3 * HOUR_MS)
+    _wait_for_maintenance()
+    files = sorted((tmp_path / "export").glob("*.parquet"))
+    assert len(files) == 3
+    assert store.export_closed(now_ms=T0 + 3 * HOUR_MS) == []
+    assert len(exported) <= 3
+
+    table = pq.read_table(files[0])
+    assert table.column("action").to_pylist() == ["create"]
+    assert str(table.schema.field("action").type).startswith("dictionary")
+    assert table.column("timestamp").to_pylist()[0].timestamp() * 1000 == T0
+
+
+def test_retention_exports_before_dropping(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = AuditStore(
+        str(tmp_path / "audit"), segment_seconds=3600, retention_seconds=3600,
+        export_path=str(tmp_path / "export")
+    )
+    store.append(_event(0), ts_ms=T0)
+    store.enforce_retention(now_ms=T0 + 3 * HOUR_MS)
+    assert store.segments() == []
+    assert len(list((tmp_path / "export").glob("*.parquet"))) == 1
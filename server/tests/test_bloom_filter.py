@@ -0,0 +1,77 @@
+import asyncio
+from uuid import uuid4
+
+from src.bloom_filter import BloomFilter, optimal_size
+from src.storage import FilteredStorage, LocalStorage
+
+
+def test_filter_is_shared_and_meets_its_false_positive_rate(tmp_path):
+    path = str(tmp_path / "ids.bloom")
+    bloom = BloomFilter(path, capacity=2000, false_positive_rate=0.01)
+    assert (bloom.bits, bloom.hashes) == optimal_size(2000, 0.01)
+    stored = [str(uuid4()) for _ in range(2000)]
+    bloom.update(stored[:1000])
+
+    # Another worker maps the same file and sees both its own adds and ours
+    other = BloomFilter(path, capacity=2000, false_positive_rate=0.01)
+    other.update(stored[1000:])
+    assert all(artifact_id in bloom for artifact_id in stored)
+
+    false_positives = sum(str(uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 250
+    assert 0.001 < bloom.estimated_false_positive_rate() < 0.02
+
+    # Marked filled for every worker and across restarts
+    assert not other.filled
+    bloom.mark_filled()
+    assert other.filled
+    assert BloomFilter(path, capacity=2000, false_positive_rate=0.01).filled
+
+    # Other settings replace the file
+    other.close()
+    bloom.close()
+    resized = BloomFilter(path, capacity=100, false_positive_rate=0.01)
+    assert stored[0] not in resized
+    assert not resized.filled
+
+
+def test_filtered_storage_skips_the_backend_for_unknown_ids(tmp_path):
+    async def scenario():
+        backend = LocalStorage(str(tmp_path / "artifacts"))
+        earlier = str(uuid4())
+        await backend.store_artifact(earlier, {"artifact": {"id": earlier, "workspaceId": "ws-1"}})
+
+        storage = FilteredStorage(backend, BloomFilter(str(tmp_path / "ids.bloom"), 100, 0.01))
+        # Not rebuilt yet: lookups go to the backend
+        assert await storage.head_artifact(earlier) is not None
+        storage.rebuild([earlier])
+
+        new = str(uuid4())
+        await storage.store_artifact(new, {"artifact": {"id": new, "workspaceId": "ws-1"}})
+        assert (await storage.open_artifact(new)).meta.workspace_id == "ws-1"
+        assert await storage.get_artifact(earlier) is not None
+
+        # A file the filter doesn't know about is never looked at
+        missing = str(uuid4())
+        (tmp_path / "artifacts" / f"{missing}.json").write_text("{}")
+        assert await storage.head_artifact(missing) is None
+        assert await storage.open_artifact(missing) is None
+
+    asyncio.run(scenario())
+
+
+def test_a_second_replica_finds_ids_stored_by_the_first(tmp_path):
+    async def scenario():
+        backend = LocalStorage(str(tmp_path / "artifacts"))
+        first = FilteredStorage(backend, BloomFilter(str(tmp_path / "a.bloom"), 100, 0.01))
+        first.rebuild(await backend.list_artifacts())
+        artifact_id = str(uuid4())
+        await first.store_artifact(artifact_id, {"artifact": {"id": artifact_id, "workspaceId": "ws-1"}})
+
+        # Its own filter file, refilled from the shared backend
+        second = FilteredStorage(backend, BloomFilter(str(tmp_path / "b.bloom"), 100, 0.01))
+        second.rebuild(await second.list_artifacts())
+        assert await second.head_artifact(artifact_id) is not None
+        assert await second.open_artifact(artifact_id) is not None
+
+    asyncio.run(scenario())
@@ -0,0 +1,77 @@
+import hashlib
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.body_audit import BodyAuditMiddleware, BodyTap
+
+
+def _app(seen, **options):
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        body = await request.body()
+        return {"size": len(body), "sha256": hashlib.sha256(body).hexdigest()}
+
+    @app.post("/ignore")
+    async def ignore():
+        return {"ok": True}
+
+    async def on_body(tap, scope):
+        seen.append((scope["path"], tap.hexdigest(), tap.size, tap.truncated, tap.sample()))
+
+    app.add_middleware(BodyAuditMiddleware, on_body=on_body, **options)
+    return app
+
+
+def test_downstream_reads_full_body():
+    seen = []
+    client = TestClient(_app(seen))
+    body = b'{"note": "hello"}'
+    response = client.post("/echo", content=body)
+
+    digest = hashlib.sha256(body).hexdigest()
+    assert response.json() == {"size": len(body), "sha256": digest}
+    assert response.headers["x-content-sha256"] == digest
+    assert seen == [("/echo", digest, len(body), False, body)]
+
+
+def test_large_body_is_sampled_not_buffered():
+    seen = []
+    client = TestClient(_app(seen, max_sample_bytes=1024, tail_bytes=256))
+
+    def chunks():
+        for n in range(64):
+            yield bytes([65 + n % 26]) * 16384
+
+    response = client.post("/echo", content=chunks())
+    whole = b"".join(chunks())
+    digest = hashlib.sha256(whole).hexdigest()
+    assert response.json()["sha256"] == digest
+
+    _, seen_digest, size, truncated, sample = seen[0]
+    assert (seen_digest, size, truncated) == (digest, len(whole), True)
+    assert sample == whole[:768] + b"\n" + whole[-256:]
+
+
+def test_unread_body_is_still_hashed():
+    seen = []
+    client = TestClient(_app(seen))
+    body = b"x" * 5000
+    response = client.post("/ignore", content=body)
+    assert response.headers["x-content-sha256"] == hashlib.sha256(body).hexdigest()
+    assert seen[0][2] == 5000
+
+
+def test_tap_keeps_head_and_rolling_tail():
+    tap = BodyTap(max_sample_bytes=10, tail_bytes=4)
+    for chunk in (b"abc", b"defgh", b"ijklmnop"):
+        tap.update(chunk)
+    assert tap.size == 16
+    assert tap.sample() == b"abcdef\nmnop"
+
+    small = BodyTap(max_sample_bytes=10, tail_bytes=4)
+    small.update(b"abcdefgh")
+    assert not small.truncated
+    assert small.sample() == b"abcdefgh"
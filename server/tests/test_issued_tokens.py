@@ -0,0 +1,45 @@
+import base64
+import json
+import time
+
+from src.issued_tokens import PURGE_EVERY, IssuedTokens, token_kid
+from src.shared_state import SharedState
+
+
+def _segment(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+
+
+def test_issued_tokens_are_recognised_by_digest(tmp_path):
+    artifact_json = json.dumps({"id": "a1", "jsonBody": {"name": "agent"}}, separators=(",", ":"))
+    jws = ".".join([
+        _segment({"alg": "ES256", "kid": "k1"}),
+        _segment({"sub": "a1", "artifact": artifact_json}),
+        "c2lnbmF0dXJl",
+    ])
+    tokens = IssuedTokens(SharedState(str(tmp_path / "state.db")))
+
+    assert tokens.lookup(jws) is None
+    tokens.record(jws, "a1", "ws-1")
+    assert tokens.lookup(jws) == {"kid": "k1", "artifactId": "a1", "workspaceId": "ws-1"}
+    assert IssuedTokens.artifact_json(jws) == artifact_json
+
+    # One changed character is a different token
+    assert tokens.lookup(jws[:-1] + "A") is None
+    assert token_kid(jws) == "k1"
+    assert token_kid("not a token") is None
+
+
+def test_records_expire_and_are_purged(tmp_path, monkeypatch):
+    state = SharedState(str(tmp_path / "state.db"))
+    tokens = IssuedTokens(state, ttl=60)
+    tokens.record("h.p.old", "a1", "ws-1")
+    assert tokens.lookup("h.p.old")["artifactId"] == "a1"
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert tokens.lookup("h.p.old") is None
+    for n in range(PURGE_EVERY - 1):
+        tokens.record(f"h.p.{n}", "a2", "ws-1")
+    rows = state._conn.execute("SELECT COUNT(*) FROM state").fetchone()[0]
+    assert rows == PURGE_EVERY - 1
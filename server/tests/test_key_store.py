@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from src.key_store import KeyStore, key_id
+from src.shared_state import SharedState
+
+
+def _load_kid(path):
+    return key_id(KeyStore(path).signing_key().public_key())
+
+
+def test_workers_share_one_key(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        kids = set(pool.map(_load_kid, [str(tmp_path)] * 8))
+    assert len(kids) == 1
+    assert list(KeyStore(str(tmp_path)).public_keys()) == list(kids)
+    assert oct(os.stat(tmp_path / "signing-key.pem").st_mode & 0o777) == "0o600"
+
+
+def test_pem_from_environment(tmp_path):
+    key = ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    store = KeyStore(str(tmp_path), pem=pem)
+    assert key_id(store.signing_key().public_key()) == key_id(key.public_key())
+    assert not (tmp_path / "signing-key.pem").exists()
+    with pytest.raises(ValueError):
+        store.rotate()
+
+    other_curve = KeyStore(str(tmp_path), pem=ec.generate_private_key(ec.SECP384R1()).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode())
+    with pytest.raises(ValueError, match="P-256"):
+        other_curve.signing_key()
+
+
+def test_rotation_keeps_old_keys_published(tmp_path):
+    state = SharedState(str(tmp_path / "state.db"))
+    store = KeyStore(str(tmp_path / "keys"), state=state)
+    old = key_id(store.signing_key().public_key())
+    assert store.active_key_id() == old
+
+    new = key_id(store.rotate().public_key())
+    assert new != old
+    assert set(store.public_keys()) == {old, new}
+
+    # Another worker sees the rotation through shared state
+    other = KeyStore(str(tmp_path / "keys"), state=SharedState(str(tmp_path / "state.db")))
+    assert other.active_key_id() == new
+    assert key_id(other.signing_key().public_key()) == new
+
+
+def test_revoked_keys_are_withdrawn(tmp_path):
+    store = KeyStore(str(tmp_path))
+    old = key_id(store.signing_key().public_key())
+    with pytest.raises(ValueError, match="rotate"):
+        store.revoke(old)
+
+    new = key_id(store.rotate().public_key())
+    store.revoke(old)
+    assert set(store.public_keys()) == {new}
+    assert store.revoked_key_ids() == {old}
+    with pytest.raises(ValueError, match="Unknown"):
+        store.revoke(old)
@@ -0,0 +1,37 @@
+from src.pii_cache import PIIScanCache
+
+FINDINGS = [("US_SSN", 4, 15, 0.85)]
+
+
+def test_hit_miss_and_ttl(tmp_path):
+    cache = PIIScanCache(str(tmp_path / "cache.db"), ttl_seconds=60)
+    assert cache.get("a" * 64, now=1000) is None
+
+    cache.put("a" * 64, FINDINGS, now=1000)
+    cache.put("b" * 64, [], now=1000)
+    assert cache.get("a" * 64, now=1030) == FINDINGS
+    # A clean verdict is a hit too, distinct from a miss
+    assert cache.get("b" * 64, now=1030) == []
+    assert cache.get("a" * 64, now=1061) is None
+
+
+def test_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    PIIScanCache(path).put("c" * 64, FINDINGS)
+    assert PIIScanCache(path).get("c" * 64) == FINDINGS
+
+
+def test_prune_bounds_size(tmp_path):
+    cache = PIIScanCache(str(tmp_path / "cache.db"), ttl_seconds=100, max_entries=10, prune_every=5)
+    for n in range(23):
+        cache.put(f"{n:064d}", [], now=1000 + n)
+    assert len(cache) <= 13
+
+    cache.prune(now=1020)
+    assert len(cache) == 10
+    # The soonest-expiring entries went first
+    assert cache.get(f"{0:064d}", now=1020) is None
+    assert cache.get(f"{22:064d}", now=1020) == []
+
+    cache.prune(now=1200)
+    assert len(cache) == 0
@@ -0,0 +1,100 @@
+import asyncio
+import random
+import re
+
+import pytest
+
+from src.pii_chunking import merge_findings, split_windows
+from src.pii_pool import PIIScanPool
+
+PATTERNS = [
+    ("PERSON", re.compile(r"\b[A-Z][a-z]+ [A-Z][a-z]+\b")),
+    ("US_SSN", re.compile(r"\b\d{3}-\d{2}-\d{4}\b")),
+    ("EMAIL_ADDRESS", re.compile(r"\b[\w.]+@[\w.]+\.\w+\b")),
+]
+
+
+class RegexAnalyzer:
+    """Deterministic stand-in for Presidio with context-free recognizers"""
+
+    def analyze(self, text, language):
+        return [
+            Finding(entity_type, m.start(), m.end(), 0.85)
+            for entity_type, pattern in PATTERNS
+            for m in pattern.finditer(text)
+        ]
+
+
+class Finding:
+    def __init__(self, entity_type, start, end, score):
+        self.entity_type = entity_type
+        self.start = start
+        self.end = end
+        self.score = score
+
+
+def _note(seed: int, sentences: int = 400) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for n in range(sentences):
+        kind = rng.randrange(5)
+        if kind == 0:
+            parts.append(f"Patient Maria Lopez reported pain level {rng.randrange(10)}.")
+        elif kind == 1:
+            parts.append(f"SSN on file is {rng.randrange(100, 999)}-{rng.randrange(10, 99)}-{rng.randrange(1000, 9999)}.")
+        elif kind == 2:
+            parts.append(f"Follow up by mail to nurse{n}@clinic.example.org soon!")
+        elif kind == 3:
+            parts.append("Vitals stable and no acute distress was observed during the visit" + "," * rng.randrange(3))
+        else:
+            parts.append("\n\nAssessment continued without findings?")
+    return " ".join(parts)
+
+
+def _single_pass(text):
+    findings = [(f.entity_type, f.start, f.end, f.score) for f in RegexAnalyzer().analyze(text, "en")]
+    return sorted(findings, key=lambda f: (f[1], -f[2], -f[3], f[0]))
+
+
+def test_windows_cover_text_within_limits():
+    text = _note(1)
+    windows = split_windows(text, max_chars=1000, overlap=150)
+    assert windows[0][0] == 0 and windows[-1][1] == len(text)
+    for (start, end), (next_start, _) in zip(windows, windows[1:]):
+        assert end - start <= 1000
+        assert end - next_start >= 150
+        assert next_start > start
+        # Cuts fall on sentence starts
+        assert text[next_start - 1].isspace()
+
+
+def test_unbroken_text_is_hard_cut():
+    assert split_windows("x" * 1200, max_chars=500, overlap=100) == [(0, 500), (400, 900), (800, 1200)]
+    with pytest.raises(ValueError):
+        split_windows("x" * 10, max_chars=5, overlap=5)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("max_chars,overlap", [(600, 120), (1500, 300), (4000, 400)])
+def test_chunked_matches_single_pass(seed, max_chars, overlap):
+    text = _note(seed)
+    analyzer = RegexAnalyzer()
+    windows = split_windows(text, max_chars, overlap)
+    results = [
+        [(f.entity_type, f.start, f.end, f.score) for f in analyzer.analyze(text[s:e], "en")]
+        for s, e in windows
+    ]
+    assert merge_findings(windows, results) == _single_pass(text)
+
+
+def test_pool_analyzes_windows_in_parallel():
+    text = _note(7)
+
+    async def scenario():
+        pool = PIIScanPool(RegexAnalyzer, workers=2, chunk_chars=1000, chunk_overlap=200)
+        await pool.start()
+        findings = await pool.analyze(text)
+        await pool.close()
+        return findings
+
+    assert asyncio.run(scenario()) == _single_pass(text)
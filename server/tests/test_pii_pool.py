@@ -0,0 +1,152 @@
+import asyncio
+import multiprocessing
+import os
+import re
+import time
+
+from src.pii_pool import PIIScanPool
+
+
+class Finding:
+    def __init__(self, entity_type, start, end, score):
+        self.entity_type = entity_type
+        self.start = start
+        self.end = end
+        self.score = score
+
+
+class FakeAnalyzer:
+    """Flags SSN-shaped strings; ``slow`` in the text delays the scan"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+
+    def analyze(self, text, language):
+        if "slow" in text:
+            time.sleep(0.3)
+        if "boom" in text:
+            raise RuntimeError("analyzer failed")
+        return [
+            Finding("US_SSN", m.start(), m.end(), 0.85)
+            for m in re.finditer(r"\d{3}-\d{2}-\d{4}", text)
+        ]
+
+
+def test_scans_in_worker_processes():
+    async def scenario():
+        pool = PIIScanPool(FakeAnalyzer, workers=2, max_batch=4)
+        await pool.start()
+        results = await asyncio.gather(*(
+            pool.analyze(f"ssn 123-45-{n:04d}" if n % 2 else "nothing here") for n in range(10)
+        ))
+        await pool.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results[0] == []
+    assert results[1] == [("US_SSN", 4, 15, 0.85)]
+    assert sum(bool(r) for r in results) == 5
+
+
+def test_batches_texts_within_window():
+    batches = []
+
+    class CountingPool(PIIScanPool):
+        async def _run_batch(self, texts, futures):
+            batches.append(len(texts))
+            await super()._run_batch(texts, futures)
+
+    async def scenario():
+        pool = CountingPool(FakeAnalyzer, workers=0, max_batch=8, batch_window=0.05)
+        await pool.start()
+        await asyncio.gather(*(pool.analyze("plain") for _ in range(20)))
+        await pool.close()
+
+    asyncio.run(scenario())
+    assert batches == [8, 8, 4]
+
+
+def test_deadline_leaves_scan_running():
+    async def scenario():
+        pool = PIIScanPool(FakeAnalyzer, workers=1, batch_window=0)
+        await pool.start()
+        scan = pool.submit("slow 123-45-6789")
+        try:
+            await asyncio.wait_for(asyncio.shield(scan), 0.01)
+            timed_out = False
+        except asyncio.TimeoutError:
+            timed_out = True
+        findings = await scan
+        await pool.close()
+        return timed_out, findings
+
+    timed_out, findings = asyncio.run(scenario())
+    assert timed_out
+    assert findings == [("US_SSN", 5, 16, 0.85)]
+
+
+def test_analyzer_errors_fail_the_batch_only():
+    async def scenario():
+        pool = PIIScanPool(FakeAnalyzer, workers=1, batch_window=0)
+        await pool.start()
+        failed = pool.submit("boom")
+        try:
+            await failed
+        except RuntimeError:
+            pass
+        ok = await pool.analyze("123-45-6789")
+        await pool.close()
+        return ok
+
+    assert asyncio.run(scenario()) == [("US_SSN", 0, 11, 0.85)]
+
+
+class SlowLoadingAnalyzer(FakeAnalyzer):
+    def __init__(self):
+        time.sleep(0.2)
+        super().__init__()
+
+
+def test_background_warmup_sets_ready():
+    async def scenario():
+        pool = PIIScanPool(SlowLoadingAnalyzer, workers=1)
+        await pool.start(wait=False)
+        ready_at_start = pool.ready
+        # Scans submitted during warm-up queue behind it
+        findings = await pool.analyze("123-45-6789")
+        await pool.wait_ready()
+        ready_after = pool.ready
+        await pool.close()
+        return ready_at_start, findings, ready_after, pool.ready
+
+    assert asyncio.run(scenario()) == (False, [("US_SSN", 0, 11, 0.85)], True, False)
+
+
+_fork = multiprocessing.get_context("fork")
+_started = _fork.Value("i", 0)
+_loaded = _fork.Value("i", 0)
+
+
+class UnevenLoadingAnalyzer(FakeAnalyzer):
+    """The first worker loads at once, the others take a while"""
+
+    def __init__(self):
+        with _started.get_lock():
+            first = _started.value == 0
+            _started.value += 1
+        if not first:
+            time.sleep(0.5)
+        with _loaded.get_lock():
+            _loaded.value += 1
+        super().__init__()
+
+
+def test_ready_waits_for_every_worker():
+    async def scenario():
+        pool = PIIScanPool(UnevenLoadingAnalyzer, workers=3)
+        await pool.start()
+        loaded = _loaded.value
+        await pool.close()
+        return loaded
+
+    assert asyncio.run(scenario()) == 3
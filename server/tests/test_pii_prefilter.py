@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.pii_prefilter import needs_ner
+
+CORPUS = Path(__file__).parent / "data" / "pii_corpus.jsonl"
+
+
+def test_no_missed_pii_on_corpus():
+    entries = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+    missed = [e["text"] for e in entries if e["pii"] and not needs_ner(e["text"])]
+    assert missed == []
+    # Most clean bodies skip NER entirely
+    clean = [e["text"] for e in entries if not e["pii"]]
+    assert sum(not needs_ner(text) for text in clean) / len(clean) >= 0.8
+
+
+@pytest.mark.parametrize("text", [
+    '{"email": "a.b@example.com"}',
+    '{"ssn": "078-05-1120"}',
+    '{"note": "seen by Dr. Okafor"}',
+    '{"when": "last week"}',
+    '{"ip": "10.0.0.12"}',
+    '{"note": "seen by dr. okafor"}',
+    '{"first_name": "maria", "born": "1984"}',
+    '{"message": "my name is jane doe"}',
+])
+def test_flags_plausible_pii(text):
+    assert needs_ner(text)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    '{"workspaceId": "826defbf-f9dc-46cd-b01b-223e7532ae1e", "type": "tool_call"}',
+    '{"Name": "tool_call", "Count": 3}',
+    '{"message": "The tool ran. Result cached."}',
+    '{"error": "ERROR_TIMEOUT", "value": "[REDACTED]"}',
+    '{"artifactId": "7b1e4c2a-2019-4a6b-1998-2f1a0b9c8d7e", "version": 3}',
+])
+def test_skips_structural_bodies(text):
+    assert not needs_ner(text)
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.profiler import ProfilerMiddleware, SamplingProfiler
+
+
+def _client(profiler, sample_rate=0.0):
+    app = FastAPI()
+
+    def spin(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    @app.get("/work/{item_id}")
+    async def work(item_id: str):
+        spin(0.02)
+        await asyncio.sleep(0.02)
+        return {"id": item_id}
+
+    app.add_middleware(ProfilerMiddleware, profiler=profiler, sample_rate=sample_rate)
+    return TestClient(app)
+
+
+def test_flagged_requests_are_profiled_per_route():
+    profiler = SamplingProfiler(interval=0.001)
+    client = _client(profiler)
+    client.get("/work/a")
+    for item_id in ("b", "c"):
+        client.get(f"/work/{item_id}", headers={"X-FedMCP-Profile": "1"})
+
+    summary = profiler.summary()
+    assert list(summary) == ["/work/{item_id}"]
+    assert summary["/work/{item_id}"]["requests"] == 2
+
+    lines = profiler.collapsed().splitlines()
+    assert lines and all(line.startswith("/work/{item_id};") for line in lines)
+    stacks = profiler.collapsed("/work/{item_id}")
+    # Busy time is seen on the loop thread, waiting time in the await chain
+    assert ";spin (test_profiler.py:" in stacks
+    assert "<await Future>" in stacks
+
+    profiler.reset()
+    assert profiler.summary() == {} and profiler.collapsed() == ""
+
+
+def test_sample_rate_picks_requests():
+    profiler = SamplingProfiler(interval=0.001)
+    client = _client(profiler, sample_rate=1.0)
+    client.get("/work/a")
+    client.get("/nowhere")
+    assert {route: s["requests"] for route, s in profiler.summary().items()} == {
+        "/work/{item_id}": 1,
+        "unmatched": 1,
+    }
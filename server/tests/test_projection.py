@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from src.projection import encode_record_with_offsets, parse_fields, project_record
+
+RECORD = {
+    "artifact": {
+        "id": "a1",
+        "type": "agent_recipe",
+        "jsonBody": {
+            "name": "Clinical é agent",
+            "version": "2.1.0",
+            "model": {"name": "medllm", "limits": {"tokens": 4096}},
+            "capabilities": ["triage", "coding"],
+            "empty": {},
+        },
+    },
+    "jws": "header.payload.signature",
+}
+
+
+def test_offsets_match_json_dumps():
+    body, offsets = encode_record_with_offsets(RECORD)
+    assert body == json.dumps(RECORD).encode()
+    start, end = offsets["/artifact/jsonBody/model/name"]
+    assert body[start:end] == b'"medllm"'
+    assert "/artifact/jsonBody/model/limits/tokens" not in offsets
+
+
+def test_parse_fields():
+    assert parse_fields(["jsonBody.name,/jsonBody/model/name", "/a~1b"]) == [
+        ("jsonBody", "name"), ("jsonBody", "model", "name"), ("a/b",)
+    ]
+    with pytest.raises(ValueError):
+        parse_fields("jsonBody..name")
+
+
+@pytest.mark.parametrize("with_offsets", [True, False])
+def test_project_record(with_offsets):
+    body, offsets = encode_record_with_offsets(RECORD)
+    offsets = offsets if with_offsets else None
+
+    def project(fields, include_jws=True):
+        return json.loads(project_record(body, offsets, parse_fields(fields) if fields else None, include_jws))
+
+    assert project_record(body, offsets) is body
+    assert project(None, include_jws=False) == {"artifact": RECORD["artifact"]}
+    assert project(["jsonBody.name", "/jsonBody/model/limits/tokens", "jsonBody.capabilities.1"]) == {
+        "artifact": {"jsonBody": {
+            "name": "Clinical é agent",
+            "model": {"limits": {"tokens": 4096}},
+            "capabilities": {"1": "coding"},
+        }},
+        "jws": RECORD["jws"],
+    }
+    # Parents win over their children; missing paths are left out
+    assert project(["jsonBody.model.name", "jsonBody.model", "jsonBody.nope", "id"], include_jws=False) == {
+        "artifact": {"jsonBody": {"model": RECORD["artifact"]["jsonBody"]["model"]}, "id": "a1"}
+    }
@@ -0,0 +1,61 @@
+from collections import Counter
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.request_metrics import RequestMetricsMiddleware
+
+
+class _Histogram:
+    def __init__(self):
+        self.samples = []
+
+    def observe(self, value, **labels):
+        self.samples.append((labels, value))
+
+
+class _Counter:
+    def __init__(self):
+        self.counts = Counter()
+
+    def inc(self, amount=1, **labels):
+        self.counts[tuple(sorted(labels.items()))] += amount
+
+
+class _Metrics:
+    def __init__(self):
+        self.request_seconds = _Histogram()
+        self.requests_total = _Counter()
+
+
+def _client(metrics):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        if item_id == "missing":
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    app.add_middleware(RequestMetricsMiddleware, metrics=metrics)
+    return TestClient(app)
+
+
+def test_labels_use_route_template():
+    metrics = _Metrics()
+    client = _client(metrics)
+    for item_id in ("a", "b", "missing"):
+        client.get(f"/items/{item_id}")
+    client.get("/nowhere")
+
+    endpoints = [labels["endpoint"] for labels, _ in metrics.request_seconds.samples]
+    assert endpoints == ["/items/{item_id}"] * 3 + ["unmatched"]
+    assert all(seconds >= 0 for _, seconds in metrics.request_seconds.samples)
+
+    def count(endpoint, status):
+        key = (("endpoint", endpoint), ("method", "GET"), ("status", status))
+        return metrics.requests_total.counts[key]
+
+    assert count("/items/{item_id}", "200") == 2
+    assert count("/items/{item_id}", "404") == 1
+    assert count("unmatched", "404") == 1
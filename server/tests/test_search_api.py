@@ -0,0 +1,47 @@
+import time
+
+
+def test_search_endpoint(client, new_artifact):
+    marker = "zebrafinch"
+    ids = []
+    for i in range(3):
+        artifact = new_artifact()
+        artifact["jsonBody"]["description"] = f"{marker} study {i}"
+        artifact["jsonBody"]["model"]["name"] = f"finch-{i % 2}"
+        assert client.post("/artifacts", json={"artifact": artifact}).status_code == 200
+        ids.append(artifact["id"])
+
+    page = client.get("/search", params={"q": marker, "limit": 2}).json()
+    assert page["artifacts"] == [ids[2], ids[1]]
+    assert (page["count"], page["total"], page["next_offset"]) == (2, 3, 2)
+    rest = client.get("/search", params={"q": marker, "limit": 2, "offset": 2}).json()
+    assert rest["artifacts"] == [ids[0]]
+    assert rest["next_offset"] is None
+
+    # Repeated field conditions, dotted or as pointers
+    matched = client.get("/search", params=[("q", marker), ("field", "model.name:FINCH-0")]).json()
+    assert matched["artifacts"] == [ids[2], ids[0]]
+    assert client.get("/search", params={"field": "/model/name:finch-1"}).json()["artifacts"][0] == ids[1]
+
+    assert client.get("/search").status_code == 400
+    assert client.get("/search", params={"field": "model.name"}).status_code == 400
+    assert client.get("/search", params={"field": ":finch-0"}).status_code == 400
+    assert client.get("/search", params={"q": marker, "limit": 0}).status_code == 422
+
+
+def test_index_failures_do_not_fail_the_write(client, server, new_artifact, monkeypatch):
+    marker = server.INDEX_BACKFILL_STATE + server.SEARCH_INDEX_PATH
+    deadline = time.monotonic() + 5
+    while server.shared_state.get(marker) is None and time.monotonic() < deadline:
+        time.sleep(0.05)  # the startup backfill runs in the background
+    assert server.shared_state.get(marker) is not None
+
+    def failing_add(artifact):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(server.search_index, "add", failing_add)
+    artifact = new_artifact()
+    assert client.post("/artifacts", json={"artifact": artifact}).status_code == 200
+    assert client.get(f"/artifacts/{artifact['id']}").status_code == 200
+    # The index is marked incomplete, so the next startup backfills it
+    assert server.shared_state.get(marker) is None
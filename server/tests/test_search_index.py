@@ -0,0 +1,39 @@
+from src.search_index import SearchIndex, normalize_path, tokenize
+
+
+def _artifact(artifact_id, workspace_id, body, artifact_type="agent_recipe"):
+    return {"id": artifact_id, "workspaceId": workspace_id, "type": artifact_type, "jsonBody": body}
+
+
+def test_tokens_and_paths():
+    assert tokenize("Controls AC-2, medllm-7b.") == {"controls", "ac-2", "ac", "2", "medllm-7b", "medllm", "7b"}
+    assert normalize_path("/jsonBody/model/name") == "model.name"
+    assert normalize_path("capabilities.0") == "capabilities"
+
+
+def test_search_scopes_pages_and_persists(tmp_path):
+    path = str(tmp_path / "search.db")
+    index = SearchIndex(path)
+    index.add(_artifact("a", "ws-1", {"name": "Clinical agent", "model": {"name": "MedLLM-7b", "beds": 40},
+                                      "capabilities": ["triage", "drug_interaction"]}))
+    index.add(_artifact("b", "ws-1", {"name": "Billing agent", "model": {"name": "gpt"}}))
+    index.add(_artifact("c", "ws-2", {"description": "clinical summary"}, "rag_query"))
+
+    assert index.search("clinical") == (["c", "a"], 2)
+    assert index.search("clinical", workspace_id="ws-1") == (["a"], 1)
+    assert index.search("clinical", artifact_type="rag_query") == (["c"], 1)
+    assert index.search("agent", fields={"model.name": "medllm-7b"}) == (["a"], 1)
+    assert index.search(fields={"/jsonBody/capabilities": "triage", "model.beds": 40}) == (["a"], 1)
+    assert index.search("agent", limit=1, offset=1) == (["a"], 2)
+    assert index.search("clinical billing") == ([], 0)
+
+    # Re-indexing replaces the old postings
+    index.add(_artifact("a", "ws-1", {"name": "Radiology agent"}))
+    assert index.search("clinical") == (["c"], 1)
+    index.close()
+
+    reopened = SearchIndex(path)
+    assert len(reopened) == 3
+    assert reopened.search("radiology") == (["a"], 1)
+    reopened.remove("a")
+    assert reopened.search("agent") == (["b"], 1)
@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.shared_state import SharedState
+
+
+def _bump(path, times):
+    state = SharedState(path)
+    for _ in range(times):
+        state.incr("counter")
+    state.close()
+
+
+def test_get_set_and_ttl(tmp_path):
+    state = SharedState(str(tmp_path / "state.db"))
+    assert state.get("missing", 7) == 7
+    state.set("config", {"limit": 5})
+    assert state.get("config") == {"limit": 5}
+
+    state.set("short", 1, ttl=0.05)
+    assert state.get("short") == 1
+    time.sleep(0.1)
+    assert state.get("short") is None
+    assert state.purge_expired() == 1
+
+    state.delete("config")
+    assert state.get("config") is None
+
+
+def test_update_is_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "state.db")
+    # Close it before forking: a child must not inherit an open SQLite connection
+    SharedState(path).close()
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_bump, [path] * 4, [50] * 4))
+    assert SharedState(path).get("counter") == 200
+
+
+def test_failed_update_leaves_value(tmp_path):
+    state = SharedState(str(tmp_path / "state.db"))
+    state.set("n", 1)
+
+    def fail(current):
+        raise RuntimeError("no")
+
+    with pytest.raises(RuntimeError):
+        state.update("n", fail)
+    assert state.update("n", lambda current: current + 1) == 2
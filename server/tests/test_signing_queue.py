@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from src.signing_queue import JobResult, SigningQueue, SigningWorkers
+
+
+def _enqueue(queue, artifact_id, now):
+    queue.enqueue(artifact_id, "ws-1", "user:alice", {"id": artifact_id}, sign=True, now=now)
+
+
+def test_claims_are_leased_and_reclaimed(tmp_path):
+    queue = SigningQueue(str(tmp_path / "queue.db"), lease_seconds=10)
+    for i, artifact_id in enumerate(["a", "b", "c"]):
+        _enqueue(queue, artifact_id, now=100.0 + i)
+    with pytest.raises(ValueError):
+        _enqueue(queue, "a", now=104.0)
+
+    first = queue.claim(2, now=105.0)
+    assert [job.artifact_id for job in first] == ["a", "b"]
+    slow = queue.claim(5, now=105.0)
+    assert [job.artifact_id for job in slow] == ["c"]
+    assert queue.claim(5, now=106.0) == []
+    assert queue.depth() == 3
+    assert queue.lag(now=110.0) == pytest.approx(10.0)
+
+    # "a" finishes, "b" fails, "c"'s batch is still running when its lease runs out
+    results = [JobResult("a", jws="e30.e30.sig"), JobResult("b", error="KMS unavailable")]
+    assert queue.finish(first[0].claim, results, now=107.0) == []
+    assert queue.status("a")["status"] == "done" and queue.status("a")["jws"] == "e30.e30.sig"
+    assert queue.status("b")["error"] == "KMS unavailable"
+    assert queue.status("c")["status"] == "pending"
+    retry = queue.claim(5, now=116.0)
+    assert [job.artifact_id for job in retry] == ["c"]
+
+    assert queue.held(slow[0].claim, ["c"]) == set()
+    assert queue.held(retry[0].claim, ["c"]) == {"c"}
+
+    # The stale batch's outcome is dropped; the retry's is recorded
+    assert queue.finish(slow[0].claim, [JobResult("c", jws="stale")], now=117.0) == ["c"]
+    assert queue.status("c")["status"] == "pending"
+    assert queue.finish(retry[0].claim, [JobResult("c", jws="fresh")], now=118.0) == []
+    assert queue.status("c")["jws"] == "fresh"
+    assert queue.finish(slow[0].claim, [JobResult("c", jws="stale")], now=119.0) == ["c"]
+    assert queue.status("c")["jws"] == "fresh"
+    assert queue.status("missing") is None
+
+
+def test_workers_drain_in_batches(tmp_path):
+    queue = SigningQueue(str(tmp_path / "queue.db"))
+    batches = []
+
+    async def process(jobs):
+        batches.append([job.artifact_id for job in jobs])
+        return [JobResult(job.artifact_id, jws=f"jws-{job.artifact_id}") for job in jobs]
+
+    async def scenario():
+        workers = SigningWorkers(queue, process, workers=1, batch_size=4, poll_interval=0.01)
+        for i in range(6):
+            _enqueue(queue, f"job-{i}", now=100.0 + i)
+        await workers.start()
+        workers.notify()
+        while queue.depth():
+            await asyncio.sleep(0.01)
+        await workers.close()
+
+    asyncio.run(scenario())
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert queue.status("job-5")["jws"] == "jws-job-5"
+    assert queue.lag() == 0.0
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+
+from src.storage import ArtifactExists, LocalStorage
+
+
+def _record(workspace_id: str) -> dict:
+    return {
+        "artifact": {
+            "id": str(uuid4()),
+            "type": "agent_recipe",
+            "version": 1,
+            "workspaceId": workspace_id,
+            "createdAt": "2025-01-15T00:00:00+00:00Z",
+            "jsonBody": {"name": "Test Recipe"},
+        },
+        "jws": "header.payload.signature",
+    }
+
+
+def test_open_artifact_returns_stored_bytes(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    workspace_id = str(uuid4())
+    record = _record(workspace_id)
+    artifact_id = record["artifact"]["id"]
+
+    asyncio.run(storage.store_artifact(artifact_id, record))
+    stored = asyncio.run(storage.open_artifact(artifact_id))
+
+    assert stored.body == (tmp_path / f"{artifact_id}.json").read_bytes()
+    assert json.loads(stored.body) == record
+    assert stored.meta.workspace_id == workspace_id
+    assert asyncio.run(storage.read_offsets(artifact_id, stored.body)) is None
+    assert asyncio.run(storage.get_artifact(artifact_id)) == record
+
+
+def test_large_record_offsets(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    record = _record(str(uuid4()))
+    record["artifact"]["jsonBody"]["notes"] = "x" * 20000
+    artifact_id = record["artifact"]["id"]
+    asyncio.run(storage.store_artifact(artifact_id, record))
+
+    body = (tmp_path / f"{artifact_id}.json").read_bytes()
+    start, end = asyncio.run(storage.read_offsets(artifact_id, body))["/jws"]
+    assert body[start:end] == b'"header.payload.signature"'
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"{artifact_id}.json", f"{artifact_id}.meta", f"{artifact_id}.offsets"
+    ]
+
+    # A map that doesn't belong to the record's bytes is not used
+    other = body.replace(b"Test Recipe", b"Other Recipe")
+    assert asyncio.run(storage.read_offsets(artifact_id, other)) is None
+    (tmp_path / f"{artifact_id}.offsets").write_text(json.dumps({"/jws": [start, end]}))
+    assert asyncio.run(storage.read_offsets(artifact_id, body)) is None
+
+
+def test_open_missing_artifact(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    assert asyncio.run(storage.open_artifact(str(uuid4()))) is None
+
+
+def test_legacy_record_without_sidecar(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    workspace_id = str(uuid4())
+    record = _record(workspace_id)
+    artifact_id = record["artifact"]["id"]
+    (tmp_path / f"{artifact_id}.json").write_text(json.dumps(record))
+
+    stored = asyncio.run(storage.open_artifact(artifact_id))
+    assert stored.meta.workspace_id == workspace_id
+    assert asyncio.run(storage.list_artifacts(workspace_id)) == [artifact_id]
+
+
+def test_list_artifacts_by_workspace(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    workspace_a, workspace_b = str(uuid4()), str(uuid4())
+    a, b = _record(workspace_a), _record(workspace_b)
+    asyncio.run(storage.store_artifact(a["artifact"]["id"], a))
+    asyncio.run(storage.store_artifact(b["artifact"]["id"], b))
+
+    assert asyncio.run(storage.list_artifacts(workspace_a)) == [a["artifact"]["id"]]
+    assert sorted(asyncio.run(storage.list_artifacts())) == sorted(
+        [a["artifact"]["id"], b["artifact"]["id"]]
+    )
+
+
+def test_head_artifact_returns_stored_etag(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    record = _record(str(uuid4()))
+    artifact_id = record["artifact"]["id"]
+    asyncio.run(storage.store_artifact(artifact_id, record, etag="abc123"))
+
+    meta = asyncio.run(storage.head_artifact(artifact_id))
+    assert meta.etag == "abc123"
+    assert meta.signed is True
+    assert asyncio.run(storage.head_artifact(str(uuid4()))) is None
+
+
+def test_store_refuses_an_existing_id(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    record = _record(str(uuid4()))
+    artifact_id = record["artifact"]["id"]
+    asyncio.run(storage.store_artifact(artifact_id, record, etag="first"))
+
+    changed = json.loads(json.dumps(record))
+    changed["artifact"]["jsonBody"]["name"] = "Changed"
+    with pytest.raises(ArtifactExists):
+        asyncio.run(storage.store_artifact(artifact_id, changed, etag="second"))
+    assert asyncio.run(storage.get_artifact(artifact_id)) == record
+    assert asyncio.run(storage.head_artifact(artifact_id)).etag == "first"
+    assert not list(tmp_path.glob("*.tmp"))
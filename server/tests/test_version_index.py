@@ -0,0 +1,51 @@
+import pytest
+
+from src.json_diff import json_diff
+from src.version_index import ArtifactVersion, VersionConflict, VersionIndex
+
+
+def test_lineages_resolve_latest_and_reject_taken_versions(tmp_path):
+    path = str(tmp_path / "versions.db")
+    index = VersionIndex(path)
+    v1 = ArtifactVersion("a1", 1, "a1", "ws-1", "2025-01-01")
+    v2 = ArtifactVersion("a1", 2, "a2", "ws-1", "2025-01-02")
+    index.add(v1)
+    index.add(v2)
+    index.add(ArtifactVersion("b1", 1, "b1", "ws-1", "2025-01-03"))
+
+    with pytest.raises(VersionConflict):
+        index.add(ArtifactVersion("a1", 2, "a3", "ws-1", "2025-01-04"))
+    with pytest.raises(VersionConflict, match="already exists as version 2"):
+        index.add(ArtifactVersion("a2", 1, "a2", "ws-1", "2025-01-04"))
+    # An indexed artifact is never rewritten, even at the same place
+    with pytest.raises(VersionConflict, match="already exists as version 1"):
+        index.add(v1._replace(created_at="2025-02-01"))
+    assert index.get("a1") == v1
+
+    assert index.get("a2") == v2
+    assert index.get("missing") is None
+    assert index.resolve("a1") == v2
+    assert index.resolve("a1", 1) == v1
+    assert index.resolve("a1", 5) is None
+    assert [v.artifact_id for v in index.versions("a1")] == ["a1", "a2"]
+    index.close()
+
+    reopened = VersionIndex(path)
+    assert len(reopened) == 3
+    reopened.remove("a2")
+    assert reopened.resolve("a1") == v1
+
+
+def test_json_diff():
+    old = {"name": "agent", "tags": ["a", "b", "c"], "model": {"size": 7, "ctx": 4096}, "gone": True}
+    new = {"name": "agent", "tags": ["a", "x"], "model": {"size": 13, "ctx": 4096}, "a/b": 1}
+
+    assert json_diff(old, new) == [
+        {"op": "replace", "path": "/tags/1", "value": "x", "previous": "b"},
+        {"op": "remove", "path": "/tags/2", "previous": "c"},
+        {"op": "replace", "path": "/model/size", "value": 13, "previous": 7},
+        {"op": "remove", "path": "/gone", "previous": True},
+        {"op": "add", "path": "/a~1b", "value": 1},
+    ]
+    assert json_diff(old, old) == []
+    assert json_diff({"n": 1}, {"n": True}) == [{"op": "replace", "path": "/n", "value": True, "previous": 1}]
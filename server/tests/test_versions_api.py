@@ -0,0 +1,104 @@
+import asyncio
+
+
+def _create(client, artifact, supersedes=None):
+    body = {"artifact": artifact}
+    if supersedes:
+        body["supersedes"] = supersedes
+    return client.post("/artifacts", json=body)
+
+
+def test_supersedes_assigns_the_next_version(client, new_artifact):
+    v1 = new_artifact()
+    assert _create(client, v1).status_code == 200
+
+    v2 = new_artifact(version=7)  # the server assigns the number
+    v2["jsonBody"]["name"] = "renamed"
+    assert _create(client, v2, supersedes=v1["id"]).status_code == 200
+
+    listed = client.get(f"/artifacts/{v1['id']}/versions").json()
+    assert listed["lineage_id"] == v1["id"]
+    assert listed["latest"] == 2
+    assert [v["artifact_id"] for v in listed["versions"]] == [v1["id"], v2["id"]]
+    assert client.get(f"/artifacts/{v2['id']}").json()["artifact"]["version"] == 2
+
+    # Only the latest version can be superseded, and only in its workspace
+    stale = _create(client, new_artifact(), supersedes=v1["id"])
+    assert stale.status_code == 409
+    moved = _create(client, new_artifact(workspaceId="550e8400-e29b-41d4-a716-446655440099"), supersedes=v2["id"])
+    assert moved.status_code == 400
+    assert _create(client, new_artifact(), supersedes="no-such-artifact").status_code == 404
+
+
+def test_version_reads_and_diff(client, new_artifact):
+    v1 = new_artifact()
+    v2 = new_artifact()
+    v2["jsonBody"]["name"] = "renamed"
+    _create(client, v1)
+    _create(client, v2, supersedes=v1["id"])
+
+    latest = client.get(f"/artifacts/{v1['id']}", params={"version": "latest"})
+    assert latest.status_code == 200
+    assert latest.headers["content-location"] == f"/artifacts/{v2['id']}"
+    assert latest.json()["artifact"]["id"] == v2["id"]
+    first = client.get(f"/artifacts/{v2['id']}", params={"version": "1"})
+    assert first.headers["content-location"] == f"/artifacts/{v1['id']}"
+    assert client.get(f"/artifacts/{v1['id']}", params={"version": "3"}).status_code == 404
+    assert client.get(f"/artifacts/{v1['id']}", params={"version": "newest"}).status_code == 400
+
+    diff = client.get(f"/artifacts/{v1['id']}/diff").json()
+    assert (diff["from"]["version"], diff["to"]["version"]) == (1, 2)
+    changes = {change["path"]: change for change in diff["changes"]}
+    assert changes["/jsonBody/name"]["value"] == "renamed"
+    assert changes["/jsonBody/name"]["previous"] == v1["jsonBody"]["name"]
+    assert client.get(f"/artifacts/{v2['id']}/diff", params={"from": "2"}).json()["changes"] == []
+
+
+def test_reposting_an_existing_id_is_refused(client, new_artifact):
+    v1 = new_artifact()
+    first = _create(client, v1)
+    assert first.status_code == 200
+    etag = client.get(f"/artifacts/{v1['id']}").headers["etag"]
+
+    changed = dict(v1, jsonBody=dict(v1["jsonBody"], name="rewritten"))
+    assert _create(client, changed).status_code == 409
+    assert _create(client, v1).status_code == 409
+    unsigned = client.post("/artifacts", json={"artifact": changed, "sign": False})
+    assert unsigned.status_code == 409
+
+    stored = client.get(f"/artifacts/{v1['id']}")
+    assert stored.headers["etag"] == etag
+    assert "immutable" in stored.headers["cache-control"]
+    assert stored.json()["artifact"]["jsonBody"]["name"] == v1["jsonBody"]["name"]
+    assert stored.json()["jws"] == first.json()["jws"]
+    # Changed content goes in as a new version
+    v2 = dict(changed, id=new_artifact()["id"])
+    assert _create(client, v2, supersedes=v1["id"]).status_code == 200
+
+
+def test_failed_write_releases_the_id(client, server, new_artifact, monkeypatch):
+    stored = new_artifact()
+    _create(client, stored)
+    artifact = new_artifact()
+
+    async def failing_store(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(server.storage, "store_artifact", failing_store)
+    assert _create(client, artifact).status_code == 400
+    assert _create(client, stored).status_code == 409
+    monkeypatch.undo()
+
+    assert client.get(f"/artifacts/{stored['id']}/versions").status_code == 200
+    assert _create(client, artifact).status_code == 200
+
+
+def test_id_stored_behind_the_index_is_refused(client, server, new_artifact):
+    # Written by another node: in storage, but not in this node's version index
+    artifact = new_artifact()
+    record = {"artifact": artifact, "jws": "header.payload.signature"}
+    asyncio.run(server.storage.store_artifact(artifact["id"], record))
+
+    assert _create(client, dict(artifact, jsonBody={"name": "other"})).status_code == 409
+    assert client.get(f"/artifacts/{artifact['id']}").json() == record
+    assert _create(client, new_artifact()).status_code == 200